@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 14:20:37
+Contact     : zoe4896@outlook.com
+Description : 向量化批量环境，一次调用推进N局游戏
+'''
+import numpy as np
+from manager import GameManager
+from pieces import ROTATIONS
+
+# 动作编号，0为无操作
+BATCH_ACTIONS = (None, 'left', 'right', 'down', 'rotate', 'hard_drop')
+NOOP, LEFT, RIGHT, DOWN, ROTATE, HARD_DROP = range(len(BATCH_ACTIONS))
+
+# 每行一个uint64位掩码：第0位为左墙，第1~W位为场地，其余高位为右墙；底部再加4行实心地板
+PAD = 1
+PIECE_SIZE = 4
+MAX_WIDTH = 64 - PAD - PIECE_SIZE - 1
+
+# 批量环境
+# 与CollisionSystem/MapSystem/ClearLinesSystem相同的规则：
+#   - 移动/下落不能越界或与已锁定方块重叠，旋转后包围盒需为空
+#   - 触底或落在方块上时lock delay耗尽即锁定，硬降当帧锁定
+#   - 得分为rows_cleared ** 2，最顶行被占据即游戏结束
+# 按逻辑帧推进，每帧每局最多一个动作，重力每FALL_SPEED毫秒下落一格
+class BatchEnv:
+    def __init__(self, n, config_path='config.yaml', seed=None, game_manager=None):
+        self.game_manager = game_manager or GameManager(config_path, headless=True)
+        self.config = self.game_manager.config
+        self.n = n
+        self.height = self.config.PLAYFIELD_HEIGHT
+        self.width = self.config.PLAYFIELD_WIDTH
+        if self.width > MAX_WIDTH:
+            raise ValueError(f'BatchEnv supports PLAYFIELD_WIDTH <= {MAX_WIDTH}')
+        self.fall_ticks = max(1, -(-self.config.FALL_SPEED * self.config.FPS // 1000))
+        self.lock_delay_frames = self.config.LOCK_DELAY_FRAMES
+        self.rng = np.random.default_rng(seed)
+
+        self.field_mask = np.uint64(((1 << self.width) - 1) << PAD)
+        self.empty_row = ~self.field_mask
+        self.full_row = np.uint64(0xFFFFFFFFFFFFFFFF)
+        self._build_tables(self.game_manager.piece_table)
+        # 每局前两个方块（Entities._init_block创建的block与next_block）的x按第一种方块的行数计算，而不是该方块的宽度
+        self.first_x = self.width // 2 - len(self.game_manager.shapes[0]) // 2
+
+        self._index = np.arange(n)
+        self._rows = np.arange(PIECE_SIZE)
+        self.board = np.empty((n, self.height + PIECE_SIZE), dtype=np.uint64)
+        self.piece = np.zeros(n, dtype=np.int64)
+        self.next_piece = np.zeros(n, dtype=np.int64)
+        self.rotation = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.fall_counter = np.zeros(n, dtype=np.int64)
+        self.lock_timer = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lines_cleared = np.zeros(n, dtype=np.int64)
+        self.pieces = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        # 已结束对局的统计
+        self.episodes = 0
+        self.finished_score = []
+        self.finished_lines = []
+        self.reset()
+
+    def _build_tables(self, piece_table):
+        # masks[piece, rotation, row]：方块每行位掩码；bbox同形状为包围盒
+        count = len(piece_table)
+        self.masks = np.zeros((count, ROTATIONS, PIECE_SIZE), dtype=np.uint64)
+        self.bbox = np.zeros((count, ROTATIONS, PIECE_SIZE), dtype=np.uint64)
+        self.piece_width = np.zeros((count, ROTATIONS), dtype=np.int64)
+        for piece_id in range(count):
+            for rotation in range(ROTATIONS):
+                piece = piece_table.get(piece_id, rotation)
+                self.masks[piece_id, rotation, :piece.height] = piece.row_masks
+                self.bbox[piece_id, rotation, :piece.height] = (1 << piece.width) - 1
+                self.piece_width[piece_id, rotation] = piece.width
+        self.piece_count = count
+
+    def reset(self, mask=None):
+        idx = self._index if mask is None else self._index[mask]
+        self.board[idx, :self.height] = self.empty_row
+        self.board[idx, self.height:] = self.full_row
+        self.next_piece[idx] = self.rng.integers(self.piece_count, size=len(idx))
+        self.fall_counter[idx] = 0
+        self.score[idx] = 0
+        self.lines_cleared[idx] = 0
+        self.pieces[idx] = 0
+        self.ticks[idx] = 0
+        self._spawn(idx)
+
+    def _spawn(self, idx):
+        self.piece[idx] = self.next_piece[idx]
+        self.next_piece[idx] = self.rng.integers(self.piece_count, size=len(idx))
+        self.rotation[idx] = 0
+        self.x[idx] = np.where(self.pieces[idx] < 2, self.first_x, self.width // 2 - self.piece_width[self.piece[idx], 0] // 2)
+        self.y[idx] = 0
+        self.lock_timer[idx] = self.lock_delay_frames
+
+    def _collides(self, idx, table, rotation, x, y):
+        shifted = table[self.piece[idx], rotation] << (x + PAD).astype(np.uint64)[:, None]
+        rows = self.board[idx[:, None], y[:, None] + self._rows]
+        return ((rows & shifted) != 0).any(axis=1)
+
+    def _try_move(self, mask, dx, dy):
+        idx = self._index[mask]
+        if len(idx):
+            x, y = self.x[idx] + dx, self.y[idx] + dy
+            ok = ~self._collides(idx, self.masks, self.rotation[idx], x, y)
+            self.x[idx[ok]] = x[ok]
+            self.y[idx[ok]] = y[ok]
+
+    def step(self, actions):
+        # actions: (N,)动作编号；返回本帧得分增量与本帧结束的对局
+        actions = np.asarray(actions)
+        self._try_move(actions == LEFT, -1, 0)
+        self._try_move(actions == RIGHT, 1, 0)
+        self._try_move(actions == DOWN, 0, 1)
+        rotate = self._index[actions == ROTATE]
+        if len(rotate):
+            rotation = (self.rotation[rotate] + 1) % ROTATIONS
+            ok = ~self._collides(rotate, self.bbox, rotation, self.x[rotate], self.y[rotate])
+            self.rotation[rotate[ok]] = rotation[ok]
+        drop = actions == HARD_DROP
+        if drop.any():
+            self.hard_drop(drop)
+
+        # 碰撞检测：触底或落在方块上；硬降不等待lock delay
+        landed = self._collides(self._index, self.masks, self.rotation, self.x, self.y + 1)
+        self.lock_timer[landed] -= 1
+        lock = landed & ((self.lock_timer <= 0) | drop)
+        # 重力下落：距上次下落满fall_ticks帧（与MovementSystem相同，本帧计入下次下落的间隔），被阻挡时计时继续累积
+        fall = ~landed & (self.fall_counter >= self.fall_ticks)
+        self.y[fall] += 1
+        self.fall_counter[fall] = 0
+        self.fall_counter += 1
+        self.ticks += 1
+
+        reward = np.zeros(self.n, dtype=np.int64)
+        done = np.zeros(self.n, dtype=bool)
+        if lock.any():
+            reward, done = self._lock(self._index[lock])
+        return reward, done
+
+    def hard_drop(self, mask):
+        idx = self._index[mask]
+        while len(idx):
+            y = self.y[idx] + 1
+            ok = ~self._collides(idx, self.masks, self.rotation[idx], self.x[idx], y)
+            idx = idx[ok]
+            self.y[idx] = y[ok]
+
+    def _lock(self, idx):
+        shifted = self.masks[self.piece[idx], self.rotation[idx]] << (self.x[idx] + PAD).astype(np.uint64)[:, None]
+        rows = self.y[idx][:, None] + self._rows
+        self.board[idx[:, None], rows] |= shifted
+        self.pieces[idx] += 1
+
+        # 消行：满行排到最前并替换为空行，其余行保持顺序
+        board = self.board[idx, :self.height]
+        full = board == self.full_row
+        cleared = full.sum(axis=1)
+        reward = np.zeros(self.n, dtype=np.int64)
+        rows_cleared = cleared > 0
+        if rows_cleared.any():
+            sub = idx[rows_cleared]
+            order = np.argsort(np.where(full[rows_cleared], -1, np.arange(self.height)), axis=1, kind='stable')
+            compacted = np.take_along_axis(board[rows_cleared], order, axis=1)
+            compacted[np.arange(self.height) < cleared[rows_cleared][:, None]] = self.empty_row
+            self.board[sub, :self.height] = compacted
+            gained = cleared[rows_cleared] ** 2
+            self.lines_cleared[sub] += cleared[rows_cleared]
+            self.score[sub] += gained
+            reward[sub] = gained
+
+        self._spawn(idx)
+        # 最顶行被占据或新方块无处放置即游戏结束
+        over = ((self.board[idx, 0] & self.field_mask) != 0) | self._collides(idx, self.masks, self.rotation[idx], self.x[idx], self.y[idx])
+        done = np.zeros(self.n, dtype=bool)
+        if over.any():
+            finished = idx[over]
+            done[finished] = True
+            self.episodes += len(finished)
+            self.finished_score.extend(self.score[finished].tolist())
+            self.finished_lines.extend(self.lines_cleared[finished].tolist())
+            self.reset(done)
+        return reward, done
+
+    def cells(self):
+        # (N, H, W)的0/1场地，不含当前下落方块
+        bits = (self.board[:, :self.height, None] >> (np.arange(self.width, dtype=np.uint64) + PAD)) & np.uint64(1)
+        return bits.astype(np.uint8)
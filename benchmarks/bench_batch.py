@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 15:02:10
+Contact     : zoe4896@outlook.com
+Description : 批量环境吞吐量随N的变化（aggregate steps/sec）
+              用法：python -m benchmarks.bench_batch
+'''
+import time
+import argparse
+import numpy as np
+from batch import BatchEnv, BATCH_ACTIONS, HARD_DROP
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 16, 256, 1024, 4096])
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f'{"N":>6}{"steps/sec":>14}{"games":>10}{"mean score":>12}')
+    for n in args.sizes:
+        env = BatchEnv(n, seed=args.seed)
+        actions = rng.integers(len(BATCH_ACTIONS) - 1, size=(args.steps, n))
+        actions[rng.random((args.steps, n)) < 0.05] = HARD_DROP
+        start = time.perf_counter()
+        for step in range(args.steps):
+            env.step(actions[step])
+        elapsed = time.perf_counter() - start
+        mean_score = np.mean(env.finished_score) if env.finished_score else 0
+        print(f'{n:>6}{n * args.steps / elapsed:>14.0f}{env.episodes:>10}{mean_score:>12.2f}')
+
+if __name__ == '__main__':
+    main()
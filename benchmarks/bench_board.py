@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 11:48:52
+Contact     : zoe4896@outlook.com
+Description : 场地后端对比（碰撞检测、锁定+消行、整局无界面模拟）
+              用法：python -m benchmarks.bench_board
+'''
+import time
+import random
+import argparse
+from board import BOARD_BACKENDS
+from pieces import PieceTable, PieceRotation, ROTATIONS
+from headless import HeadlessGame
+from strategies import random_strategy
+
+SHAPES = [
+    [[1, 1, 1, 1]],
+    [[1, 1], [1, 1]],
+    [[1, 0, 0], [1, 1, 1]],
+    [[0, 0, 1], [1, 1, 1]],
+    [[0, 1, 1], [1, 1, 0]],
+    [[1, 1, 0], [0, 1, 1]],
+    [[0, 1, 0], [1, 1, 1]]
+]
+
+def random_board(backend, height, width, rng):
+    # 下半部分随机填充，每行留一个空位
+    board = BOARD_BACKENDS[backend](height, width)
+    for y in range(height // 2, height):
+        row = [[1 if rng.random() < 0.7 else 0 for _ in range(width)]]
+        row[0][rng.randrange(width)] = 0
+        board.lock(PieceRotation(row), 0, y)
+    return board
+
+def bench_hits(backend, height, width, n):
+    rng = random.Random(0)
+    board = random_board(backend, height, width, rng)
+    table = PieceTable(SHAPES)
+    probes = []
+    for _ in range(1024):
+        piece = table.get(rng.randrange(len(table)), rng.randrange(ROTATIONS))
+        probes.append((piece, rng.randrange(width - piece.width + 1), rng.randrange(height - piece.height)))
+    start = time.perf_counter()
+    for i in range(n):
+        piece, x, y = probes[i & 1023]
+        board.landed(piece, x, y)
+        board.hits(piece, x - 1, y)
+        board.hits(piece, x, y)
+    return n / (time.perf_counter() - start)
+
+def bench_clear(backend, height, width, n):
+    full = PieceRotation([[1] * width])
+    start = time.perf_counter()
+    for _ in range(n):
+        board = BOARD_BACKENDS[backend](height, width)
+        for y in range(height - 4, height):
+            board.lock(full, 0, y)
+        board.clear_rows(board.full_rows())
+        board.stack_height()
+    return n / (time.perf_counter() - start)
+
+def bench_games(backend, games, height=20, width=10):
+    game = HeadlessGame()
+    game.config.BOARD_BACKEND = backend
+    game.config.PLAYFIELD_HEIGHT = height
+    game.config.PLAYFIELD_WIDTH = width
+    ticks = 0
+    start = time.perf_counter()
+    for seed in range(games):
+        game.reset(seed)
+        ticks += game.run(random_strategy(seed), 100000)['ticks']
+    return ticks / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=20000)
+    parser.add_argument('--games', type=int, default=30)
+    args = parser.parse_args()
+
+    sizes = [(20, 10), (20, 64), (40, 256)]
+    print(f'{"backend":<10}{"size":>10}{"collision/s":>15}{"lock+clear/s":>15}')
+    for height, width in sizes:
+        for backend in BOARD_BACKENDS:
+            hits = bench_hits(backend, height, width, args.n)
+            clear = bench_clear(backend, height, width, args.n // 10)
+            print(f'{backend:<10}{f"{width}x{height}":>10}{hits:>15.0f}{clear:>15.0f}')
+    for height, width in [(20, 10), (100, 64)]:
+        for backend in BOARD_BACKENDS:
+            print(f'{backend:<10} headless {width}x{height} ticks/sec: {bench_games(backend, args.games, height, width):.0f}')
+
+if __name__ == '__main__':
+    main()
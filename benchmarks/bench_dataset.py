@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 07:58:03
+Contact     : zoe4896@outlook.com
+Description : 训练数据导出的吞吐与内存：BatchEnv与无界面对局边玩边写入，写入时的内存峰值，
+              以及顺序、按块打乱、逐行随机三种方式读取小批量的速度
+              用法：python -m benchmarks.bench_dataset --envs 256 --steps 2000
+'''
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+from batch import BatchEnv
+from headless import HeadlessGame
+from strategies import random_strategy
+from dataset import DatasetWriter, GameRecorder, BatchRecorder, Dataset
+
+def bench_batch(path, envs, steps, chunk_rows, record):
+    env = BatchEnv(envs, seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 6, (steps, envs))
+    writer = DatasetWriter(path, env.height, env.width, chunk_rows) if record else None
+    recorder = BatchRecorder(writer, env) if record else None
+    tracemalloc.start()
+    start = time.perf_counter()
+    for step in range(steps):
+        if record:
+            recorder.step(actions[step])
+        else:
+            env.step(actions[step])
+    if record:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return envs * steps / elapsed, peak
+
+def bench_headless(path, config_path, games, record):
+    game = HeadlessGame(config_path)
+    writer = DatasetWriter(path, game.config.PLAYFIELD_HEIGHT, game.config.PLAYFIELD_WIDTH) if record else None
+    ticks = 0
+    start = time.perf_counter()
+    for seed in range(games):
+        game.reset(seed)
+        policy = random_strategy(seed)
+        recorder = GameRecorder(writer, seed, skip_idle=False) if record else None
+        while not game.done:
+            action = policy(game)
+            if record:
+                recorder.step(game, action if action is not None else ())
+            else:
+                game.step(action if action is not None else ())
+        ticks += game.tick
+    if record:
+        writer.close()
+    return ticks / (time.perf_counter() - start)
+
+def bench_read(path, batch_size, mode):
+    dataset = Dataset(path)
+    start = time.perf_counter()
+    rows = 0
+    if mode == 'random':
+        # 对照：整体随机排列后逐批按下标从memmap取
+        order = np.random.default_rng(0).permutation(len(dataset))
+        for first in range(0, len(order), batch_size):
+            index = np.sort(order[first:first + batch_size])
+            batch = {name: column[index] for name, column in dataset.columns.items()}
+            batch['board'].sum()
+            rows += len(batch['board'])
+    else:
+        for batch in dataset.batches(batch_size, shuffle=mode == 'block', seed=0):
+            # 顺序读取时是零拷贝视图，求和以实际触及数据
+            batch['board'].sum()
+            rows += len(batch['board'])
+    elapsed = time.perf_counter() - start
+    dataset.close()
+    return rows / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--envs', type=int, default=256)
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--chunk-rows', type=int, default=1 << 16)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench_dataset_')
+    try:
+        path = f'{root}/batch'
+        plain, _ = bench_batch(path, args.envs, args.steps, args.chunk_rows, False)
+        rate, peak = bench_batch(path, args.envs, args.steps, args.chunk_rows, True)
+        size = sum(column.nbytes for column in Dataset(path).columns.values())
+        print(f'BatchEnv x{args.envs}: {plain:.0f} steps/sec, recording {rate:.0f} rows/sec ({rate / plain:.0%})')
+        print(f'  {args.envs * args.steps} rows, {size / 2 ** 20:.1f} MB on disk, peak traced memory {peak / 2 ** 20:.1f} MB')
+        plain = bench_headless(f'{root}/headless', args.config, args.games, False)
+        rate = bench_headless(f'{root}/headless', args.config, args.games, True)
+        print(f'headless: {plain:.0f} ticks/sec, recording every tick {rate:.0f} ticks/sec ({rate / plain:.0%})')
+        for mode in ('sequential', 'block', 'random'):
+            print(f'read {mode:<11}{bench_read(path, args.batch_size, mode):>12.0f} rows/sec')
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 05:36:20
+Contact     : zoe4896@outlook.com
+Description : 离线导出速度：先录一局搜索策略对局，再从录像导出图片序列与原始视频流，报告相对实时的倍数
+              用法：python -m benchmarks.bench_export --ticks 3600
+'''
+import os
+import shutil
+import time
+import argparse
+import tempfile
+from manager import GameManager
+from headless import HeadlessGame
+from replay import ReplayRecorder, ReplayPlayer
+from export import Exporter, ImageSink, RawSink
+from strategies import search_strategy
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--ticks', type=int, default=3600)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    game_manager = GameManager(args.config, headless=True)
+    fps = game_manager.config.FPS
+    game = HeadlessGame(seed=args.seed, game_manager=game_manager)
+    recorder = ReplayRecorder.attach(game)
+    game.run(search_strategy(args.seed), args.ticks)
+    replay = recorder.finish(game.tick)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, out, stride in (
+            ('png', os.path.join(directory, 'png', '%06d.png'), 1),
+            ('bmp', os.path.join(directory, 'bmp', '%06d.bmp'), 1),
+            ('raw 60fps', os.path.join(directory, 'game60.rgb'), 1),
+            ('raw 30fps', os.path.join(directory, 'game30.rgb'), 2),
+        ):
+            sink = ImageSink(out) if '%' in out else RawSink(out)
+            player = ReplayPlayer(replay, args.config, game_manager)
+            game = player.game
+            exporter = Exporter(game_manager.config, sink, stride)
+            start = time.perf_counter()
+            exporter.frame(game)
+            while game.tick < replay.ticks:
+                player.seek(game.tick + 1)
+                exporter.frame(game)
+            exporter.close()
+            elapsed = time.perf_counter() - start
+            size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(directory) for f in files)
+            print(f'{name:<10} {game.tick / elapsed:7.0f} ticks/sec ({game.tick / fps / elapsed:5.1f}x realtime)  '
+                  f'{exporter.rendered} rendered / {sink.frames} written  {size / 2**20:.1f} MB on disk')
+            if os.path.isdir(os.path.dirname(out)) and '%' in out:
+                shutil.rmtree(os.path.dirname(out))
+            else:
+                os.remove(out)
+
+if __name__ == '__main__':
+    main()
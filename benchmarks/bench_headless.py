@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 10:31:07
+Contact     : zoe4896@outlook.com
+Description : 无界面模式吞吐量测试（games/sec, ticks/sec）
+              用法：python -m benchmarks.bench_headless --games 200
+'''
+import time
+import argparse
+from headless import HeadlessGame
+from strategies import random_strategy
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--max-ticks', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    game = HeadlessGame(args.config)
+    ticks = 0
+    pieces = 0
+    start = time.perf_counter()
+    for i in range(args.games):
+        game.reset(args.seed + i)
+        result = game.run(random_strategy(args.seed + i), args.max_ticks)
+        ticks += result['ticks']
+        pieces += result['pieces']
+    elapsed = time.perf_counter() - start
+    print(f'games: {args.games}  ticks: {ticks}  pieces: {pieces}  time: {elapsed:.3f}s')
+    print(f'games/sec: {args.games / elapsed:.1f}  ticks/sec: {ticks / elapsed:.0f}  pieces/sec: {pieces / elapsed:.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 06:21:37
+Contact     : zoe4896@outlook.com
+Description : 底层计算实现的对比：单项耗时与整局无界面模拟速度（差分检查见tests/test_kernels.py）
+              用法：python -m benchmarks.bench_kernels
+'''
+import time
+import argparse
+import numpy as np
+from kernels import KERNEL_BACKENDS, make_kernels
+from pieces import PieceTable, ROTATIONS
+from zobrist import zobrist_table
+from manager import GameManager
+from headless import HeadlessGame
+from strategies import random_strategy
+
+def random_cells(height, width, rng):
+    # 下半部分随机填充，部分行填满
+    cells = np.zeros((height, width), dtype=int)
+    top = int(rng.integers(height + 1))
+    cells[top:] = rng.random((height - top, width)) < 0.7
+    full = rng.random(height - top) < 0.3
+    cells[top:][full] = 1
+    return cells
+
+def bench_ops(kernels, n, height=20, width=10):
+    rng = np.random.default_rng(1)
+    table = PieceTable([[[1, 1, 1, 1]], [[1, 1], [1, 1]], [[1, 0, 0], [1, 1, 1]], [[0, 1, 0], [1, 1, 1]]])
+    cells = random_cells(height, width, rng)
+    cells[:height // 2] = 0
+    keys = zobrist_table(height, width).keys
+    colors = np.zeros((height, width), dtype=np.uint8)
+    probes = []
+    for _ in range(256):
+        piece = table.get(int(rng.integers(len(table))), int(rng.integers(ROTATIONS)))
+        probes.append((piece, int(rng.integers(width - piece.width + 1)), int(rng.integers(height // 2 - piece.height))))
+    results = {}
+    def timed(name, fn):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(probes[i & 255])
+        results[name] = (time.perf_counter() - start) / n * 1e6
+    timed('hits', lambda p: kernels.hits(cells, p[0], p[1] - 1, p[2]))
+    timed('landed', lambda p: kernels.landed(cells, p[0], p[1], p[2]))
+    timed('fill', lambda p: kernels.fill(colors, p[0], p[1], p[2], 3))
+    lock_cells = np.zeros_like(cells)
+    timed('lock', lambda p: kernels.lock(lock_cells, keys, p[0], p[1], p[2]))
+    rows = np.array([height - 4, height - 2, height - 1])
+    timed('full_rows', lambda p: kernels.full_rows(cells))
+    timed('clear_rows', lambda p: kernels.clear_rows(colors, rows))
+    return results
+
+def bench_games(config_path, backend, games):
+    game_manager = GameManager(config_path, headless=True)
+    game_manager.kernels = make_kernels(backend=backend)
+    game = HeadlessGame(game_manager=game_manager)
+    # 预热（JIT编译）
+    game.run(random_strategy(0), 2000)
+    ticks = 0
+    start = time.perf_counter()
+    for seed in range(games):
+        game.reset(seed)
+        ticks += game.run(random_strategy(seed), 100000)['ticks']
+    return ticks / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('-n', type=int, default=20000)
+    parser.add_argument('--games', type=int, default=100)
+    args = parser.parse_args()
+
+    available = {name: load() for name, load in KERNEL_BACKENDS.items()}
+    for name, kernels in available.items():
+        if kernels is None:
+            print(f'{name:<8} not available')
+    available = {name: kernels for name, kernels in available.items() if kernels is not None}
+    names = None
+    for name, kernels in available.items():
+        bench_ops(kernels, 100)
+        results = bench_ops(kernels, args.n)
+        if names is None:
+            names = list(results)
+            print(f'{"us/op":<8}' + ''.join(f'{op:>12}' for op in names) + f'{"ticks/sec":>12}')
+        ticks = bench_games(args.config, name, args.games)
+        print(f'{name:<8}' + ''.join(f'{results[op]:>12.2f}' for op in names) + f'{ticks:>12.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 01:12:48
+Contact     : zoe4896@outlook.com
+Description : 硬降延迟：按键到锁定的帧数与耗时，落点提示的渲染开销
+              用法：SDL_VIDEODRIVER=dummy python -m benchmarks.bench_latency
+'''
+import time
+import random
+import argparse
+import numpy as np
+import pygame
+from manager import GameManager, Systems
+from headless import HeadlessGame
+
+def measure_latency(game_manager, pieces, seed):
+    # 每个新方块先随机平移，再硬降，统计从硬降那一帧到方块锁定经过的帧数
+    game = HeadlessGame(game_manager=game_manager, seed=seed)
+    rng = random.Random(seed)
+    ticks = []
+    latencies = []
+    while len(ticks) < pieces:
+        if game.done:
+            game.reset(seed + len(ticks))
+        for _ in range(rng.randrange(4)):
+            game.step(rng.choice(('left', 'right', 'rotate')))
+        locked = game.pieces
+        start_tick = game.tick
+        start = time.perf_counter()
+        game.step('hard_drop')
+        while game.pieces == locked and not game.done:
+            game.step(())
+        latencies.append(time.perf_counter() - start)
+        ticks.append(game.tick - start_tick - 1)
+    return np.array(ticks), np.array(latencies)
+
+def measure_render(game_manager, frames, seed, ghost):
+    game = HeadlessGame(game_manager=game_manager, seed=seed)
+    render = Systems(game_manager).sys_render
+    render.ghost = ghost
+    rng = random.Random(seed)
+    elapsed = 0.0
+    for _ in range(frames):
+        if game.done:
+            game.reset(seed)
+        game.step(rng.choice(('left', 'right', 'rotate', 'down')) if rng.random() < 0.3 else ())
+        start = time.perf_counter()
+        rects = render.process(game.entities.entity_manager)
+        pygame.display.update(rects)
+        elapsed += time.perf_counter() - start
+    return elapsed / frames
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--pieces', type=int, default=1000)
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    game_manager = GameManager(args.config)
+    ticks, latencies = measure_latency(game_manager, args.pieces, args.seed)
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    print(f'hard drop: {ticks.mean():.2f} extra ticks to lock (max {ticks.max()})  p50 {p50:.1f} us  p99 {p99:.1f} us')
+    for ghost in (False, True):
+        elapsed = measure_render(game_manager, args.frames, args.seed, ghost)
+        print(f'render ghost {"on " if ghost else "off"}: {elapsed * 1e6:8.1f} us/frame')
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
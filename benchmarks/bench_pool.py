@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 07:20:48
+Contact     : zoe4896@outlook.com
+Description : 共享内存场地池的扩展性测试：1到全部核心的工作进程推进同一批对局，
+              与每次同步都经管道发回记录（pickle）的方式对比
+              用法：python -m benchmarks.bench_pool --games 256 --ticks 600 --sync 1
+                    python -m benchmarks.bench_pool --workers 1 2 4 8
+'''
+import os
+import time
+import argparse
+from boardpool import BoardPool, RolloutWorkers
+
+def bench(config_path, workers, transport, games, ticks, sync, strategy):
+    with BoardPool(games, 20, 10) as pool:
+        with RolloutWorkers(pool, workers, config_path, strategy, max_ticks=ticks, transport=transport) as runner:
+            runner.reset(range(games))
+            start = time.perf_counter()
+            steps = 0
+            while not runner.done():
+                runner.step(sync)
+                steps += 1
+                # 主进程每次同步后读取全部对局的分数
+                pool.records['score'].sum()
+            elapsed = time.perf_counter() - start
+            total = int(pool.records['ticks'].sum())
+    return total / elapsed, elapsed / steps * 1e3
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--workers', type=int, nargs='*', default=None, help='默认1到全部核心')
+    parser.add_argument('--games', type=int, default=256)
+    parser.add_argument('--ticks', type=int, default=600, help='每局最多推进的逻辑帧数')
+    parser.add_argument('--sync', type=int, default=1, help='每次同步推进的逻辑帧数')
+    parser.add_argument('--strategy', default='random')
+    args = parser.parse_args()
+
+    cores = os.cpu_count()
+    counts = args.workers or sorted({1, *(2 ** k for k in range(1, cores.bit_length())), cores})
+    print(f'{args.games} games x {args.ticks} ticks, sync every {args.sync} ticks, {cores} cores')
+    print(f'{"workers":>8}{"transport":>10}{"ticks/sec":>12}{"speedup":>9}{"ms/sync":>9}')
+    base = {}
+    for workers in counts:
+        for transport in ('shm', 'pipe'):
+            rate, per_sync = bench(args.config, workers, transport, args.games, args.ticks, args.sync, args.strategy)
+            base.setdefault(transport, rate)
+            print(f'{workers:>8}{transport:>10}{rate:>12.0f}{rate / base[transport]:>8.2f}x{per_sync:>9.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 20:55:40
+Contact     : zoe4896@outlook.com
+Description : 性能分析器开销：无界面对局开启/关闭逐系统计时的ticks/sec
+              用法：python -m benchmarks.bench_profiler
+'''
+import time
+import argparse
+from headless import HeadlessGame
+from profiler import FrameProfiler
+from strategies import random_strategy
+
+def run(games, profiled, track_alloc=False):
+    game = HeadlessGame()
+    profiler = FrameProfiler(game.config.FPS, track_alloc=track_alloc) if profiled else None
+    ticks = 0
+    start = time.perf_counter()
+    for seed in range(games):
+        game.reset(seed)
+        if profiler is not None:
+            profiler.instrument(game.systems)
+        policy = random_strategy(seed)
+        while not game.done:
+            if profiler is not None:
+                profiler.begin_frame()
+            game.step(policy(game) or ())
+            if profiler is not None:
+                profiler.end_frame()
+        ticks += game.tick
+    return ticks / (time.perf_counter() - start), profiler
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, default=50)
+    args = parser.parse_args()
+
+    base, _ = run(args.games, False)
+    profiled, _ = run(args.games, True)
+    with_alloc, profiler = run(args.games, True, track_alloc=True)
+    print(profiler.report())
+    print(f'ticks/sec off: {base:.0f}')
+    print(f'timing on:       {profiled:.0f} ({(1 / profiled - 1 / base) * 1e6:.1f} us/tick)')
+    print(f'timing + alloc:  {with_alloc:.0f} ({(1 / with_alloc - 1 / base) * 1e6:.1f} us/tick)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 17:35:02
+Contact     : zoe4896@outlook.com
+Description : 渲染耗时：整帧重绘 vs 脏矩形增量重绘
+              用法：SDL_VIDEODRIVER=dummy python -m benchmarks.bench_render
+'''
+import time
+import argparse
+import pygame
+from manager import GameManager, Systems
+from headless import HeadlessGame
+from strategies import drop_strategy
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    game_manager = GameManager(args.config)
+    for mode in ('full', 'dirty'):
+        # 用无界面对局产生状态，渲染系统绘制到真实屏幕
+        game = HeadlessGame(game_manager=game_manager, seed=args.seed)
+        render = Systems(game_manager).sys_render
+        policy = drop_strategy(args.seed)
+        elapsed = 0.0
+        pixels = 0
+        for _ in range(args.frames):
+            if game.done:
+                game.reset(args.seed)
+            game.step(policy(game))
+            start = time.perf_counter()
+            if mode == 'full':
+                render._map_version = None
+            rects = render.process(game.entities.entity_manager)
+            pygame.display.update(rects)
+            elapsed += time.perf_counter() - start
+            pixels += sum(rect.width * rect.height for rect in rects)
+        print(f'{mode:<6} {elapsed / args.frames * 1e6:8.1f} us/frame  {pixels / args.frames:10.0f} px/frame updated')
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 21:37:12
+Contact     : zoe4896@outlook.com
+Description : 录像：录制开销、录像大小、重放速度（相对实时倍数）、定位延迟，
+              以及新打开录像后第一次定位（有/无定位快照索引）的延迟与索引大小
+              用法：python -m benchmarks.bench_replay --games 20 --apm 150
+'''
+import time
+import random
+import argparse
+from headless import HeadlessGame
+from replay import Replay, ReplayRecorder, ReplayPlayer
+
+# 按每分钟操作数随机按键，模拟人类玩家的输入密度
+def apm_strategy(seed, apm, fps):
+    rng = random.Random(seed)
+    rate = apm / 60 / fps
+    actions = ('left', 'right', 'down', 'rotate', 'left', 'right', 'rotate', 'hard_drop')
+    def policy(game):
+        if rng.random() < rate:
+            return rng.choice(actions)
+        return None
+    return policy
+
+def play(game, seeds, apm, max_ticks, record):
+    replays = []
+    ticks = 0
+    start = time.perf_counter()
+    for seed in seeds:
+        game.reset(seed)
+        recorder = ReplayRecorder.attach(game) if record else None
+        game.run(apm_strategy(seed, apm, game.config.FPS), max_ticks)
+        ticks += game.tick
+        if recorder is not None:
+            replays.append(recorder.finish(game.tick))
+    return ticks, time.perf_counter() - start, replays
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--apm', type=float, default=150)
+    parser.add_argument('--max-ticks', type=int, default=36000)
+    parser.add_argument('--seeks', type=int, default=200)
+    args = parser.parse_args()
+
+    game = HeadlessGame(args.config)
+    fps = game.config.FPS
+    seeds = range(args.games)
+    ticks, base, _ = play(game, seeds, args.apm, args.max_ticks, False)
+    _, recorded, replays = play(game, seeds, args.apm, args.max_ticks, True)
+    size = sum(len(replay.to_bytes()) for replay in replays)
+    print(f'games: {args.games}  ticks: {ticks}  ({ticks / fps / 60:.1f} min of play)')
+    print(f'record overhead: {(recorded - base) / ticks * 1e9:.0f} ns/tick  size: {size} bytes ({size * 8 / ticks:.2f} bits/tick)')
+
+    start = time.perf_counter()
+    players = []
+    for replay in replays:
+        player = ReplayPlayer(replay, game_manager=game.game_manager)
+        player.run()
+        players.append(player)
+    elapsed = time.perf_counter() - start
+    print(f'replay: {ticks / elapsed:.0f} ticks/sec  {ticks / fps / elapsed:.0f}x real time')
+
+    rng = random.Random(0)
+    worst = 0
+    start = time.perf_counter()
+    for _ in range(args.seeks):
+        player = rng.choice(players)
+        seek_start = time.perf_counter()
+        player.seek(rng.randrange(player.replay.ticks + 1))
+        worst = max(worst, time.perf_counter() - seek_start)
+    elapsed = time.perf_counter() - start
+    print(f'seek: {elapsed / args.seeks * 1e3:.2f} ms avg  {worst * 1e3:.2f} ms max')
+
+    # 新打开录像（从文件字节读入）后的第一次定位，包括创建播放器与载入索引
+    indexed = []
+    for replay, player in zip(replays, players):
+        player.build_index()
+        indexed.append(Replay(replay.seed, replay.ticks, replay.data, replay.config_hash, player.dump_index()))
+    index_size = sum(len(replay.index[1]) for replay in indexed)
+    for name, group in (('without index', replays), ('with index', indexed)):
+        rng = random.Random(0)
+        buffers = [replay.to_bytes() for replay in group]
+        worst = 0
+        start = time.perf_counter()
+        for _ in range(args.seeks):
+            buffer = rng.choice(buffers)
+            seek_start = time.perf_counter()
+            player = ReplayPlayer(Replay.from_bytes(buffer), game_manager=game.game_manager)
+            player.seek(rng.randrange(player.replay.ticks + 1))
+            worst = max(worst, time.perf_counter() - seek_start)
+        elapsed = time.perf_counter() - start
+        print(f'cold seek {name}: {elapsed / args.seeks * 1e3:.2f} ms avg  {worst * 1e3:.2f} ms max')
+    print(f'index size: {index_size} bytes ({index_size / len(indexed):.0f} per replay)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 02:05:16
+Contact     : zoe4896@outlook.com
+Description : 固定步长调度：不同渲染耗时下的逻辑帧率、渲染帧率与输入到显示延迟
+              用法：SDL_VIDEODRIVER=dummy python -m benchmarks.bench_scheduler --seconds 3
+'''
+import time
+import random
+import argparse
+import pygame
+from game import Game
+from scheduler import FixedStepScheduler
+
+KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN, pygame.K_UP)
+
+def run(config, seconds, render_ms, render_fps, seed):
+    game = Game(config, seed=seed)
+    fps = game.game_manager.config.FPS
+    game.scheduler = scheduler = FixedStepScheduler(fps, render_fps)
+    rng = random.Random(seed)
+    handle_events = game._handle_events
+    render = game._render
+    deadline = time.perf_counter() + seconds
+    def events():
+        # 模拟按键，到时间后退出
+        if time.perf_counter() >= deadline:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        elif rng.random() < 0.1:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=rng.choice(KEYS)))
+        handle_events()
+    def slow_render():
+        # 模拟耗时的渲染
+        render()
+        time.sleep(render_ms / 1000)
+    game._handle_events = events
+    game._render = slow_render
+    game.run()
+    p50, _, p99 = scheduler.latency()
+    print(f'render {render_ms:>3} ms  cap {render_fps or "-":>3}: {scheduler.ticks / seconds:6.1f} ticks/sec  '
+          f'{scheduler.frames / seconds:6.1f} frames/sec  dropped ticks {scheduler.dropped_ticks:>4}  latency p50 {p50:6.1f} ms  p99 {p99:6.1f} ms')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for render_ms, render_fps in ((0, 0), (0, 30), (20, 0), (40, 0), (120, 0)):
+        run(args.config, args.seconds, render_ms, render_fps, args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 22:41:05
+Contact     : zoe4896@outlook.com
+Description : 落点搜索吞吐量：每秒评估的落点数与单步决策延迟
+              用法：python -m benchmarks.bench_search --positions 500
+'''
+import time
+import argparse
+import numpy as np
+from headless import HeadlessGame
+from search import Planner
+from cache import TranspositionCache
+from strategies import search_strategy
+from component import PositionComponent, ShapeComponent, StateComponent
+
+def collect_positions(game, count, seed):
+    # 用搜索策略对局，记录每个新方块出现时的局面
+    positions = []
+    block = None
+    policy = search_strategy(seed)
+    while len(positions) < count:
+        if game.done:
+            seed += 1
+            game.reset(seed)
+            policy = search_strategy(seed)
+        entities = game.entities.entity_manager
+        shape = entities['block'].get_component(ShapeComponent)
+        if shape is not block and entities['block'].get_component(StateComponent).active:
+            block = shape
+            position = entities['block'].get_component(PositionComponent)
+            next_id = entities['next_block'].get_component(ShapeComponent).piece_id
+            positions.append((game.map.map.copy(), shape.piece_id, shape.rotation, position.x, position.y, next_id, game.map.board.hash, game.map.board.contour.copy()))
+        game.step(policy(game) or ())
+    return positions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--positions', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    game = HeadlessGame(args.config, args.seed)
+    positions = collect_positions(game, args.positions, args.seed)
+    config = game.config
+    for beam_width in (0, 4, 8):
+        for cached in (False, True):
+            cache = TranspositionCache.from_config(config) if cached else None
+            planner = Planner(game.game_manager.piece_table, config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH, beam_width=beam_width, cache=cache)
+            latencies = []
+            start = time.perf_counter()
+            for position in positions:
+                move_start = time.perf_counter()
+                planner.search(*position)
+                latencies.append(time.perf_counter() - move_start)
+            elapsed = time.perf_counter() - start
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+            line = (f'beam {beam_width} cache {"on " if cached else "off"}: {planner.evaluated / elapsed:.0f} placements/sec  '
+                    f'{planner.evaluated / len(positions):.0f} per move  {len(positions) / elapsed:.0f} moves/sec  p50 {p50:.2f} ms  p99 {p99:.2f} ms')
+            if cache is not None:
+                line += f'  hit rate {cache.hit_rate:.1%}'
+            print(line)
+
+if __name__ == '__main__':
+    main()
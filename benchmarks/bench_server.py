@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 03:20:44
+Contact     : zoe4896@outlook.com
+Description : 游戏服务器压测：N个客户端随机发送动作并接收增量，另有不读数据的慢客户端
+              用法：python -m benchmarks.bench_server --clients 200 --seconds 20
+                    python -m benchmarks.bench_server --connect 127.0.0.1:7777
+'''
+import time
+import socket
+import random
+import asyncio
+import argparse
+import numpy as np
+from server import GameServer, read_frame, HELLO, FRAME
+from replay import ACTION_CODES
+from headless import ACTIONS
+
+# 只发送移动类动作，避免暂停/重开
+CODES = bytes(ACTION_CODES[action] for action in ACTIONS[:5])
+# 慢客户端不加速下落，对局持续得更久
+SLOW_CODES = bytes(ACTION_CODES[action] for action in ('left', 'right', 'rotate'))
+
+class Client:
+    def __init__(self, seed, height, width) -> None:
+        self.seed = seed
+        self.grid = np.zeros(height * width, dtype=np.uint8)
+        self.frames = 0
+        self.bytes = 0
+        self.sent = 0
+
+async def connect(host, port, seed, rcvbuf=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, (host, port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    writer.write(HELLO.pack(seed))
+    return reader, writer
+
+async def run_client(client, host, port, rate, stop):
+    reader, writer = await connect(host, port, client.seed)
+    rng = random.Random(client.seed)
+    async def receive():
+        while True:
+            _, _, _, _, palette, cells = await read_frame(reader)
+            client.grid[cells['index']] = cells['color']
+            client.frames += 1
+            client.bytes += FRAME.size + palette.nbytes + cells.nbytes
+    receiver = asyncio.get_running_loop().create_task(receive())
+    try:
+        while not stop.is_set():
+            # 按泊松过程发送动作
+            await asyncio.sleep(rng.expovariate(rate))
+            writer.write(bytes((rng.choice(CODES),)))
+            client.sent += 1
+        await asyncio.sleep(0.3)
+    finally:
+        receiver.cancel()
+        writer.close()
+
+async def run_slow_client(host, port, seed, rate, stop):
+    # 接收缓冲很小且停止读取，只发送动作，服务器端发送缓冲逐渐积压
+    reader, writer = await connect(host, port, seed, rcvbuf=1024)
+    writer.transport.pause_reading()
+    rng = random.Random(seed)
+    try:
+        while not stop.is_set():
+            await asyncio.sleep(rng.expovariate(rate))
+            writer.write(bytes((rng.choice(SLOW_CODES),)))
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def bench(args):
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(':', 1)
+        port = int(port)
+    else:
+        server = GameServer(args.config, port=0)
+        server.high_water = args.high_water_kb * 1024
+        await server.start()
+        host, port = server.host, server.port
+        config = server.config
+    height, width = (config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH) if server else (20, 10)
+    stop = asyncio.Event()
+    clients = [Client(seed, height, width) for seed in range(args.clients)]
+    tasks = [asyncio.ensure_future(run_client(client, host, port, args.rate, stop)) for client in clients]
+    tasks += [asyncio.ensure_future(run_slow_client(host, port, args.clients + i, args.slow_rate, stop)) for i in range(args.slow)]
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.seconds:
+        await asyncio.sleep(1)
+        if server is not None and args.verbose:
+            print(server.metrics())
+    elapsed = time.perf_counter() - start
+    metrics = server.metrics() if server is not None else None
+    if server is not None:
+        # 停止推进，等客户端收完在途的帧后核对画面
+        server._tick_task.cancel()
+    stop.set()
+    await asyncio.sleep(0.2)
+    if server is not None:
+        by_seed = {session.game.seed: session for session in server.sessions.values()}
+        mismatched = sum(
+            not np.array_equal(client.grid, server.sent[by_seed[client.seed].slot].ravel())
+            for client in clients if client.seed in by_seed
+        )
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    frames = sum(client.frames for client in clients)
+    received = sum(client.bytes for client in clients)
+    sent = sum(client.sent for client in clients)
+    print(f'clients: {args.clients} (+{args.slow} slow)  {elapsed:.1f} s')
+    print(f'client: {sent / elapsed:.0f} actions/sec sent  {frames / elapsed:.0f} frames/sec  {received / elapsed / 1024:.1f} KB/sec  {received / max(frames, 1):.1f} B/frame')
+    if metrics is not None:
+        print(f'server: {metrics["ticks"] / elapsed:.1f} ticks/sec  tick p50 {metrics["tick_ms_p50"]:.2f} ms  p99 {metrics["tick_ms_p99"]:.2f} ms  '
+              f'load {metrics["load"]:.0%}  sessions/core {metrics["sessions_per_core"]:.0f}')
+        print(f'server: dropped ticks {metrics["dropped_ticks"]}  dropped actions {metrics["actions_dropped"]}  '
+              f'coalesced frames {metrics["frames_coalesced"]}  stalled clients {metrics["stalled"]}')
+        print(f'client grids matching server: {args.clients - mismatched}/{args.clients}')
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--connect', default=None, help='压测已运行的服务器 host:port，默认在进程内启动')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--slow', type=int, default=2, help='不读取数据的慢客户端数')
+    parser.add_argument('--rate', type=float, default=8.0, help='每个客户端每秒动作数')
+    parser.add_argument('--slow-rate', type=float, default=30.0, help='每个慢客户端每秒动作数')
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--high-water-kb', type=int, default=2, help='进程内服务器的发送缓冲高水位，调小使慢客户端较快触发背压')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 00:21:37
+Contact     : zoe4896@outlook.com
+Description : 快照：snapshot/restore每秒次数与rollout吞吐量
+              用法：python -m benchmarks.bench_snapshot
+'''
+import time
+import random
+import argparse
+from headless import HeadlessGame, ACTIONS
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--cycles', type=int, default=20000)
+    parser.add_argument('--rollouts', type=int, default=500)
+    parser.add_argument('--depth', type=int, default=60, help='每次rollout的帧数')
+    args = parser.parse_args()
+
+    game = HeadlessGame(args.config, seed=0)
+    rng = random.Random(0)
+    # 先走到有一定堆叠的局面
+    while game.pieces < 20 and not game.done:
+        game.step(rng.choice(ACTIONS[:5]) if rng.random() < 0.2 else ())
+
+    start = time.perf_counter()
+    for _ in range(args.cycles):
+        snapshot = game.snapshot()
+    snapshot_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(args.cycles):
+        game.restore(snapshot)
+    restore_elapsed = time.perf_counter() - start
+    print(f'snapshot: {args.cycles / snapshot_elapsed:.0f}/sec ({snapshot_elapsed / args.cycles * 1e6:.1f} us)')
+    print(f'restore:  {args.cycles / restore_elapsed:.0f}/sec ({restore_elapsed / args.cycles * 1e6:.1f} us)')
+
+    ticks = 0
+    start = time.perf_counter()
+    for _ in range(args.rollouts):
+        game.restore(snapshot)
+        for _ in range(args.depth):
+            game.step(rng.choice(ACTIONS[:5]) if rng.random() < 0.2 else ())
+        ticks += args.depth
+    elapsed = time.perf_counter() - start
+    print(f'rollouts: {args.rollouts / elapsed:.0f}/sec of {args.depth} ticks ({ticks / elapsed:.0f} ticks/sec)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 09:12:05
+Contact     : zoe4896@outlook.com
+Description : 方块生成：方块队列的批量生成速度，锁定到生成新方块（消行 + 生成）的延迟，
+              以及平均每个方块新建的实体与组件数（含每局开始时创建的两个方块）；
+              与每次新建预览方块实体和组件的生成方式对比
+              用法：python -m benchmarks.bench_spawn --games 200
+'''
+import time
+import argparse
+import numpy as np
+from piecequeue import QUEUE_MODES, generate
+from headless import HeadlessGame
+from strategies import drop_strategy
+from system import SpawnSystem
+from component import PositionComponent, SpeedComponent, ShapeComponent, ColorComponent, StateComponent, MapComponent, NextComponent
+
+# 对照：每个方块新建预览方块实体与全部组件
+class AllocatingSpawnSystem(SpawnSystem):
+    def process(self, entity_manager):
+        map_mat = entity_manager.single(MapComponent)
+        entity_manager['next_block'].remove_component(NextComponent)
+        entity_manager.rename_entity('next_block', 'block')
+        piece_id, color = self.queue.next()
+        shape = ShapeComponent(self.piece_table, piece_id)
+        entity = entity_manager.create_entity('next_block')
+        entity.add_component(PositionComponent(self.paly_field_width // 2 - shape.width // 2, 0))
+        entity.add_component(SpeedComponent(0, map_mat.drop_speed, self.config.HARD_DROP_SPEED))
+        entity.add_component(shape)
+        entity.add_component(ColorComponent(map_mat.palette, color))
+        entity.add_component(StateComponent(lock_delay_frames=self.config.LOCK_DELAY_FRAMES))
+        entity.add_component(NextComponent())
+
+def bench_queue(mode, count):
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    generate(count, 7, mode, rng)
+    return count / (time.perf_counter() - start)
+
+def bench_spawn(config_path, games, allocating):
+    game = HeadlessGame(config_path)
+    samples = []
+    objects = []
+    def timed(game):
+        # 锁定事件的处理：消行 + 生成新方块
+        systems = game.systems
+        if allocating:
+            spawn = systems.sys_spawn
+            systems.sys_spawn = AllocatingSpawnSystem(spawn.piece_table, spawn.config, spawn.queue)
+        clear_line, spawn = systems.sys_clear_line.process, systems.sys_spawn.process
+        def process_clear(entity_manager):
+            timed.start = time.perf_counter_ns()
+            clear_line(entity_manager)
+        def process_spawn(entity_manager):
+            spawn(entity_manager)
+            samples.append(time.perf_counter_ns() - timed.start)
+            # 保留引用，id不会被复用
+            entity = entity_manager['next_block']
+            objects.append(entity)
+            objects.extend(entity.components.values())
+        systems.sys_clear_line.process = process_clear
+        systems.sys_spawn.process = process_spawn
+    pieces = 0
+    for seed in range(games):
+        game.reset(seed)
+        timed(game)
+        game.run(drop_strategy(seed), 20000)
+        pieces += game.pieces
+    samples = np.array(samples) / 1e3
+    unique = len({id(obj) for obj in objects})
+    return pieces, np.percentile(samples, 50), np.percentile(samples, 99), unique / pieces
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--count', type=int, default=10 ** 6, help='队列生成测试的方块数')
+    args = parser.parse_args()
+
+    for mode in QUEUE_MODES:
+        print(f'queue {mode:<8}{bench_queue(mode, args.count) / 1e6:>8.1f}M pieces/sec')
+    print(f'{"spawn":<12}{"pieces":>8}{"p50 us":>9}{"p99 us":>9}{"new objects/piece":>19}')
+    for name, allocating in (('pooled', False), ('allocating', True)):
+        pieces, p50, p99, created = bench_spawn(args.config, args.games, allocating)
+        print(f'{name:<12}{pieces:>8}{p50:>9.1f}{p99:>9.1f}{created:>19.2f}')
+
+if __name__ == '__main__':
+    main()
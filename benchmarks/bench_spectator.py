@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 04:31:09
+Contact     : zoe4896@outlook.com
+Description : 观战网格渲染耗时：64~256块场地同屏时每帧的渲染时间
+              用法：SDL_VIDEODRIVER=dummy python -m benchmarks.bench_spectator
+'''
+import time
+import argparse
+import numpy as np
+import pygame
+from manager import GameManager
+from headless import HeadlessGame
+from spectator import SpectatorGrid
+from strategies import drop_strategy
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--size', default='1280x720')
+    args = parser.parse_args()
+
+    game_manager = GameManager(args.config, headless=True)
+    pygame.init()
+    screen = pygame.display.set_mode(tuple(int(v) for v in args.size.split('x')))
+    for count in (64, 144, 256):
+        games = [HeadlessGame(seed=seed, game_manager=game_manager) for seed in range(count)]
+        policies = [drop_strategy(seed) for seed in range(count)]
+        grid = SpectatorGrid(screen, game_manager.config, count)
+        step_elapsed = 0.0
+        render_times = []
+        for _ in range(args.frames):
+            start = time.perf_counter()
+            for game, policy in zip(games, policies):
+                if game.done:
+                    game.reset(game.seed)
+                game.step(policy(game))
+            step_elapsed += time.perf_counter() - start
+            start = time.perf_counter()
+            pygame.display.update(grid.render([game.map for game in games]))
+            render_times.append(time.perf_counter() - start)
+        p50, p99 = np.percentile(render_times, [50, 99]) * 1e3
+        print(f'{count:>3} boards ({grid.size[0]}x{grid.size[1]}, {grid.block_size}px cells): render p50 {p50:.2f} ms  p99 {p99:.2f} ms  '
+              f'({1000 / p50:.0f} fps)  simulation {step_elapsed / args.frames * 1e3:.2f} ms/tick')
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
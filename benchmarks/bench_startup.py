@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 08:31:27
+Contact     : zoe4896@outlook.com
+Description : 启动与重新开始的耗时：新进程中导入并创建无界面对局/窗口对局（子进程计时），
+              以及同一进程内重新开始（Game._init）的耗时
+              用法：SDL_VIDEODRIVER=dummy python -m benchmarks.bench_startup --runs 20
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# 在子进程中执行，打印各阶段耗时与已导入的重模块
+PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+{create}
+created = time.perf_counter()
+print(json.dumps([imported - start, created - imported, 'pygame' in sys.modules, 'yaml' in sys.modules]))
+'''
+
+CASES = {
+    'headless': ('from headless import HeadlessGame', "HeadlessGame({config!r}, seed=0)"),
+    'batch': ('from batch import BatchEnv', "BatchEnv(64, {config!r}, seed=0)"),
+    'window': ('from game import Game', "Game({config!r}, seed=0)"),
+}
+
+def cold_start(case, config_path, runs):
+    imports, create = CASES[case]
+    code = PROBE.format(imports=imports, create=create.format(config=config_path))
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+        total = time.perf_counter() - start
+        samples.append((total, *json.loads(out.strip().splitlines()[-1])))
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def restart(config_path, runs):
+    from game import Game
+    game = Game(config_path, seed=0)
+    start = time.perf_counter()
+    for _ in range(runs):
+        game._init()
+    return (time.perf_counter() - start) / runs
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--runs', type=int, default=20, help='每种情况启动的进程数（取中位数）')
+    parser.add_argument('--restarts', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f'{"":<10}{"process ms":>12}{"import ms":>11}{"create ms":>11}{"pygame":>8}{"yaml":>6}')
+    for case in CASES:
+        total, imported, created, pygame_loaded, yaml_loaded = cold_start(case, args.config, args.runs)
+        print(f'{case:<10}{total * 1e3:>12.1f}{imported * 1e3:>11.1f}{created * 1e3:>11.1f}{str(pygame_loaded):>8}{str(yaml_loaded):>6}')
+    print(f'restart (Game._init): {restart(args.config, args.restarts) * 1e3:.3f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 16:48:30
+Contact     : zoe4896@outlook.com
+Description : 锦标赛进程池扩展性（1到全部核心的games/sec）
+              用法：python -m benchmarks.bench_tournament --games 400
+'''
+import os
+import time
+import argparse
+import tempfile
+from tournament import Tournament
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, default=400)
+    parser.add_argument('--strategy', default='drop')
+    args = parser.parse_args()
+
+    cores = os.cpu_count()
+    workers = sorted({1, 2, 4, 8, 16, 32, cores} & set(range(1, cores + 1)))
+    jobs = [(args.strategy, seed) for seed in range(args.games)]
+    base = None
+    print(f'{"workers":>8}{"games/sec":>12}{"speedup":>10}')
+    for n in workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            Tournament(jobs, os.path.join(tmp, 'results.jsonl'), workers=n).run()
+            rate = args.games / (time.perf_counter() - start)
+        base = base or rate
+        print(f'{n:>8}{rate:>12.1f}{rate / base:>10.2f}')
+
+if __name__ == '__main__':
+    main()
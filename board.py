@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 11:12:25
+Contact     : zoe4896@outlook.com
+Description : 场地（已锁定方块）的存储后端
+              ArrayBoard: NumPy int矩阵，逐格计算交给kernels.py的实现
+              BitBoard:   每行一个整数位掩码，第c列对应第c位
+              两种后端都维护增量更新的Zobrist哈希（board.hash）与列高/空洞数（board.contour）
+'''
+import numpy as np
+from zobrist import zobrist_table
+from kernels import NumpyKernels, make_kernels
+
+# 列高与空洞数，锁定、消行时增量更新
+# heights[c]: 第c列最高已占格到底边的格数；holes: 各列最高格以下的空格总数；stack: 最大列高
+class Contour:
+    def __init__(self, height, width, heights=None, holes=0, stack=None) -> None:
+        self.height = height
+        self.width = width
+        self.heights = [0] * width if heights is None else list(heights)
+        self.holes = holes
+        self.stack = max(self.heights) if stack is None else stack
+
+    @classmethod
+    def from_cells(cls, cells):
+        cells = np.asarray(cells) != 0
+        height, width = cells.shape
+        heights = np.where(cells.any(axis=0), height - cells.argmax(axis=0), 0)
+        return cls(height, width, heights.tolist(), int(heights.sum() - cells.sum()))
+
+    def lock(self, piece, x, y, filled):
+        # filled: 新占格子数（与已锁定方块重叠的格子不算）
+        # 新占格子要么填上原有空洞，要么位于新增的列高范围内，空洞变化 = 各列新增高度之和 - 新占格子数
+        heights = self.heights
+        holes = self.holes - filled
+        for c, r in enumerate(piece.top):
+            if r >= 0:
+                h = self.height - y - r
+                old = heights[x + c]
+                if h > old:
+                    holes += h - old
+                    heights[x + c] = h
+                    if h > self.stack:
+                        self.stack = h
+        self.holes = holes
+
+    def drop_row(self, piece, x, y, landed):
+        # 方块从(x, y)竖直下落后停住的行：方块底部轮廓在各列最高格之上时直接由列高算出，
+        # 挂在悬空方块下面时按landed(piece, x, y)逐行下落
+        height = self.height
+        heights = self.heights
+        row = height - piece.height
+        for c, r in enumerate(piece.bottom):
+            if r >= 0:
+                top = height - heights[x + c]
+                if y + r >= top:
+                    while not landed(piece, x, y):
+                        y += 1
+                    return y
+                if top - 1 - r < row:
+                    row = top - 1 - r
+        return row
+
+    def clear(self, rows, filled):
+        # rows: 消除的满行；filled(row, col): 消行后的场地格子是否已占
+        # 满行不含空洞，最高格在最高消除行之上的列高度减少len(rows)；
+        # 最高格就在最高消除行上的列向下找新的最高格，跳过的空格不再是空洞
+        heights = self.heights
+        count = len(rows)
+        top = self.height - min(rows)
+        for c in range(self.width):
+            h = heights[c] - count
+            if heights[c] <= top:
+                row = self.height - h
+                while row < self.height and not filled(row, c):
+                    row += 1
+                    self.holes -= 1
+                h = self.height - row
+            heights[c] = h
+        self.stack = max(heights)
+
+    def copy(self):
+        return Contour(self.height, self.width, self.heights, self.holes, self.stack)
+
+    def snapshot(self):
+        return tuple(self.heights), self.holes, self.stack
+
+    def restore(self, state):
+        heights, self.holes, self.stack = state
+        self.heights = list(heights)
+
+# NumPy矩阵场地
+class ArrayBoard:
+    def __init__(self, height, width, cells=None, hash=None, contour=None, kernels=NumpyKernels) -> None:
+        self.height = height
+        self.width = width
+        self.kernels = kernels
+        self._cells = np.zeros((height, width), dtype=int) if cells is None else cells
+        self.zobrist = zobrist_table(height, width)
+        self.hash = self.zobrist.cells(self._cells) if hash is None else hash
+        if contour is None:
+            contour = Contour(height, width) if cells is None else Contour.from_cells(cells)
+        self.contour = contour
+
+    def cells(self):
+        return self._cells
+
+    def hits(self, piece, x, y):
+        # 方块放在(x, y)时与已锁定方块重叠的方块列（第idx位对应方块第idx列），场地外视为空
+        if y + piece.height <= self.height - self.contour.stack:
+            # 整个方块在最高格之上
+            return 0
+        return self.kernels.hits(self._cells, piece, x, y)
+
+    def landed(self, piece, x, y):
+        # 按底部轮廓查询方块下方一格，触底或落在已锁定方块上
+        if y + piece.height >= self.height:
+            return True
+        if y + piece.height < self.height - self.contour.stack:
+            return False
+        return self.kernels.landed(self._cells, piece, x, y)
+
+    def drop_row(self, piece, x, y):
+        return self.contour.drop_row(piece, x, y, self.landed)
+
+    def region_empty(self, x, y, w, h):
+        # 区域完全在场地内且没有已锁定方块
+        if x < 0 or y < 0 or x + w > self.width or y + h > self.height:
+            return False
+        if y + h <= self.height - self.contour.stack:
+            return True
+        return not self._cells[y:y+h, x:x+w].any()
+
+    def lock(self, piece, x, y):
+        if not self._cells.flags.writeable:
+            # 与快照共享的只读矩阵，写前复制
+            self._cells = self._cells.copy()
+        # 哈希只异或新占格子的随机数
+        delta, filled = self.kernels.lock(self._cells, self.zobrist.keys, piece, x, y)
+        self.hash ^= delta
+        self.contour.lock(piece, x, y, filled)
+
+    def full_rows(self):
+        return self.kernels.full_rows(self._cells)
+
+    def clear_rows(self, rows):
+        # rows: 升序的满行下标（full_rows的结果）
+        if not len(rows):
+            return
+        if not self._cells.flags.writeable:
+            self._cells = self._cells.copy()
+        cells = self._cells
+        # 最低的消除行以上的行都发生了移动
+        top = int(rows[-1]) + 1
+        self.hash ^= self.zobrist.region(cells[:top])
+        self.kernels.clear_rows(cells, np.asarray(rows, dtype=np.int64))
+        self.hash ^= self.zobrist.region(cells[:top])
+        self.contour.clear(rows, lambda row, col: cells[row, col])
+
+    def stack_height(self):
+        return self.contour.stack
+
+    def copy(self):
+        return ArrayBoard(self.height, self.width, self._cells.copy(), self.hash, self.contour.copy(), self.kernels)
+
+    def snapshot(self):
+        # 只读共享当前矩阵，下次lock时复制
+        self._cells.flags.writeable = False
+        return self._cells, self.hash, self.contour.snapshot()
+
+    def restore(self, state):
+        self._cells, self.hash, contour = state
+        self.contour.restore(contour)
+
+# 位掩码场地
+class BitBoard:
+    def __init__(self, height, width, rows=None, hash=None, contour=None) -> None:
+        self.height = height
+        self.width = width
+        self.full_mask = (1 << width) - 1
+        # 每行按小端字节序展开所需的字节数
+        self.row_bytes = (width + 7) // 8
+        self.rows = [0] * height if rows is None else rows
+        self.zobrist = zobrist_table(height, width)
+        self.hash = self.zobrist.rows(self.rows) if hash is None else hash
+        if contour is None:
+            contour = Contour(height, width) if rows is None else Contour.from_cells(self.cells())
+        self.contour = contour
+
+    def cells(self):
+        # 各行转为小端字节后一次解包成位，第c位即第c列；宽度不受64位限制
+        row_bytes = self.row_bytes
+        data = np.frombuffer(b''.join([row.to_bytes(row_bytes, 'little') for row in self.rows]), dtype=np.uint8)
+        bits = np.unpackbits(data.reshape(self.height, row_bytes), axis=1, count=self.width, bitorder='little')
+        return bits.astype(int)
+
+    def hits(self, piece, x, y):
+        if y + piece.height <= self.height - self.contour.stack:
+            return 0
+        mask = 0
+        for r, row_mask in enumerate(piece.row_masks):
+            row = y + r
+            if 0 <= row < self.height:
+                # 将场地行平移到方块坐标系后求与
+                mask |= (self.rows[row] >> x if x >= 0 else self.rows[row] << -x) & row_mask
+        return mask
+
+    def drop_row(self, piece, x, y):
+        return self.contour.drop_row(piece, x, y, self.landed)
+
+    def region_empty(self, x, y, w, h):
+        if x < 0 or y < 0 or x + w > self.width or y + h > self.height:
+            return False
+        if y + h <= self.height - self.contour.stack:
+            return True
+        region = ((1 << w) - 1) << x
+        return not any(row & region for row in self.rows[y:y+h])
+
+    def landed(self, piece, x, y):
+        if y + piece.height >= self.height:
+            return True
+        if y + piece.height < self.height - self.contour.stack:
+            return False
+        for c, r in enumerate(piece.bottom):
+            if r >= 0 and 0 <= x + c < self.width and self.rows[y + r + 1] >> (x + c) & 1:
+                return True
+        return False
+
+    def lock(self, piece, x, y):
+        zobrist = self.zobrist
+        filled = 0
+        for r, row_mask in enumerate(piece.row_masks):
+            row = self.rows[y + r]
+            self.rows[y + r] = locked = row | row_mask << x
+            self.hash ^= zobrist.row(y + r, row) ^ zobrist.row(y + r, locked)
+            filled += bin(locked ^ row).count('1')
+        self.contour.lock(piece, x, y, filled)
+
+    def full_rows(self):
+        full_mask = self.full_mask
+        return [idx for idx, row in enumerate(self.rows) if row == full_mask]
+
+    def clear_rows(self, rows):
+        if not len(rows):
+            return
+        rows = set(rows)
+        kept = [row for idx, row in enumerate(self.rows) if idx not in rows]
+        cleared = [0] * (self.height - len(kept)) + kept
+        top = max(rows) + 1
+        self.hash ^= self.zobrist.rows(self.rows[:top]) ^ self.zobrist.rows(cleared[:top])
+        self.rows = cleared
+        self.contour.clear(rows, lambda row, col: cleared[row] >> col & 1)
+
+    def stack_height(self):
+        return self.contour.stack
+
+    def copy(self):
+        return BitBoard(self.height, self.width, list(self.rows), self.hash, self.contour.copy())
+
+    def snapshot(self):
+        return tuple(self.rows), self.hash, self.contour.snapshot()
+
+    def restore(self, state):
+        rows, self.hash, contour = state
+        self.rows = list(rows)
+        self.contour.restore(contour)
+
+BOARD_BACKENDS = {
+    'array': ArrayBoard,
+    'bitboard': BitBoard,
+}
+
+def make_board(config, backend=None, kernels=None):
+    backend = backend or getattr(config, 'BOARD_BACKEND', 'array')
+    if backend not in BOARD_BACKENDS:
+        raise ValueError(f'unknown board backend: {backend}')
+    if backend == 'array':
+        return ArrayBoard(config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH, kernels=kernels or make_kernels(config))
+    return BOARD_BACKENDS[backend](config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH)
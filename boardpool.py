@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 06:55:31
+Contact     : zoe4896@outlook.com
+Description : 共享内存场地池：每局一条固定布局的记录，工作进程原地推进各自的记录段，主进程直接读取，不经过序列化
+'''
+import os
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from manager import GameManager
+from headless import HeadlessGame
+from strategies import STRATEGIES
+from component import PositionComponent, ShapeComponent
+
+FLAG_GAME_OVER = 1
+FLAG_PAUSED = 2
+FLAG_TRUNCATED = 4
+
+def record_dtype(height, width):
+    # cells: 已锁定方块与下落中方块的颜色索引（同MapComponent.color_map），0为空
+    return np.dtype([
+        ('cells', np.uint8, (height, width)),
+        ('seed', np.int64),
+        ('score', np.int64),
+        ('lines_cleared', np.int64),
+        ('pieces', np.int64),
+        ('ticks', np.int64),
+        ('x', np.int16),
+        ('y', np.int16),
+        ('piece', np.int8),
+        ('rotation', np.int8),
+        ('flags', np.uint8),
+    ], align=True)
+
+# 场地池
+# 记录数组直接建在SharedMemory上，spec（名称与形状）可以传给其他进程attach，得到同一块内存的视图。
+# 创建者负责unlink；attach的一方只close
+class BoardPool:
+    def __init__(self, count, height, width, name=None) -> None:
+        self.count = count
+        self.height = height
+        self.width = width
+        self.dtype = record_dtype(height, width)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, count * self.dtype.itemsize))
+        else:
+            # RolloutWorkers的子进程与创建者共用同一个resource_tracker，重复登记不影响创建者unlink
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.records = np.ndarray(count, dtype=self.dtype, buffer=self.shm.buf)
+        if self.owner:
+            self.records[...] = 0
+
+    @property
+    def spec(self):
+        return (self.shm.name, self.count, self.height, self.width)
+
+    @classmethod
+    def attach(cls, spec):
+        name, count, height, width = spec
+        return cls(count, height, width, name)
+
+    def close(self):
+        # 调用方持有的记录视图需先释放，否则共享内存无法关闭
+        self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def fields(records):
+    # 各字段的视图，逐条写入时不再每次按字段名取视图
+    return {name: records[name] for name in records.dtype.names}
+
+def publish(records, idx, game):
+    # 把对局当前状态写入第idx条记录，records为fields()的结果
+    map_mat = game.map
+    cells = records['cells'][idx]
+    cells[:] = map_mat.color_map
+    # 结束时新方块可能与已锁定的格子重叠，下落中的方块在上
+    np.copyto(cells, map_mat.active_color_map, where=map_mat.active_color_map != 0)
+    block = game.entities.entity_manager['block']
+    shape = block.get_component(ShapeComponent)
+    position = block.get_component(PositionComponent)
+    records['x'][idx] = position.x
+    records['y'][idx] = position.y
+    records['piece'][idx] = shape.piece_id
+    records['rotation'][idx] = shape.rotation
+    records['score'][idx] = map_mat.score
+    records['lines_cleared'][idx] = map_mat.lines_cleared
+    records['pieces'][idx] = game.pieces
+    records['ticks'][idx] = game.tick
+    records['flags'][idx] = (records['flags'][idx] & FLAG_TRUNCATED) | FLAG_GAME_OVER * map_mat.game_over | FLAG_PAUSED * map_mat.paused
+
+def _worker(conn, spec, start, stop, config_path, strategy, max_ticks, transport):
+    # 工作进程：负责记录[start, stop)；transport为'pipe'时记录在本进程内，每条命令后整段发回（对比用）
+    if transport == 'shm':
+        pool = BoardPool.attach(spec)
+        records = pool.records[start:stop]
+    else:
+        pool = None
+        records = np.zeros(stop - start, dtype=record_dtype(*spec[2:]))
+    views = fields(records)
+    game_manager = GameManager(config_path, headless=True)
+    games = []
+    policies = []
+    try:
+        while True:
+            command, arg = conn.recv()
+            if command == 'close':
+                break
+            if command == 'reset':
+                # 种子由主进程预先写入记录；pipe方式随命令发来
+                if arg is not None:
+                    records['seed'] = arg
+                seeds = records['seed'].tolist()
+                records['flags'] = 0
+                games = [HeadlessGame(seed=seed, game_manager=game_manager) for seed in seeds]
+                policies = [STRATEGIES[strategy](seed) for seed in seeds]
+                for idx, game in enumerate(games):
+                    publish(views, idx, game)
+            elif command == 'step':
+                # 每局推进arg个逻辑帧，已结束或达到max_ticks的对局跳过
+                for idx, (game, policy) in enumerate(zip(games, policies)):
+                    if views['flags'][idx] & (FLAG_GAME_OVER | FLAG_TRUNCATED):
+                        continue
+                    for _ in range(arg):
+                        if game.done or game.tick >= max_ticks:
+                            break
+                        action = policy(game)
+                        game.step(action if action is not None else ())
+                    if game.tick >= max_ticks and not game.done:
+                        views['flags'][idx] |= FLAG_TRUNCATED
+                    publish(views, idx, game)
+            conn.send(records if pool is None else None)
+    finally:
+        records = views = None
+        if pool is not None:
+            pool.close()
+        conn.close()
+
+# 多进程推进场地池
+# 记录按进程数平均分段，每个工作进程持有自己那一段的HeadlessGame；
+# 管道中只传递命令与完成通知，结果由主进程直接从pool.records读取
+class RolloutWorkers:
+    def __init__(self, pool, workers=None, config_path='config.yaml', strategy='random', max_ticks=200000, transport='shm') -> None:
+        if transport not in ('shm', 'pipe'):
+            raise ValueError(f'unknown transport: {transport}')
+        self.pool = pool
+        self.workers = workers or os.cpu_count()
+        self.transport = transport
+        bounds = np.linspace(0, pool.count, self.workers + 1).astype(int).tolist()
+        self.slices = list(zip(bounds[:-1], bounds[1:]))
+        self.conns = []
+        self.processes = []
+        for start, stop in self.slices:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(child, pool.spec, start, stop, config_path, strategy, max_ticks, transport),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def _command(self, command, args):
+        for conn, arg in zip(self.conns, args):
+            conn.send((command, arg))
+        for conn, (start, stop) in zip(self.conns, self.slices):
+            records = conn.recv()
+            if records is not None:
+                self.pool.records[start:stop] = records
+
+    def reset(self, seeds):
+        # 全部对局按seeds重新开始
+        seeds = np.asarray(seeds, dtype=np.int64)
+        if self.transport == 'shm':
+            self.pool.records['seed'] = seeds
+            self._command('reset', [None] * self.workers)
+        else:
+            self._command('reset', [seeds[start:stop] for start, stop in self.slices])
+
+    def step(self, ticks=1):
+        self._command('step', [ticks] * self.workers)
+
+    def done(self):
+        return bool((self.pool.records['flags'] & (FLAG_GAME_OVER | FLAG_TRUNCATED)).all())
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join()
+        for conn in self.conns:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
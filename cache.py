@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 23:24:50
+Contact     : zoe4896@outlook.com
+Description : 有界置换表/求值缓存，键一般为(场地Zobrist哈希, 方块, 旋转, ...)
+'''
+from collections import OrderedDict
+import numpy as np
+
+CACHE_POLICIES = ('lru', 'depth')
+
+# 每个条目的固定开销估计（字典项、键元组），字节
+ENTRY_OVERHEAD = 200
+
+def _sizeof(value):
+    # 估计缓存值占用的字节数，只计NumPy数组
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_sizeof(item) for item in value)
+    return 0
+
+# 置换表
+#   lru:   超过条目数或字节数上限时淘汰最久未用的条目
+#   depth: 按哈希分槽（max_entries个槽），冲突时新条目深度不低于旧条目才替换；
+#          超过字节数上限时不再写入
+class TranspositionCache:
+    def __init__(self, max_entries=65536, max_bytes=64 << 20, policy='lru') -> None:
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f'unknown cache policy: {policy}')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.entries = OrderedDict() if policy == 'lru' else {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            getattr(config, 'SEARCH_CACHE_ENTRIES', 65536),
+            int(getattr(config, 'SEARCH_CACHE_MB', 64) * (1 << 20)),
+            getattr(config, 'SEARCH_CACHE_POLICY', 'lru'),
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        if self.policy == 'lru':
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        else:
+            entry = self.entries.get(hash(key) % self.max_entries)
+            if entry is not None and entry[0] != key:
+                entry = None
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, depth=0):
+        size = _sizeof(value) + ENTRY_OVERHEAD
+        if self.policy == 'lru':
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[3]
+            self.entries[key] = (key, value, depth, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, old = self.entries.popitem(last=False)
+                self.bytes -= old[3]
+                self.evictions += 1
+        else:
+            slot = hash(key) % self.max_entries
+            old = self.entries.get(slot)
+            old_size = old[3] if old is not None else 0
+            if old is not None and old[0] != key and depth < old[2] or self.bytes - old_size + size > self.max_bytes:
+                self.rejected += 1
+                return
+            if old is not None and old[0] != key:
+                self.evictions += 1
+            self.entries[slot] = (key, value, depth, size)
+            self.bytes += size - old_size
+
+    def memoize(self, fn, key=None, depth=0):
+        # 包装任意求值函数：key(*args)得到缓存键，默认为参数元组
+        missing = object()
+        def cached(*args):
+            cache_key = key(*args) if key is not None else args
+            value = self.get(cache_key, missing)
+            if value is missing:
+                value = fn(*args)
+                self.put(cache_key, value, depth)
+            return value
+        return cached
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'policy': self.policy,
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+            'rejected': self.rejected,
+        }
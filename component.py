@@ -6,37 +6,89 @@ Date        : 2023/06/26 14:32:19
 Contact     : zoe4896@outlook.com
 Description : 
 '''
-import random
 import numpy as np
 
-# 定义组件
+# 定义组件，均使用__slots__避免实例字典
 class PositionComponent:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
 class SpeedComponent:
+    __slots__ = ('x', 'y', 'hard_drop_speed')
+
     def __init__(self, x, y, hard_drop_speed) -> None:
         self.x = x
         self.y = y
         self.hard_drop_speed = hard_drop_speed
     
 class ShapeComponent:
-    def __init__(self, shape):
-        self.shape = shape
-        self.width = len(shape[0])
-        self.height = len(shape)
+    # 只保存方块编号与旋转序号，形状数据从PieceTable中查询
+    __slots__ = ('piece_table', 'piece_id', 'rotation', 'rotate')
+
+    def __init__(self, piece_table, piece_id, rotation=0):
+        self.piece_table = piece_table
+        self.piece_id = piece_id
+        self.rotation = rotation
         self.rotate = False
-        self.rotate_shape = shape
-        self.rotate_width = len(shape[0])
-        self.rotate_height = len(shape)
+
+    @property
+    def piece(self):
+        return self.piece_table.get(self.piece_id, self.rotation)
+
+    @property
+    def shape(self):
+        return self.piece.cells
+
+    @property
+    def width(self):
+        return self.piece.width
+
+    @property
+    def height(self):
+        return self.piece.height
+
+    @property
+    def rotate_piece(self):
+        return self.piece_table.get(self.piece_id, self.rotation + 1)
+
+    @property
+    def rotate_shape(self):
+        return self.rotate_piece.cells
+
+    @property
+    def rotate_width(self):
+        return self.rotate_piece.width
+
+    @property
+    def rotate_height(self):
+        return self.rotate_piece.height
+
+# 颜色分量量化为6档（50~200，步长30），调色板最多216种颜色
+COLOR_LEVELS = 6
+COLOR_STEP = 30
 
 class ColorComponent:
-    def __init__(self):
-        self.color = (random.randint(50, 200), random.randint(50, 200), random.randint(50, 200))
+    __slots__ = ('color', 'index')
+
+    def __init__(self, palette, color):
+        # color: 量化后的RGB元组（见piecequeue.COLORS）
+        self.set(palette, color)
+
+    def set(self, palette, color):
+        self.color = color
+        self.index = palette.index(color)
 
 class StateComponent:
+    __slots__ = ('active', 'action', 'collision', 'collide_side', 'hard_drop', 'lock_delay_frames', 'is_blocked')
+
     def __init__(self, active=True, lock_delay_frames=30) -> None:
+        self.reset(active, lock_delay_frames)
+
+    def reset(self, active=True, lock_delay_frames=30):
+        # 生成方块时原地重置（SpawnSystem复用组件）
         self.active = active
         self.action = ''
         self.collision = False
@@ -45,18 +97,34 @@ class StateComponent:
         self.lock_delay_frames = lock_delay_frames
         self.is_blocked = False
 
+# 标记下一个方块（预览），下落中的方块不带此组件
+class NextComponent:
+    __slots__ = ()
+
 class MapComponent:
-    def __init__(self, map_mat, drop_speed, lock_delay_frames=30) -> None:
-        self.map = map_mat
-        self.active_map = np.zeros_like(self.map, dtype=int)
-        self.active_color_map = np.zeros_like(self.map, dtype=object)
-        self.color_map = np.zeros_like(self.map, dtype=object)
+    __slots__ = ('board', 'palette', 'active_map', 'active_color_map', 'color_map', 'height', 'lines_cleared',
+                 'paused', 'game_over', 'score', 'restart', 'drop_speed', 'lock_delay_frames', 'version')
+
+    def __init__(self, board, palette, drop_speed, lock_delay_frames=30) -> None:
+        # board: 场地存储后端（见board.py），所有系统通过其接口读写已锁定方块
+        self.board = board
+        # 颜色矩阵存调色板索引，0为空
+        self.palette = palette
+        self.active_map = np.zeros((board.height, board.width), dtype=int)
+        self.active_color_map = np.zeros_like(self.active_map, dtype=np.uint8)
+        self.color_map = np.zeros_like(self.active_map, dtype=np.uint8)
         self.height = 0
         self.lines_cleared = 0
-        self.empty_row = np.zeros((1, self.map.shape[1]), dtype=int)
         self.paused = False
         self.game_over = False
         self.score = 0
         self.restart = False
         self.drop_speed = drop_speed
-        self.lock_delay_frames = lock_delay_frames
\ No newline at end of file
+        self.lock_delay_frames = lock_delay_frames
+        # 已锁定方块每次变化（锁定、消行）加一，渲染据此判断是否重建背景
+        self.version = 0
+
+    @property
+    def map(self):
+        # 已锁定方块的0/1矩阵（渲染用）
+        return self.board.cells()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 07:42:16
+Contact     : zoe4896@outlook.com
+Description : 训练数据导出：(状态, 动作, 结果)逐帧写入按列存储、可内存映射的数据集目录
+              用法：python dataset.py --out data --strategy search --games 100
+                    python dataset.py --info data
+'''
+import os
+import json
+import argparse
+import numpy as np
+from replay import ACTION_CODES
+from batch import BATCH_ACTIONS
+from component import PositionComponent, ShapeComponent, MapComponent
+
+DATASET_VERSION = 1
+META = 'meta.json'
+# 没有动作的帧（同录像中未映射的按键）
+NO_ACTION = ACTION_CODES[None]
+BATCH_ACTION_CODES = np.array([ACTION_CODES[action] for action in BATCH_ACTIONS], dtype=np.uint8)
+
+def columns(height, width):
+    # 列名 -> (dtype, 每行形状)；状态为动作之前的状态，reward为这一帧的得分增量（rows_cleared ** 2）
+    return {
+        'board': (np.uint8, (height, width)),   # 已锁定格子，0/1
+        'piece': (np.int8, ()),
+        'rotation': (np.int8, ()),
+        'x': (np.int16, ()),
+        'y': (np.int16, ()),
+        'next_piece': (np.int8, ()),
+        'action': (np.uint8, ()),               # replay.ACTION_CODES
+        'reward': (np.int32, ()),
+        'done': (np.bool_, ()),
+        'episode': (np.int64, ()),
+        'tick': (np.int64, ()),
+    }
+
+# 数据集目录：每列一个只追加的原始二进制文件 <列名>.bin，meta.json记录列的类型、形状与已完成的行数。
+# 写入按块进行，只在块完整写入各列文件后才更新meta.json（先写临时文件再替换），
+# 中途中断时列文件末尾多出的半块在下次打开时截掉
+class DatasetWriter:
+    def __init__(self, path, height, width, chunk_rows=1 << 16) -> None:
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.columns = columns(height, width)
+        os.makedirs(path, exist_ok=True)
+        self.rows = 0
+        meta_path = os.path.join(path, META)
+        if os.path.exists(meta_path):
+            # 追加到已有数据集
+            meta = read_meta(path)
+            if meta['columns'] != _describe(self.columns):
+                raise ValueError(f'dataset {path} has different columns')
+            self.rows = meta['rows']
+        self.files = {}
+        for name, (dtype, shape) in self.columns.items():
+            f = open(self._file(name), 'ab')
+            f.truncate(self.rows * np.dtype(dtype).itemsize * int(np.prod(shape)))
+            self.files[name] = f
+        # 一个块的缓冲，内存占用固定
+        self.buffers = {name: np.zeros((chunk_rows,) + shape, dtype=dtype) for name, (dtype, shape) in self.columns.items()}
+        self.fill = 0
+        if not os.path.exists(meta_path):
+            self._write_meta()
+
+    def _file(self, name):
+        return os.path.join(self.path, name + '.bin')
+
+    def _write_meta(self):
+        tmp = os.path.join(self.path, META + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'version': DATASET_VERSION, 'rows': self.rows, 'columns': _describe(self.columns)}, f)
+        os.replace(tmp, os.path.join(self.path, META))
+
+    def slot(self):
+        # 当前块中下一行的下标，调用方直接写self.buffers[列名][slot]，commit()后才计入
+        return self.fill
+
+    def commit(self):
+        self.fill += 1
+        if self.fill == self.chunk_rows:
+            self.flush()
+
+    def append(self, **values):
+        # 一次追加多行：每列为(k, ...)数组；缺少的列写0
+        count = len(next(iter(values.values())))
+        done = 0
+        while done < count:
+            take = min(count - done, self.chunk_rows - self.fill)
+            for name, buffer in self.buffers.items():
+                value = values.get(name)
+                buffer[self.fill:self.fill + take] = 0 if value is None else value[done:done + take]
+            self.fill += take
+            done += take
+            if self.fill == self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        if not self.fill:
+            return
+        for name, buffer in self.buffers.items():
+            f = self.files[name]
+            f.write(buffer[:self.fill].tobytes())
+            f.flush()
+        self.rows += self.fill
+        self.fill = 0
+        self._write_meta()
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _describe(cols):
+    return {name: {'dtype': np.dtype(dtype).str, 'shape': list(shape)} for name, (dtype, shape) in cols.items()}
+
+def read_meta(path):
+    with open(os.path.join(path, META), 'r') as f:
+        meta = json.load(f)
+    if meta.get('version') != DATASET_VERSION:
+        raise ValueError(f'unsupported dataset version: {meta.get("version")}')
+    return meta
+
+# 单局记录器，HeadlessGame与Game共用
+# begin()在一帧开始前把状态直接写进写入器的缓冲，end()补上动作与得分增量。
+# 锁定在下一帧开始时才消行、生成新方块（game.resolve_locks()），所以每行先留着不提交：
+# 下一次begin()先处理待处理的锁定，把消行得分记到造成锁定的那一行上再提交，
+# 然后才记录新方块出现后的状态。对局结束或不再记录时调用finish()提交最后一行。
+# skip_idle时没有动作、没有得分且未结束的行不提交（下一行覆盖同一位置）
+class GameRecorder:
+    def __init__(self, writer, episode=0, skip_idle=True) -> None:
+        self.writer = writer
+        self.episode = episode
+        self.skip_idle = skip_idle
+        self.map = None
+        self.score = 0
+        self.held = False
+
+    def begin(self, game):
+        game.resolve_locks()
+        self._commit()
+        entities = game.entities.entity_manager
+        map_mat = entities.single(MapComponent)
+        block = entities['block']
+        shape = block.get_component(ShapeComponent)
+        position = block.get_component(PositionComponent)
+        buffers = self.writer.buffers
+        i = self.writer.slot()
+        np.not_equal(map_mat.color_map, 0, out=buffers['board'][i], casting='unsafe')
+        buffers['piece'][i] = shape.piece_id
+        buffers['rotation'][i] = shape.rotation
+        buffers['x'][i] = position.x
+        buffers['y'][i] = position.y
+        buffers['next_piece'][i] = entities['next_block'].get_component(ShapeComponent).piece_id
+        buffers['episode'][i] = self.episode
+        buffers['tick'][i] = game.tick
+        # 交互模式重新开始时会换掉实体，得分与结束状态都取自本帧开始时的场地
+        self.map = map_mat
+        self.score = map_mat.score
+
+    def end(self, game, actions):
+        # 同一帧的多个动作只记第一个
+        action = next((ACTION_CODES[action] for action in actions if action is not None), NO_ACTION)
+        buffers = self.writer.buffers
+        i = self.writer.slot()
+        buffers['action'][i] = action
+        buffers['reward'][i] = self.map.score - self.score
+        buffers['done'][i] = self.map.game_over
+        self.score = self.map.score
+        self.held = True
+
+    def _commit(self):
+        if not self.held:
+            return
+        self.held = False
+        buffers = self.writer.buffers
+        i = self.writer.slot()
+        buffers['reward'][i] += self.map.score - self.score
+        buffers['done'][i] |= self.map.game_over
+        if self.skip_idle and buffers['action'][i] == NO_ACTION and not buffers['reward'][i] and not buffers['done'][i]:
+            return
+        self.writer.commit()
+
+    def finish(self, game=None):
+        # game不为None时先处理最后一次锁定，使其得分计入最后一行
+        if game is not None and self.held:
+            game.resolve_locks()
+        self._commit()
+
+    def step(self, game, actions=()):
+        # 代替HeadlessGame.step(actions)，对局结束时提交最后一行
+        if isinstance(actions, str):
+            actions = (actions,)
+        self.begin(game)
+        game.step(actions)
+        self.end(game, actions)
+        if game.done:
+            self.finish(game)
+        return game.done
+
+# BatchEnv记录器：每次step记录全部N局；对局结束自动重置后换新的episode编号
+class BatchRecorder:
+    def __init__(self, writer, env, first_episode=0) -> None:
+        self.writer = writer
+        self.env = env
+        self.episode = np.arange(first_episode, first_episode + env.n, dtype=np.int64)
+        self.next_episode = first_episode + env.n
+
+    def step(self, actions):
+        env = self.env
+        actions = np.asarray(actions)
+        state = {
+            'board': env.cells(),
+            'piece': env.piece.copy(),
+            'rotation': env.rotation.copy(),
+            'x': env.x.copy(),
+            'y': env.y.copy(),
+            'next_piece': env.next_piece.copy(),
+            'episode': self.episode.copy(),
+            'tick': env.ticks.copy(),
+        }
+        reward, done = env.step(actions)
+        self.writer.append(action=BATCH_ACTION_CODES[actions], reward=reward, done=done, **state)
+        if done.any():
+            finished = np.flatnonzero(done)
+            self.episode[finished] = np.arange(self.next_episode, self.next_episode + len(finished))
+            self.next_episode += len(finished)
+        return reward, done
+
+# 数据集读取
+# 每列是整个文件的np.memmap（只读），按列名取到的就是零拷贝视图；
+# 打乱的小批量按块随机读入一个有限大小的窗口，在窗口内打乱，内存占用与数据集大小无关
+class Dataset:
+    def __init__(self, path) -> None:
+        self.path = path
+        meta = read_meta(path)
+        self.rows = meta['rows']
+        self.columns = {}
+        for name, column in meta['columns'].items():
+            shape = (self.rows,) + tuple(column['shape'])
+            if self.rows:
+                self.columns[name] = np.memmap(os.path.join(path, name + '.bin'), dtype=column['dtype'], mode='r', shape=shape)
+            else:
+                self.columns[name] = np.zeros(shape, dtype=column['dtype'])
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def batches(self, batch_size, shuffle=True, seed=None, names=None, block_rows=4096, window_rows=1 << 18):
+        # 生成{列名: (batch_size, ...)数组}，最后一批可能不满；
+        # 不打乱时为memmap切片（零拷贝），打乱时为按下标取出的副本（批内按行号排序）
+        names = list(names or self.columns)
+        if not shuffle:
+            for start in range(0, self.rows, batch_size):
+                yield {name: self.columns[name][start:start + batch_size] for name in names}
+            return
+        rng = np.random.default_rng(seed)
+        starts = np.arange(0, self.rows, block_rows)
+        rng.shuffle(starts)
+        per_window = max(1, window_rows // block_rows)
+        pending = np.zeros(0, dtype=np.int64)
+        for first in range(0, len(starts), per_window):
+            # 一个窗口内的行下标整体打乱，每批按下标排序后从memmap读取，读取范围限于窗口内的块
+            window = np.concatenate([np.arange(start, min(start + block_rows, self.rows)) for start in starts[first:first + per_window]])
+            order = np.concatenate([pending, rng.permutation(window)])
+            full = len(order) - len(order) % batch_size
+            for start in range(0, full, batch_size):
+                index = np.sort(order[start:start + batch_size])
+                yield {name: self.columns[name][index] for name in names}
+            # 不满一批的留到下一个窗口
+            pending = order[full:]
+        if len(pending):
+            index = np.sort(pending)
+            yield {name: self.columns[name][index] for name in names}
+
+    def close(self):
+        for column in self.columns.values():
+            if isinstance(column, np.memmap):
+                column._mmap.close()
+        self.columns = {}
+
+def main():
+    from headless import HeadlessGame
+    from strategies import STRATEGIES
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--out', default=None, help='数据集目录，已存在时追加')
+    parser.add_argument('--info', default=None, help='打印数据集概要')
+    parser.add_argument('--strategy', default='search', choices=list(STRATEGIES))
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0, help='第一局的seed，之后依次加一')
+    parser.add_argument('--max-ticks', type=int, default=200000)
+    parser.add_argument('--all-ticks', action='store_true', help='也记录没有动作与得分的帧')
+    args = parser.parse_args()
+
+    if args.info:
+        dataset = Dataset(args.info)
+        print(f'{len(dataset)} rows, {len(np.unique(dataset["episode"]))} episodes')
+        for name, column in dataset.columns.items():
+            print(f'  {name:<12}{str(column.dtype):<8}{str(column.shape[1:]):<10}{column.nbytes / 2 ** 20:>10.1f} MB')
+        print(f'reward total {int(dataset["reward"].sum())}  done {int(dataset["done"].sum())}')
+        return
+    if not args.out:
+        parser.error('--out or --info is required')
+    game = HeadlessGame(args.config)
+    config = game.config
+    with DatasetWriter(args.out, config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH) as writer:
+        for seed in range(args.seed, args.seed + args.games):
+            game.reset(seed)
+            recorder = GameRecorder(writer, seed, skip_idle=not args.all_ticks)
+            policy = STRATEGIES[args.strategy](seed)
+            while not game.done and game.tick < args.max_ticks:
+                action = policy(game)
+                recorder.step(game, action if action is not None else ())
+            recorder.finish(game)
+        rows = writer.rows + writer.fill
+    print(f'{args.games} games, {rows} rows in {args.out}')
+
+if __name__ == '__main__':
+    main()
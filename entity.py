@@ -7,31 +7,128 @@ Contact     : zoe4896@outlook.com
 Description : 
 '''
 
+# 原型表：组件类型集合相同的实体存放在一起
+class Archetype:
+    __slots__ = ('types', 'entities')
+
+    def __init__(self, types):
+        self.types = types
+        self.entities = {}
+
 # 实体管理器
+# 实体按组件类型集合归入原型表，query结果按查询条件缓存，
+# 创建/销毁实体或增删组件时整体失效
 class EntityManager:
     def __init__(self):
         self.entities = {}
+        self.archetypes = {}
+        self._query_cache = {}
+
+    def __getitem__(self, id):
+        return self.entities[id]
+
+    def __contains__(self, id):
+        return id in self.entities
+
+    def get(self, id, default=None):
+        return self.entities.get(id, default)
 
     def create_entity(self, id):
-        entity = Entity()
+        if id in self.entities:
+            self.destroy_entity(id)
+        entity = Entity(self, id)
         self.entities[id] = entity
+        self._move(entity, None)
         return entity
 
     def destroy_entity(self, entity):
-        del self.entities[entity]
+        # entity可以是实体id或实体对象
+        entity = self.entities.get(entity) if not isinstance(entity, Entity) else entity
+        if entity is None or self.entities.get(entity.id) is not entity:
+            return
+        del self.entities[entity.id]
+        self._archetype(frozenset(entity.components)).entities.pop(entity, None)
+        entity.manager = None
+        self._query_cache.clear()
+
+    def rename_entity(self, old_id, new_id):
+        # 实体换id，new_id原有的实体被销毁
+        entity = self.entities[old_id]
+        if new_id in self.entities:
+            self.destroy_entity(new_id)
+        del self.entities[old_id]
+        entity.id = new_id
+        self.entities[new_id] = entity
+        return entity
+
+    def swap_entities(self, a, b):
+        # 两个实体互换id（复用实体时用），返回换到b的实体
+        first, second = self.entities[a], self.entities[b]
+        first.id, second.id = b, a
+        self.entities[a], self.entities[b] = second, first
+        return first
+
+    def query(self, *component_types, exclude=()):
+        # 返回同时拥有component_types且不含exclude中任一组件的实体的组件元组列表
+        key = (component_types, exclude)
+        result = self._query_cache.get(key)
+        if result is None:
+            include = frozenset(component_types)
+            result = [
+                tuple(entity.components[component_type] for component_type in component_types)
+                for archetype in self.archetypes.values()
+                if include <= archetype.types and archetype.types.isdisjoint(exclude)
+                for entity in archetype.entities
+            ]
+            self._query_cache[key] = result
+        return result
+
+    def single(self, component_type):
+        # 唯一（或第一个）拥有该组件的实体上的组件
+        result = self.query(component_type)
+        return result[0][0] if result else None
+
+    def _archetype(self, types):
+        archetype = self.archetypes.get(types)
+        if archetype is None:
+            archetype = self.archetypes[types] = Archetype(types)
+        return archetype
+
+    def _move(self, entity, old_types):
+        if old_types is not None:
+            self._archetype(old_types).entities.pop(entity, None)
+        self._archetype(frozenset(entity.components)).entities[entity] = None
+        self._query_cache.clear()
 
 # 实体类
 class Entity:
-    def __init__(self):
+    __slots__ = ('manager', 'id', 'components')
+
+    def __init__(self, manager=None, id=None):
+        self.manager = manager
+        self.id = id
         self.components = {}
 
     def add_component(self, component):
         component_type = type(component)
+        old_types = frozenset(self.components)
         self.components[component_type] = component
+        if self.manager is not None:
+            self.manager._move(self, old_types)
 
     def remove_component(self, component_type):
         if component_type in self.components:
+            old_types = frozenset(self.components)
             del self.components[component_type]
+            if self.manager is not None:
+                self.manager._move(self, old_types)
+
+    def replace_components(self, components):
+        # 整体替换全部组件（恢复快照用），只通知管理器一次
+        old_types = frozenset(self.components)
+        self.components = {type(component): component for component in components}
+        if self.manager is not None:
+            self.manager._move(self, old_types)
 
     def has_component(self, component_type):
         return component_type in self.components
@@ -44,4 +141,4 @@ class Entity:
     
     def reset_position(self, initial_position):
         self.position.x = initial_position.x
-        self.position.y = initial_position.y
\ No newline at end of file
+        self.position.y = initial_position.y
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 05:10:42
+Contact     : zoe4896@outlook.com
+Description : 无窗口导出对局画面：图片序列、原始RGB视频流或经ffmpeg编码的视频
+              用法：python export.py --replay game.replay --out frames/%06d.png
+                    python export.py --strategy search --seed 0 --ticks 3600 --out game.rgb --fps 30
+'''
+import os
+import sys
+import zlib
+import shutil
+import struct
+import argparse
+import subprocess
+import numpy as np
+import pygame
+from manager import GameManager
+from headless import HeadlessGame
+from replay import Replay, ReplayPlayer
+from render import RenderSystem
+from strategies import STRATEGIES
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def _png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+def write_png(path, data, size, level=1):
+    # RGB24像素写成PNG：不做行滤波，zlib用最快的压缩级别，比pygame.image.save快约4倍
+    width, height = size
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = np.frombuffer(data, dtype=np.uint8).reshape(height, width * 3)
+    with open(path, 'wb') as f:
+        f.write(PNG_SIGNATURE + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+                + _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), level)) + _png_chunk(b'IEND', b''))
+
+# 图片序列：只写画面变化的帧，文件名中的编号为逻辑帧号；
+# .png用write_png，其他格式（.bmp、.tga等）交给pygame.image.save
+class ImageSink:
+    def __init__(self, pattern) -> None:
+        self.pattern = pattern
+        self.wants_bytes = pattern.endswith('.png')
+        directory = os.path.dirname(pattern)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.frames = 0
+
+    def write(self, tick, surface, data, changed):
+        if changed:
+            if self.wants_bytes:
+                write_png(self.pattern % tick, data, surface.get_size())
+            else:
+                pygame.image.save(surface, self.pattern % tick)
+            self.frames += 1
+
+    def close(self):
+        pass
+
+# 原始RGB24视频流（固定帧率），画面未变的帧重复上一帧的字节；
+# 只暂存帧的引用（重复帧不占额外内存），攒满buffer_bytes再一次写入文件
+class RawSink:
+    wants_bytes = True
+
+    def __init__(self, path, buffer_bytes=32 << 20) -> None:
+        self.file = open(path, 'wb')
+        self.buffer = []
+        self.buffered = 0
+        self.buffer_bytes = buffer_bytes
+        self.frames = 0
+
+    def write(self, tick, surface, data, changed):
+        self.buffer.append(data)
+        self.buffered += len(data)
+        self.frames += 1
+        if self.buffered >= self.buffer_bytes:
+            self._flush()
+
+    def _flush(self):
+        self.file.writelines(self.buffer)
+        self.buffer.clear()
+        self.buffered = 0
+
+    def close(self):
+        self._flush()
+        self.file.close()
+
+# 通过管道交给ffmpeg编码，需要PATH中有ffmpeg
+class FfmpegSink(RawSink):
+    def __init__(self, path, size, fps, buffer_bytes=4 << 20) -> None:
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError('ffmpeg not found, export to .rgb and encode it elsewhere')
+        self.process = subprocess.Popen(
+            [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{size[0]}x{size[1]}',
+             '-r', str(fps), '-i', '-', '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE,
+        )
+        self.file = self.process.stdin
+        self.buffer = []
+        self.buffered = 0
+        self.buffer_bytes = buffer_bytes
+        self.frames = 0
+
+    def close(self):
+        super().close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f'ffmpeg exited with {self.process.returncode}')
+
+def make_sink(out, size, fps):
+    if '%' in out:
+        return ImageSink(out)
+    if out.endswith(('.rgb', '.raw')):
+        return RawSink(out)
+    return FfmpegSink(out, size, fps)
+
+# 导出器
+# 在内存中的表面上用RenderSystem绘制（不需要窗口），每stride个逻辑帧输出一帧；
+# RenderSystem没有返回脏矩形的帧画面不变，不重新取像素
+class Exporter:
+    def __init__(self, config, sink, stride=1) -> None:
+        pygame.font.init()
+        self.surface = pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+        self.render = RenderSystem(self.surface, config)
+        self.sink = sink
+        self.stride = stride
+        self.rendered = 0
+        self.data = None
+
+    def frame(self, game):
+        # 逻辑帧推进后调用
+        if game.tick % self.stride:
+            return
+        changed = bool(self.render.process(game.entities.entity_manager)) or self.data is None
+        if changed:
+            self.rendered += 1
+            if self.sink.wants_bytes:
+                self.data = pygame.image.tobytes(self.surface, 'RGB')
+            else:
+                self.data = b''
+        self.sink.write(game.tick, self.surface, self.data, changed)
+
+    def close(self):
+        self.sink.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--out', required=True, help='frames/%%06d.png（或.bmp）图片序列；.rgb/.raw 原始RGB24；其他扩展名用ffmpeg编码')
+    parser.add_argument('--replay', default=None, help='导出录像，否则用--strategy模拟一局')
+    parser.add_argument('--strategy', default='search', choices=list(STRATEGIES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ticks', type=int, default=None, help='最多导出的逻辑帧数')
+    parser.add_argument('--fps', type=int, default=None, help='输出帧率，默认与逻辑帧率相同')
+    args = parser.parse_args()
+
+    game_manager = GameManager(args.config, headless=True)
+    config = game_manager.config
+    fps = args.fps or config.FPS
+    if config.FPS % fps:
+        parser.error(f'--fps must divide FPS ({config.FPS})')
+    sink = make_sink(args.out, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT), fps)
+    exporter = Exporter(config, sink, config.FPS // fps)
+
+    if args.replay:
+        player = ReplayPlayer(Replay.load(args.replay), args.config, game_manager)
+        game = player.game
+        ticks = min(args.ticks or player.replay.ticks, player.replay.ticks)
+        advance = lambda: player.seek(game.tick + 1)
+        done = lambda: game.tick >= ticks
+    else:
+        game = HeadlessGame(seed=args.seed, game_manager=game_manager)
+        policy = STRATEGIES[args.strategy](args.seed)
+        advance = lambda: game.step(policy(game) or ())
+        done = lambda: game.done or args.ticks is not None and game.tick >= args.ticks
+
+    exporter.frame(game)
+    while not done():
+        advance()
+        exporter.frame(game)
+    exporter.close()
+    print(f'{game.tick} ticks, {sink.frames} frames written, {exporter.rendered} rendered', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
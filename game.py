@@ -6,20 +6,82 @@ Date        : 2023/06/26 14:28:59
 Contact     : zoe4896@outlook.com
 Description : 
 '''
+import random
 import pygame
 from manager import GameManager, Systems, Entities
 from component import MapComponent, StateComponent, ShapeComponent
+from profiler import FrameProfiler, ProfilerOverlay
+from replay import ReplayRecorder
+from dataset import DatasetWriter, GameRecorder
+from snapshot import GameSnapshot
+from scheduler import FixedStepScheduler
 
 # 游戏类
 class Game:
-    def __init__(self, config_path):
+    def __init__(self, config_path, profile=None, profile_overlay=None, profile_export=None, seed=None, record=None, dataset=None):
         self.game_manager = GameManager(config_path)
+        config = self.game_manager.config
+        # 命令行参数优先于配置文件
+        if profile_export:
+            config.PROFILE_EXPORT = profile_export
+        if record:
+            config.RECORD_REPLAY = record
+        if dataset:
+            config.RECORD_DATASET = dataset
+        # 随机数与时间都由seed和帧计数决定，录像可在无界面模式下逐帧重放
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        self.queue = self.game_manager.piece_queue(self.seed)
+        self.tick = 0
+        self.record_path = getattr(config, 'RECORD_REPLAY', '')
+        self.recorder = ReplayRecorder(self.seed, config) if self.record_path else None
+        # 训练数据：每个有动作或得分的帧记录一行，已有数据集时追加
+        dataset_path = getattr(config, 'RECORD_DATASET', '')
+        self.dataset = None
+        if dataset_path:
+            self.dataset = GameRecorder(DatasetWriter(dataset_path, config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH), self.seed)
+        if profile is None:
+            profile = getattr(config, 'PROFILE', False)
+        if profile_overlay is None:
+            profile_overlay = getattr(config, 'PROFILE_OVERLAY', False)
+        self.scheduler = FixedStepScheduler.from_config(config)
+        self.profiler = None
+        self.overlay = None
+        if profile or profile_overlay:
+            self.profiler = FrameProfiler.from_config(config)
+            self.profiler.wrap(self, '_handle_events')
+            if profile_overlay:
+                self.overlay = ProfilerOverlay(self.profiler, self.game_manager.screen, config.FPS)
         self._init()
 
     def _init(self):
-        self.systems = Systems(self.game_manager)
-        self.entities = Entities(self.game_manager)
+        self.systems = Systems(self.game_manager, self.queue, self._get_ticks)
+        self.entities = Entities(self.game_manager, self.queue)
         self.running = True
+        if self.profiler is not None:
+            self.profiler.instrument(self.systems)
+
+    def _get_ticks(self):
+        return self.tick * 1000 // self.game_manager.config.FPS
+
+    def snapshot(self):
+        # 帧之间调用；锁定事件还在pygame队列中时一并记录
+        pending = pygame.event.peek(pygame.USEREVENT + 1)
+        return GameSnapshot.capture(self.entities, self.systems, self.queue, self.tick, (pending,))
+
+    def restore(self, snapshot):
+        # 不重建Systems/Entities（及其字体等资源），下一帧整帧重绘
+        self.tick = snapshot.restore(self.entities, self.systems, self.queue)
+        pygame.event.clear(pygame.USEREVENT + 1)
+        if snapshot.extra[0]:
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT + 1))
+        self.systems.sys_render.invalidate()
+
+    def resolve_locks(self):
+        # 提前处理队列中的锁定事件（消行 + 生成新方块），其余事件留给_handle_events；
+        # 锁定事件本来就在输入之前处理，提前处理不改变对局
+        for _ in pygame.event.get(pygame.USEREVENT + 1):
+            self.systems.sys_clear_line.process(self.entities.entity_manager)
+            self.systems.sys_spawn.process(self.entities.entity_manager)
 
     def _handle_events(self):
         events = pygame.event.get()
@@ -30,47 +92,87 @@ class Game:
                 # 方块落触底或碰撞
                 # 1. 判断消行
                 # 2. 重新生成方块
-                self.systems.sys_clear_line.process(self.entities.entity_manager.entities)
+                self.systems.sys_clear_line.process(self.entities.entity_manager)
                 self.systems.sys_spawn.process(self.entities.entity_manager)
             else:
                 continue
-        self.state = self.entities.entity_manager.entities['block'].get_component(StateComponent)
-        _shape = self.entities.entity_manager.entities['block'].get_component(ShapeComponent)
-        self.map = self.entities.entity_manager.entities['map'].get_component(MapComponent)
+        self.state = self.entities.entity_manager['block'].get_component(StateComponent)
+        _shape = self.entities.entity_manager['block'].get_component(ShapeComponent)
+        self.map = self.entities.entity_manager['map'].get_component(MapComponent)
         self.paused = self.map.paused
         self.game_over = self.map.game_over
         self.restart = self.map.restart
 
         if self.map.game_over:
             self.systems.sys_spawn.process(self.entities.entity_manager)
+        self.actions = ()
         if not self.state.hard_drop:
-            self.systems.sys_input.process(events, self.entities.entity_manager.entities)
+            self.actions = self.systems.sys_input.process(events, self.entities.entity_manager)
+            if self.actions and self.recorder is not None:
+                self.recorder.record(self.tick, self.actions)
         if _shape.rotate:
-            self.systems.sys_rotation.process(self.entities.entity_manager.entities)
+            self.systems.sys_rotation.process(self.entities.entity_manager)
 
     def _update(self):
-        self.systems.sys_map.process(self.entities.entity_manager.entities)
+        self.systems.sys_map.process(self.entities.entity_manager)
         # 检测是否碰撞（触底、碰撞、左右界）
-        self.systems.sys_collision.process(self.entities.entity_manager.entities)
+        self.systems.sys_collision.process(self.entities.entity_manager)
         # 根据碰撞结果更新map
-        self.systems.sys_map.process(self.entities.entity_manager.entities)
+        self.systems.sys_map.process(self.entities.entity_manager)
         if self.state.active and not self.state.is_blocked:
-            self.systems.sys_movement.process(self.entities.entity_manager.entities)
+            self.systems.sys_movement.process(self.entities.entity_manager)
 
     def _render(self):
-        self.systems.sys_render.process(self.entities.entity_manager.entities)
+        self.dirty_rects = self.systems.sys_render.process(self.entities.entity_manager)
+
+    def _step(self):
+        # 一个逻辑帧：轮询输入并推进，不渲染
+        if self.dataset is not None:
+            self.dataset.begin(self)
+        self._handle_events()
+        if self.actions:
+            self.scheduler.input()
+        if not self.paused and not self.game_over:
+            if not self.restart:
+                self._update()
+            else:
+                self._init()
+        if self.dataset is not None:
+            self.dataset.end(self, self.actions)
+        self.tick += 1
+
+    def _present(self):
+        self._render()
+        if self.overlay is not None:
+            self.dirty_rects.append(self.overlay.draw())
+        # 只提交变化的区域
+        pygame.display.update(self.dirty_rects)
+        self.scheduler.presented()
 
     def run(self):
+        # 逻辑按FPS固定步长推进，渲染每轮最多一次（RENDER_FPS限制渲染频率）
+        scheduler = self.scheduler
         while self.running:
-            self._handle_events()
-            if not self.paused and not self.game_over:
-                if not self.restart:
-                    self._update()
-                    self._render()
-                else:
-                    self._init()
-            elif self.paused:
-                self._render()
-            pygame.display.update()
-            self.game_manager.clock.tick(self.game_manager.config.FPS)
+            ticks = scheduler.due()
+            if ticks:
+                if self.profiler is not None:
+                    self.profiler.begin_frame()
+                for _ in range(ticks):
+                    self._step()
+                    if not self.running:
+                        break
+                if scheduler.render_due():
+                    self._present()
+                if self.profiler is not None:
+                    self.profiler.end_frame()
+            scheduler.wait()
+        if self.recorder is not None:
+            self.recorder.finish(self.tick).save(self.record_path)
+        if self.dataset is not None:
+            self.dataset.finish(self)
+            self.dataset.writer.close()
+        if self.profiler is not None:
+            self.profiler.close()
+            print(self.profiler.report())
+            print(self.scheduler.report())
         pygame.quit()
\ No newline at end of file
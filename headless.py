@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 10:02:41
+Contact     : zoe4896@outlook.com
+Description : 无界面、固定步长的游戏逻辑核心
+'''
+from manager import GameManager, Systems, Entities
+from snapshot import GameSnapshot
+from component import MapComponent, StateComponent, ShapeComponent, SpeedComponent
+
+# InputSystem.key_mapping中的全部动作
+ACTIONS = ('left', 'right', 'down', 'rotate', 'hard_drop', 'pause', 'restart')
+
+# 无界面游戏类
+# 逐帧复刻Game.run()的执行顺序：
+#   1. 处理上一帧投递的锁定事件（消行 + 生成新方块）
+#   2. 处理输入与旋转
+#   3. 更新map、碰撞检测、下落
+# 时间由逻辑帧计数换算（tick * 1000 // FPS），锁定事件放入内部队列代替pygame事件队列
+# 没有输入、方块未触底且下落计时未到的帧不改变任何状态，只推进帧计数
+class HeadlessGame:
+    def __init__(self, config_path='config.yaml', seed=None, game_manager=None):
+        self.game_manager = game_manager or GameManager(config_path, headless=True)
+        self.config = self.game_manager.config
+        # 录像器（见replay.py），每帧非空动作交给recorder.record(tick, actions)
+        self.recorder = None
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed
+        self.queue = self.game_manager.piece_queue(seed)
+        self.tick = 0
+        self.pieces = 0
+        self.recorder = None
+        self._init()
+
+    def _init(self):
+        # 对应Game._init()，restart动作也走这里，不重置方块队列与帧计数
+        self._pending_locks = 0
+        # 上一次更新后方块位置、碰撞结果都未再变化
+        self._settled = False
+        self.systems = Systems(self.game_manager, self.queue, self._get_ticks, self._on_lock)
+        self.entities = Entities(self.game_manager, self.queue)
+
+    def _get_ticks(self):
+        return self.tick * 1000 // self.config.FPS
+
+    def _on_lock(self):
+        self._pending_locks += 1
+        self.pieces += 1
+
+    @property
+    def map(self):
+        return self.entities.entity_manager.single(MapComponent)
+
+    @property
+    def done(self):
+        return self.map.game_over
+
+    @property
+    def score(self):
+        return self.map.score
+
+    @property
+    def lines_cleared(self):
+        return self.map.lines_cleared
+
+    def step(self, actions=()):
+        # actions: 单个动作名或动作名序列，相当于本帧的按键事件
+        if isinstance(actions, str):
+            actions = (actions,)
+        entity_manager = self.entities.entity_manager
+        if actions:
+            if self.recorder is not None:
+                self.recorder.record(self.tick, actions)
+        elif not self._pending_locks and self._quiet(entity_manager):
+            self.tick += 1
+            return False
+        self.resolve_locks()
+        state = entity_manager['block'].get_component(StateComponent)
+        shape = entity_manager['block'].get_component(ShapeComponent)
+        map_mat = entity_manager['map'].get_component(MapComponent)
+        paused = map_mat.paused
+        game_over = map_mat.game_over
+        restart = map_mat.restart
+
+        if map_mat.game_over:
+            self.systems.sys_spawn.process(entity_manager)
+        if not state.hard_drop:
+            self.systems.sys_input.process_actions(actions, entity_manager)
+        if shape.rotate:
+            self.systems.sys_rotation.process(entity_manager)
+
+        if not paused and not game_over:
+            if not restart:
+                self._settled = self._update(entity_manager, state)
+            else:
+                self._init()
+        self.tick += 1
+        return self.done
+
+    def resolve_locks(self):
+        # 方块落触底或碰撞：判断消行，重新生成方块。
+        # step()开始时先做这一步；提前调用（数据集记录得分）不改变对局
+        entity_manager = self.entities.entity_manager
+        while self._pending_locks:
+            self._pending_locks -= 1
+            self.systems.sys_clear_line.process(entity_manager)
+            self.systems.sys_spawn.process(entity_manager)
+            # 新方块出现后下一帧不能走无变化的快速路径
+            self._settled = False
+
+    def _update(self, entities, state):
+        self.systems.sys_map.process(entities)
+        self.systems.sys_collision.process(entities)
+        self.systems.sys_map.process(entities)
+        if state.active and not state.is_blocked:
+            # 本帧没有下落则碰撞结果在下次移动前保持不变
+            fall_time = self.systems.sys_movement.fall_time
+            self.systems.sys_movement.process(entities)
+            return self.systems.sys_movement.fall_time == fall_time
+        return False
+
+    def _quiet(self, entity_manager):
+        map_mat = entity_manager['map'].get_component(MapComponent)
+        if map_mat.game_over or map_mat.restart:
+            return False
+        if map_mat.paused:
+            return True
+        speed = entity_manager['block'].get_component(SpeedComponent)
+        return self._settled and self._get_ticks() - self.systems.sys_movement.fall_time < speed.y
+
+    def snapshot(self):
+        # 完整游戏状态的不可变快照（见snapshot.py），用于回放定位、撤销与rollout
+        return GameSnapshot.capture(self.entities, self.systems, self.queue, self.tick,
+                                    (self.pieces, self._pending_locks, self._settled))
+
+    def restore(self, snapshot):
+        # 恢复到snapshot时的状态，snapshot本身不被修改，可重复使用
+        self.tick = snapshot.restore(self.entities, self.systems, self.queue)
+        self.pieces, self._pending_locks, self._settled = snapshot.extra
+
+    def run(self, policy=None, max_ticks=None):
+        # policy(game) -> 本帧动作，返回None表示无操作
+        while not self.done and (max_ticks is None or self.tick < max_ticks):
+            actions = policy(self) if policy is not None else ()
+            self.step(actions if actions is not None else ())
+        return self.result()
+
+    def result(self):
+        return {
+            'seed': self.seed,
+            'score': self.score,
+            'lines_cleared': self.lines_cleared,
+            'pieces': self.pieces,
+            'ticks': self.tick,
+        }
+
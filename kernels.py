@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 05:48:06
+Contact     : zoe4896@outlook.com
+Description : 碰撞检测、锁定与消行的底层计算（ArrayBoard、MapSystem、ClearLinesSystem共用）
+              numpy: NumPy参考实现
+              numba: Numba JIT实现，未安装numba时退回numpy
+'''
+import warnings
+import numpy as np
+from functools import lru_cache
+
+# 所有实现的接口相同，piece为pieces.PieceRotation，(x, y)为其包围盒左上角在场地中的位置；
+# 场地外的格子视为空，写入时跳过
+#   hits(cells, piece, x, y)        与已占格重叠的方块列位掩码（第c位对应方块第c列）
+#   landed(cells, piece, x, y)      包围盒到达底边，或方块底部轮廓下方一格已占
+#   lock(cells, keys, piece, x, y)  把方块格子写成1，返回新占格子Zobrist随机数的异或
+#   fill(matrix, piece, x, y, value)
+#   full_rows(cells)                满行下标，升序
+#   clear_rows(matrix, rows)        原地删除升序的rows（int64数组），上方的行下移，顶部补0
+
+# NumPy参考实现
+# 方块完全在场地内时按包围盒切片计算，越界时才逐格筛选
+class NumpyKernels:
+    name = 'numpy'
+
+    @staticmethod
+    def _valid(shape, rows, cols):
+        height, width = shape
+        return (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+
+    @staticmethod
+    def hits(cells, piece, x, y):
+        rows = piece.offset_rows + y
+        cols = piece.offset_cols + x
+        bits = piece.offset_bits
+        height, width = cells.shape
+        if x < 0 or y < 0 or x + piece.width > width or y + piece.height > height:
+            valid = NumpyKernels._valid(cells.shape, rows, cols)
+            rows, cols, bits = rows[valid], cols[valid], bits[valid]
+        return int(np.bitwise_or.reduce(bits[cells[rows, cols] != 0]))
+
+    @staticmethod
+    def landed(cells, piece, x, y):
+        height, width = cells.shape
+        if y + piece.height >= height:
+            return True
+        rows = piece.bottom_rows + y + 1
+        cols = piece.bottom_cols + x
+        if x < 0 or y + 1 < 0 or x + piece.width > width:
+            valid = (rows >= 0) & (cols >= 0) & (cols < width)
+            rows, cols = rows[valid], cols[valid]
+        return bool(cells[rows, cols].any())
+
+    @staticmethod
+    def lock(cells, keys, piece, x, y):
+        # 返回(新占格子的哈希异或值, 新占格子数)
+        height, width = cells.shape
+        if x < 0 or y < 0 or x + piece.width > width or y + piece.height > height:
+            rows = piece.offset_rows + y
+            cols = piece.offset_cols + x
+            valid = NumpyKernels._valid(cells.shape, rows, cols)
+            rows, cols = rows[valid], cols[valid]
+            # 与已占格重叠的格子不改变哈希
+            empty = cells[rows, cols] == 0
+            rows, cols = rows[empty], cols[empty]
+            cells[rows, cols] = 1
+            return int(np.bitwise_xor.reduce(keys[rows, cols], initial=np.uint64(0))), len(rows)
+        region = cells[y:y+piece.height, x:x+piece.width]
+        new = piece.mask & (region == 0)
+        region[new] = 1
+        return int(np.bitwise_xor.reduce(keys[y:y+piece.height, x:x+piece.width][new], initial=np.uint64(0))), int(new.sum())
+
+    @staticmethod
+    def fill(matrix, piece, x, y, value):
+        height, width = matrix.shape
+        if x < 0 or y < 0 or x + piece.width > width or y + piece.height > height:
+            rows = piece.offset_rows + y
+            cols = piece.offset_cols + x
+            valid = NumpyKernels._valid(matrix.shape, rows, cols)
+            matrix[rows[valid], cols[valid]] = value
+            return
+        np.copyto(matrix[y:y+piece.height, x:x+piece.width], value, where=piece.mask, casting='unsafe')
+
+    @staticmethod
+    def full_rows(cells):
+        return np.flatnonzero(cells.all(axis=1))
+
+    @staticmethod
+    def clear_rows(matrix, rows):
+        if not len(rows):
+            return
+        keep = np.ones(len(matrix), dtype=bool)
+        keep[rows] = False
+        kept = matrix[keep]
+        cleared = len(matrix) - len(kept)
+        matrix[cleared:] = kept
+        matrix[:cleared] = 0
+
+@lru_cache(maxsize=None)
+def numba_kernels():
+    # 逐格循环，编译后没有NumPy的临时数组与逐次调用开销；编译结果缓存在__pycache__。
+    # 首次选用时才导入numba；编译好的函数只接受数组，外层取出方块的偏移数组再调用
+    try:
+        import numba
+    except ImportError:
+        return None
+    jit = numba.njit(cache=True, nogil=True)
+
+    @jit
+    def hits(cells, rows, cols, x, y):
+        height, width = cells.shape
+        mask = 0
+        for i in range(len(rows)):
+            r = rows[i] + y
+            c = cols[i] + x
+            if 0 <= r < height and 0 <= c < width and cells[r, c] != 0:
+                mask |= 1 << cols[i]
+        return mask
+
+    @jit
+    def landed(cells, rows, cols, x, y):
+        height, width = cells.shape
+        for i in range(len(rows)):
+            r = rows[i] + y + 1
+            c = cols[i] + x
+            if r >= height:
+                return True
+            if r >= 0 and 0 <= c < width and cells[r, c] != 0:
+                return True
+        return False
+
+    @jit
+    def lock(cells, keys, rows, cols, x, y):
+        height, width = cells.shape
+        delta = np.uint64(0)
+        count = 0
+        for i in range(len(rows)):
+            r = rows[i] + y
+            c = cols[i] + x
+            if 0 <= r < height and 0 <= c < width and cells[r, c] == 0:
+                cells[r, c] = 1
+                delta ^= keys[r, c]
+                count += 1
+        return delta, count
+
+    @jit
+    def fill(matrix, rows, cols, x, y, value):
+        height, width = matrix.shape
+        for i in range(len(rows)):
+            r = rows[i] + y
+            c = cols[i] + x
+            if 0 <= r < height and 0 <= c < width:
+                matrix[r, c] = value
+
+    @jit
+    def full_rows(cells):
+        height, width = cells.shape
+        out = np.empty(height, dtype=np.int64)
+        count = 0
+        for r in range(height):
+            full = True
+            for c in range(width):
+                if cells[r, c] == 0:
+                    full = False
+                    break
+            if full:
+                out[count] = r
+                count += 1
+        return out[:count]
+
+    @jit
+    def clear_rows(matrix, rows):
+        # 自下而上把保留的行搬到最终位置
+        k = len(rows) - 1
+        dst = matrix.shape[0] - 1
+        for src in range(matrix.shape[0] - 1, -1, -1):
+            if k >= 0 and rows[k] == src:
+                k -= 1
+                continue
+            if dst != src:
+                matrix[dst, :] = matrix[src, :]
+            dst -= 1
+        matrix[:dst + 1, :] = 0
+
+    class NumbaKernels:
+        name = 'numba'
+
+        @staticmethod
+        def hits(cells, piece, x, y):
+            return hits(cells, piece.offset_rows, piece.offset_cols, x, y)
+
+        @staticmethod
+        def landed(cells, piece, x, y):
+            # 与NumPy实现相同，包围盒到底即触底
+            return y + piece.height >= cells.shape[0] or landed(cells, piece.bottom_rows, piece.bottom_cols, x, y)
+
+        @staticmethod
+        def lock(cells, keys, piece, x, y):
+            delta, count = lock(cells, keys, piece.offset_rows, piece.offset_cols, x, y)
+            return int(delta), count
+
+        @staticmethod
+        def fill(matrix, piece, x, y, value):
+            fill(matrix, piece.offset_rows, piece.offset_cols, x, y, value)
+
+    NumbaKernels.full_rows = staticmethod(full_rows)
+    NumbaKernels.clear_rows = staticmethod(clear_rows)
+    return NumbaKernels
+
+# 名称 -> 加载函数，不可用时返回None
+KERNEL_BACKENDS = {
+    'numpy': lambda: NumpyKernels,
+    'numba': numba_kernels,
+}
+
+def make_kernels(config=None, backend=None):
+    backend = backend or getattr(config, 'KERNEL_BACKEND', 'numpy')
+    if backend not in KERNEL_BACKENDS:
+        raise ValueError(f'unknown kernel backend: {backend}')
+    kernels = KERNEL_BACKENDS[backend]()
+    if kernels is None:
+        warnings.warn(f'kernel backend {backend} is not available, falling back to numpy', RuntimeWarning, stacklevel=2)
+        kernels = NumpyKernels
+    return kernels
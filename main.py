@@ -6,9 +6,18 @@ Date        : 2023/06/26 14:35:34
 Contact     : zoe4896@outlook.com
 Description : 
 '''
-
+import argparse
 from game import Game
 
 if __name__ == '__main__':
-    game = Game('config.yaml')
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--profile', action='store_true', default=None, help='开启逐系统计时')
+    parser.add_argument('--profile-overlay', action='store_true', default=None, help='屏幕上显示计时浮层')
+    parser.add_argument('--profile-export', default=None, help='计时导出文件（.csv 或 .jsonl）')
+    parser.add_argument('--seed', type=int, default=None, help='随机数种子')
+    parser.add_argument('--record', default=None, help='录像文件，退出时写入')
+    parser.add_argument('--dataset', default=None, help='训练数据目录，逐帧追加')
+    args = parser.parse_args()
+    game = Game(args.config, args.profile, args.profile_overlay, args.profile_export, args.seed, args.record, args.dataset)
+    game.run()
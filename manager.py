@@ -7,22 +7,71 @@ Contact     : zoe4896@outlook.com
 Description : 
 '''
 
-import yaml
-import pygame
-import random
-import numpy as np
+import os
+import json
+import copy
 from types import SimpleNamespace
 from entity import EntityManager
-from system import InputSystem, MovementSystem, CollisionSystem, ClearLinesSystem, RenderSystem, MapSystem, SpawnSystem, RotationSystem
-from component import PositionComponent, SpeedComponent, ShapeComponent, ColorComponent, StateComponent, MapComponent
+from board import make_board
+from kernels import make_kernels
+from pieces import PieceTable
+from piecequeue import PieceQueue
+from palette import Palette
+from system import InputSystem, MovementSystem, CollisionSystem, ClearLinesSystem, MapSystem, SpawnSystem, RotationSystem
+from component import PositionComponent, SpeedComponent, ShapeComponent, ColorComponent, StateComponent, MapComponent, NextComponent
+
+# 解析过的配置：路径 -> (修改时间, 大小, 配置字典)，同一进程内只解析一次
+_configs = {}
+
+def load_config(file_path):
+    # 返回配置字典的副本（调用方会修改配置）。
+    # 解析结果另存为__pycache__下的JSON，新进程在配置文件未修改时不必导入yaml
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _configs.get(file_path)
+    if cached is None or cached[0] != key:
+        _configs[file_path] = (key, _read_config(file_path, key))
+    return copy.deepcopy(_configs[file_path][1])
+
+def _read_config(file_path, key):
+    cache_path = os.path.join(os.path.dirname(file_path), '__pycache__', os.path.basename(file_path) + '.json')
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if tuple(cached['key']) == key:
+            return cached['config']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    import yaml
+    with open(file_path, 'r') as f:
+        config = yaml.safe_load(f)
+    # 只缓存能原样经过JSON往返的配置（键都是字符串，没有日期等类型）
+    if json.loads(json.dumps(config, default=str)) == config:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp = f'{cache_path}.{os.getpid()}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump({'key': key, 'config': config}, f)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return config
 
 class GameManager:
-    def __init__(self, config_path) -> None:
-        pygame.init()
-        pygame.display.set_caption("The Cube")
+    def __init__(self, config_path, headless=False) -> None:
         self.config = self._get_config_from_yaml(config_path)
-        self.screen = pygame.display.set_mode((self.config.SCREEN_WIDTH, self.config.SCREEN_HEIGHT), vsync=True)
-        self.clock = pygame.time.Clock()
+        self.headless = headless
+        self.screen = None
+        self.clock = None
+        if not headless:
+            # 只初始化窗口与字体，不初始化音频、手柄等用不到的模块
+            import pygame
+            pygame.display.init()
+            pygame.font.init()
+            pygame.display.set_caption("The Cube")
+            self.screen = pygame.display.set_mode((self.config.SCREEN_WIDTH, self.config.SCREEN_HEIGHT), vsync=True)
+            self.clock = pygame.time.Clock()
         self.shapes = [
             [[1, 1, 1, 1]],
             [[1, 1], [1, 1]],
@@ -32,60 +81,77 @@ class GameManager:
             [[1, 1, 0], [0, 1, 1]],
             [[0, 1, 0], [1, 1, 1]]
         ]
+        # 全部方块的旋转表，启动时生成一次
+        self.piece_table = PieceTable(self.shapes)
+        # 碰撞、锁定、消行的底层实现（config.KERNEL_BACKEND）
+        self.kernels = make_kernels(self.config)
+
+    def piece_queue(self, seed=None):
+        # 方块队列（config.PIECE_QUEUE: uniform | bag）
+        return PieceQueue(len(self.piece_table), seed, getattr(self.config, 'PIECE_QUEUE', 'uniform'))
 
     def _get_config_from_yaml(self, file_path):
-        config = self._dict_to_struct(yaml.safe_load(open(file_path, 'r')))
+        config = self._dict_to_struct(load_config(file_path))
         return config
     
     def _dict_to_struct(self, d):
         return SimpleNamespace(**{k: self._dict_to_struct(v) if isinstance(v, dict) else v for k, v in d.items()})
     
 class Systems:
-    def __init__(self, game_manager) -> None:
+    def __init__(self, game_manager, queue=None, get_ticks=None, on_lock=None) -> None:
         self.game_manager = game_manager
         self.config = game_manager.config
         self.sys_input = InputSystem()
-        self.sys_movement = MovementSystem()
-        self.sys_collision = CollisionSystem(self.config)
-        self.sys_clear_line = ClearLinesSystem()
-        self.sys_render = RenderSystem(self.game_manager.screen, self.config)
-        self.sys_map = MapSystem()
-        self.sys_spawn = SpawnSystem(self.game_manager.shapes, self.config)
+        self.sys_movement = MovementSystem(get_ticks)
+        self.sys_collision = CollisionSystem(self.config, on_lock)
+        self.sys_clear_line = ClearLinesSystem(game_manager.kernels)
+        # 无界面模式不创建渲染系统，也不导入pygame
+        self.sys_render = None
+        if not game_manager.headless:
+            from render import RenderSystem
+            self.sys_render = RenderSystem(self.game_manager.screen, self.config)
+        self.sys_map = MapSystem(game_manager.kernels)
+        self.sys_spawn = SpawnSystem(self.game_manager.piece_table, self.config, queue or game_manager.piece_queue())
         self.sys_rotation = RotationSystem()
 
 class Entities:
-    def __init__(self, game_manager) -> None:
+    def __init__(self, game_manager, queue=None) -> None:
         self.game_manager = game_manager
         self.config = game_manager.config
+        self.queue = queue or game_manager.piece_queue()
+        self.palette = Palette()
         self.entity_manager = EntityManager()
         self._init_block()
         self._init_map()
 
     def _init_block(self):
-        random_shapes = random.choices(self.game_manager.shapes, k=2)
-        shape = random_shapes[0]
-        next_shape = random_shapes[1]
+        piece_table = self.game_manager.piece_table
+        piece_id, color = self.queue.next()
+        next_piece_id, next_color = self.queue.next()
+        shape = ShapeComponent(piece_table, piece_id)
+        next_shape = ShapeComponent(piece_table, next_piece_id)
         self.create_entity(
             'block',
             PositionComponent(self.config.PLAYFIELD_WIDTH // 2 - len(self.game_manager.shapes[0]) // 2, 0),
             SpeedComponent(0, self.config.FALL_SPEED, self.config.HARD_DROP_SPEED), 
-            ShapeComponent(shape), 
-            ColorComponent(), 
+            shape, 
+            ColorComponent(self.palette, color), 
             StateComponent(lock_delay_frames=self.config.LOCK_DELAY_FRAMES)
         )
         self.create_entity(
             'next_block',
             PositionComponent(self.config.PLAYFIELD_WIDTH // 2 - len(self.game_manager.shapes[0]) // 2, 0),
             SpeedComponent(0, self.config.FALL_SPEED, self.config.HARD_DROP_SPEED), 
-            ShapeComponent(next_shape), 
-            ColorComponent(), 
-            StateComponent(lock_delay_frames=self.config.LOCK_DELAY_FRAMES)
+            next_shape, 
+            ColorComponent(self.palette, next_color), 
+            StateComponent(lock_delay_frames=self.config.LOCK_DELAY_FRAMES),
+            NextComponent()
         )
 
     def _init_map(self):
         self.create_entity(
             'map',
-            MapComponent(np.zeros((self.config.PLAYFIELD_HEIGHT, self.config.PLAYFIELD_WIDTH), dtype=int), self.config.FALL_SPEED, self.config.LOCK_DELAY_FRAMES)
+            MapComponent(make_board(self.config, kernels=self.game_manager.kernels), self.palette, self.config.FALL_SPEED, self.config.LOCK_DELAY_FRAMES)
         )
 
     def create_entity(self, entity_type, *components):
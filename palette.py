@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 18:10:26
+Contact     : zoe4896@outlook.com
+Description : 颜色调色板，场地颜色以uint8索引存储
+'''
+import numpy as np
+
+PALETTE_SIZE = 256
+
+# 调色板：索引0为空格（黑色），其余在ColorComponent分配颜色时依次加入
+class Palette:
+    def __init__(self) -> None:
+        self.colors = np.zeros((PALETTE_SIZE, 3), dtype=np.uint8)
+        self.size = 1
+        self._lookup = {}
+        # colors与_lookup被快照引用时为True，加入新颜色前复制
+        self._shared = False
+
+    def index(self, color):
+        idx = self._lookup.get(color)
+        if idx is None:
+            if self.size >= PALETTE_SIZE:
+                raise ValueError('palette is full')
+            if self._shared:
+                self.colors = self.colors.copy()
+                self._lookup = dict(self._lookup)
+                self._shared = False
+            idx = self.size
+            self.colors[idx] = color
+            self._lookup[color] = idx
+            self.size += 1
+        return idx
+
+    def copy(self):
+        palette = Palette()
+        palette.colors[:] = self.colors
+        palette.size = self.size
+        palette._lookup = dict(self._lookup)
+        return palette
+
+    def snapshot(self):
+        self._shared = True
+        return self.colors, self._lookup, self.size
+
+    def restore(self, state):
+        self.colors, self._lookup, self.size = state
+        self._shared = True
+
+    def rgb(self, indices):
+        # 索引数组转RGB数组
+        return self.colors[indices]
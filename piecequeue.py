@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 08:52:40
+Contact     : zoe4896@outlook.com
+Description : 预先生成的方块队列：按seed成块生成方块编号与颜色，整局的方块序列可以提前算出
+              uniform: 每个方块独立均匀抽取
+              bag:     7-bag，每连续len(方块)个为全部方块的一个随机排列
+'''
+import numpy as np
+from itertools import product
+from component import COLOR_LEVELS, COLOR_STEP
+
+QUEUE_MODES = ('uniform', 'bag')
+# 每次生成的方块数
+QUEUE_BLOCK = 4096
+
+# 颜色编号 -> RGB，每个分量6档（50~200，步长30），与ColorComponent的量化相同
+COLORS = tuple(tuple(50 + level * COLOR_STEP for level in levels) for levels in product(range(COLOR_LEVELS), repeat=3))
+
+def generate(count, piece_count, mode='uniform', rng=None):
+    # 返回(方块编号, 颜色编号)两个长为count的数组
+    rng = rng if rng is not None else np.random.default_rng()
+    if mode == 'uniform':
+        pieces = rng.integers(piece_count, size=count, dtype=np.int8)
+    elif mode == 'bag':
+        # 每行一包，按随机数排序得到随机排列
+        bags = -(-count // piece_count)
+        pieces = np.argsort(rng.random((bags, piece_count)), axis=1).astype(np.int8).ravel()[:count]
+    else:
+        raise ValueError(f'unknown piece queue mode: {mode}')
+    colors = rng.integers(len(COLORS), size=count, dtype=np.int16)
+    return pieces, colors
+
+# 方块队列
+# 第k块由SeedSequence(seed, spawn_key=(k,))单独生成，任意位置都可以直接定位，
+# 状态只有当前位置（快照、录像定位不必保存随机数生成器状态）。
+# seed为None时取随机熵，之后同样可重现
+class PieceQueue:
+    def __init__(self, piece_count, seed=None, mode='uniform', block=QUEUE_BLOCK) -> None:
+        if mode not in QUEUE_MODES:
+            raise ValueError(f'unknown piece queue mode: {mode}')
+        if mode == 'bag':
+            # 一包不跨块
+            block -= block % piece_count
+        self.piece_count = piece_count
+        self.mode = mode
+        self.block = block
+        self.entropy = np.random.SeedSequence(seed % (1 << 64) if seed is not None else None).entropy
+        self.position = 0
+        self._index = None
+        self._pieces = None
+        self._colors = None
+
+    def _generate(self, index):
+        rng = np.random.default_rng(np.random.SeedSequence(self.entropy, spawn_key=(index,)))
+        return generate(self.block, self.piece_count, self.mode, rng)
+
+    def _load(self, index):
+        # 逐个取用时Python列表比NumPy标量快
+        pieces, colors = self._generate(index)
+        self._index = index
+        self._pieces = pieces.tolist()
+        self._colors = colors.tolist()
+
+    def next(self):
+        # 返回(方块编号, RGB颜色)并前进一个
+        index, offset = divmod(self.position, self.block)
+        if index != self._index:
+            self._load(index)
+        self.position += 1
+        return self._pieces[offset], COLORS[self._colors[offset]]
+
+    def peek(self, count, start=None):
+        # 从start（默认当前位置）起的count个方块编号，不改变位置
+        start = self.position if start is None else start
+        first, last = start // self.block, (start + count - 1) // self.block
+        pieces = np.concatenate([self._generate(index)[0] for index in range(first, last + 1)]) if count > 0 else np.zeros(0, dtype=np.int8)
+        offset = start - first * self.block
+        return pieces[offset:offset + count]
+
+    def getstate(self):
+        return self.position
+
+    def setstate(self, state):
+        self.position = state
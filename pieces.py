@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 13:05:16
+Contact     : zoe4896@outlook.com
+Description : 方块旋转表，启动时由GameManager.shapes一次性生成
+'''
+import numpy as np
+
+ROTATIONS = 4
+
+# 单个旋转状态，生成后只读
+class PieceRotation:
+    def __init__(self, cells) -> None:
+        cells = np.array(cells, dtype=int)
+        cells.setflags(write=False)
+        self.cells = cells
+        self.height, self.width = cells.shape
+        self.mask = cells != 0
+        self.mask.setflags(write=False)
+        rows, cols = np.nonzero(cells)
+        # 方块格子相对包围盒左上角的偏移
+        self.offsets = tuple(zip(rows.tolist(), cols.tolist()))
+        self.offset_rows = rows
+        self.offset_cols = cols
+        self.offset_bits = np.left_shift(1, cols)
+        # 轮廓：每行最左/最右格子的列，每列最低/最高格子的行，空行/空列为-1
+        self.left = tuple(int(np.flatnonzero(row)[0]) if row.any() else -1 for row in cells)
+        self.right = tuple(int(np.flatnonzero(row)[-1]) if row.any() else -1 for row in cells)
+        self.bottom = tuple(int(np.flatnonzero(col)[-1]) if col.any() else -1 for col in cells.T)
+        self.top = tuple(int(np.flatnonzero(col)[0]) if col.any() else -1 for col in cells.T)
+        self.bottom_cols = np.array([c for c, r in enumerate(self.bottom) if r >= 0])
+        self.bottom_rows = np.array([r for r in self.bottom if r >= 0])
+        # 每行位掩码，第c列对应第c位
+        self.row_masks = tuple(sum(1 << c for c in np.flatnonzero(row).tolist()) for row in cells)
+
+# 旋转表：rotations[piece_id][rotation]，rotation每次顺时针旋转90度
+class PieceTable:
+    def __init__(self, shapes) -> None:
+        self.rotations = []
+        for shape in shapes:
+            states = []
+            cells = np.asarray(shape)
+            for _ in range(ROTATIONS):
+                states.append(PieceRotation(cells))
+                cells = np.rot90(cells, -1)
+            self.rotations.append(tuple(states))
+        self.rotations = tuple(self.rotations)
+
+    def __len__(self):
+        return len(self.rotations)
+
+    def get(self, piece_id, rotation=0):
+        return self.rotations[piece_id][rotation % ROTATIONS]
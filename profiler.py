@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 20:12:09
+Contact     : zoe4896@outlook.com
+Description : 逐帧、逐系统的耗时统计与导出
+'''
+import sys
+import json
+import time
+from collections import deque
+import numpy as np
+
+# 需要计时的系统（Systems上的属性名）
+SYSTEM_NAMES = ('sys_input', 'sys_rotation', 'sys_map', 'sys_collision', 'sys_movement', 'sys_clear_line', 'sys_spawn', 'sys_render')
+
+# 帧性能分析器
+# 通过替换实例方法计时，未开启时不做任何包装；同一帧内多次调用的同一系统记为 name、name#2 ...
+# 每个计时项保留最近window帧的耗时，用于计算p50/p95/p99
+class FrameProfiler:
+    def __init__(self, fps, window=3600, export_path=None, track_alloc=False) -> None:
+        self.budget_ns = 1e9 / fps
+        self.window = window
+        self.track_alloc = track_alloc
+        self.samples = {}
+        self.frame_samples = deque(maxlen=window)
+        self.alloc_samples = deque(maxlen=window)
+        self.frames = 0
+        self.dropped_frames = 0
+        self._frame = {}
+        self._calls = {}
+        self._frame_start = 0
+        self._alloc_start = 0
+        self._export = None
+        self._export_json = False
+        if export_path:
+            # .json/.jsonl 每帧一行JSON，其余按CSV长表（frame, section, us）
+            self._export_json = export_path.endswith(('.json', '.jsonl'))
+            self._export = open(export_path, 'w')
+            if not self._export_json:
+                self._export.write('frame,section,us\n')
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.FPS,
+            export_path=getattr(config, 'PROFILE_EXPORT', None) or None,
+            track_alloc=getattr(config, 'PROFILE_ALLOC', False),
+        )
+
+    def wrap(self, obj, attr, name=None):
+        name = name or attr
+        fn = getattr(obj, attr)
+        perf_counter_ns = time.perf_counter_ns
+        record = self.record
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            result = fn(*args, **kwargs)
+            record(name, perf_counter_ns() - start)
+            return result
+        setattr(obj, attr, timed)
+
+    def instrument(self, systems):
+        for name in SYSTEM_NAMES:
+            system = getattr(systems, name, None)
+            if system is not None:
+                self.wrap(system, 'process', name)
+
+    def record(self, name, ns):
+        count = self._calls.get(name, 0) + 1
+        self._calls[name] = count
+        if count > 1:
+            name = f'{name}#{count}'
+        self._frame[name] = self._frame.get(name, 0) + ns
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter_ns()
+        if self.track_alloc:
+            self._alloc_start = sys.getallocatedblocks()
+
+    def end_frame(self):
+        frame_ns = time.perf_counter_ns() - self._frame_start
+        self.frames += 1
+        self.frame_samples.append(frame_ns)
+        if frame_ns > self.budget_ns:
+            self.dropped_frames += 1
+        if self.track_alloc:
+            # 本帧净增的内存块数
+            self.alloc_samples.append(sys.getallocatedblocks() - self._alloc_start)
+        for name, ns in self._frame.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(ns)
+        if self._export is not None:
+            self._write(frame_ns)
+        self._frame.clear()
+        self._calls.clear()
+
+    def _write(self, frame_ns):
+        if self._export_json:
+            record = {'frame': self.frames, 'frame_us': frame_ns / 1000, 'dropped': frame_ns > self.budget_ns}
+            record.update((name, ns / 1000) for name, ns in self._frame.items())
+            if self.track_alloc:
+                record['alloc_blocks'] = self.alloc_samples[-1]
+            self._export.write(json.dumps(record) + '\n')
+        else:
+            lines = [f'{self.frames},frame,{frame_ns / 1000:.1f}\n']
+            lines.extend(f'{self.frames},{name},{ns / 1000:.1f}\n' for name, ns in self._frame.items())
+            self._export.writelines(lines)
+
+    def percentiles(self):
+        # {name: (p50, p95, p99)}，单位微秒
+        result = {'frame': self._percentiles(self.frame_samples)}
+        for name, samples in self.samples.items():
+            result[name] = self._percentiles(samples)
+        return result
+
+    def _percentiles(self, samples):
+        if not samples:
+            return (0.0, 0.0, 0.0)
+        return tuple((np.percentile(np.fromiter(samples, dtype=np.int64), (50, 95, 99)) / 1000).tolist())
+
+    def report(self):
+        lines = [f'{"section":<16}{"p50 us":>10}{"p95 us":>10}{"p99 us":>10}']
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f'{name:<16}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}')
+        lines.append(f'frames: {self.frames}  dropped: {self.dropped_frames} (budget {self.budget_ns / 1e6:.2f} ms)')
+        if self.alloc_samples:
+            lines.append(f'alloc blocks/frame: {np.mean(self.alloc_samples):.1f}')
+        return '\n'.join(lines)
+
+    def close(self):
+        if self._export is not None:
+            self._export.close()
+            self._export = None
+
+# 屏幕右下角的性能浮层，每秒刷新一次文字
+class ProfilerOverlay:
+    def __init__(self, profiler, screen, fps) -> None:
+        import pygame
+        self.profiler = profiler
+        self.screen = screen
+        self.interval = fps
+        self.font = pygame.font.Font(None, 18)
+        self.rect = pygame.Rect(screen.get_width() - 150, screen.get_height() - 170, 150, 170)
+        self.surface = pygame.Surface(self.rect.size)
+
+    def draw(self):
+        if self.profiler.frames % self.interval == 0:
+            self.surface.fill((0, 0, 0))
+            lines = [f'drop {self.profiler.dropped_frames}/{self.profiler.frames}']
+            lines += [f'{name[4:] if name.startswith("sys_") else name} {p50:.0f}/{p99:.0f}us' for name, (p50, _, p99) in self.profiler.percentiles().items()]
+            for idx, line in enumerate(lines[:self.rect.height // 14]):
+                self.surface.blit(self.font.render(line, True, (0, 255, 0)), (4, 2 + idx * 14))
+        self.screen.blit(self.surface, self.rect)
+        return self.rect
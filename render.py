@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 08:14:52
+Contact     : zoe4896@outlook.com
+Description : 渲染系统（从system.py分出，游戏逻辑模块不导入pygame）
+'''
+import pygame
+import numpy as np
+from functools import lru_cache
+from component import PositionComponent, ShapeComponent, ColorComponent, StateComponent, MapComponent, NextComponent
+from system import PREVIEW
+
+# 字体与文字表面每个进程只创建一次，重新开始（Game._init重建RenderSystem）时直接复用；
+# pygame.quit()后字体失效，缓存随之清空
+@lru_cache(maxsize=None)
+def font(size):
+    pygame.register_quit(clear_cache)
+    return pygame.font.Font(None, size)
+
+@lru_cache(maxsize=256)
+def text(string, color, size=36):
+    return font(size).render(string, True, color)
+
+def clear_cache():
+    font.cache_clear()
+    text.cache_clear()
+
+# 渲染系统
+class RenderSystem:
+    def __init__(self, screen, config):
+        self.screen = screen
+        self.block_size = config.BLOCK_SIZE
+        self.real_block_size = self.block_size-3
+        self.play_field = pygame.Surface((config.PLAYFIELD_WIDTH, config.PLAYFIELD_HEIGHT))
+        self.score_board = pygame.Surface((config.SCOREBOARD_WIDTH, config.SCOREBOARD_HEIGHT))
+        self.game_over_text = text("Y o u  D i e d !", (255, 0, 0))
+        self.game_over_text_rect = self.game_over_text.get_rect(center=((self.play_field.get_width()*self.block_size) // 2, (self.play_field.get_height()*self.block_size) // 2))
+        self.pause_text = text("P A U S E D", (255, 0, 0))
+        self.pause_text_rect = self.game_over_text.get_rect(center=((self.play_field.get_width()*self.block_size) // 2, (self.play_field.get_height()*self.block_size) // 2))
+
+        # 缓存的背景：已锁定方块、计分板、下一个方块预览，不含下落中的方块与提示文字
+        self.background = pygame.Surface(self.screen.get_size())
+        self.screen_rect = self.screen.get_rect()
+        self.score_board_pos = (self.screen.get_width()-self.score_board.get_size()[0], 0)
+        self.next_block_rect = pygame.Rect(11 * self.block_size, 10 * self.block_size, 4 * self.block_size, 4 * self.block_size)
+        self._map_version = None
+        self._overlay = None
+        self._score = None
+        self._next_block = None
+        self._active_cells = {}
+        # 8位调色板表面，像素直接存颜色索引；每个像素对应的格子，间隙像素指向补0的最后一行/列
+        self.cell_surface = pygame.Surface((config.PLAYFIELD_WIDTH * self.block_size, config.PLAYFIELD_HEIGHT * self.block_size), depth=8)
+        # 已设置到cell_surface的调色板及其颜色数；导出时同一个RenderSystem跨对局复用，调色板对象会更换
+        self._palette = None
+        self._palette_size = 0
+        offset = np.arange(self.block_size) < self.real_block_size
+        self._pixel_cols = np.where(np.tile(offset, config.PLAYFIELD_WIDTH), np.repeat(np.arange(config.PLAYFIELD_WIDTH), self.block_size), config.PLAYFIELD_WIDTH)
+        self._pixel_rows = np.where(np.tile(offset, config.PLAYFIELD_HEIGHT), np.repeat(np.arange(config.PLAYFIELD_HEIGHT), self.block_size), config.PLAYFIELD_HEIGHT)
+        self._padded_color_map = np.zeros((config.PLAYFIELD_HEIGHT + 1, config.PLAYFIELD_WIDTH + 1), dtype=np.uint8)
+        # 落点提示（ghost piece），由列高直接算出落点行
+        self.ghost = getattr(config, 'GHOST_PIECE', True)
+
+    def process(self, entities):
+        # 只重绘变化的区域，返回需要提交给pygame.display.update的矩形
+        self.map_mat = entities.single(MapComponent)
+        dirty = []
+        overlay = (self.map_mat.paused, self.map_mat.game_over)
+        full = self._map_version != self.map_mat.version or self._overlay != overlay
+        if full:
+            # 锁定/消行/暂停/结束时整帧重绘
+            self._map_version = self.map_mat.version
+            self._overlay = overlay
+            self._score = None
+            self._next_block = None
+            self._active_cells = {}
+            self.background.fill((0, 0, 0))
+            self.background.blit(self.play_field, (0, 0))
+            self._render_block(self.background, self.map_mat.color_map)
+        dirty += self._render_score()
+        dirty += self._render_next_block(entities)
+        if full:
+            self.screen.blit(self.background, (0, 0))
+            dirty = [self.screen_rect]
+        dirty += self._render_active(entities)
+        if self.map_mat.game_over:
+            self._render_game_over()
+        if self.map_mat.paused:
+            self._render_pause()
+        return dirty
+
+    def invalidate(self):
+        # 丢弃全部缓存，下一帧整帧重绘（恢复快照后）
+        self._map_version = None
+        self._palette = None
+        self._palette_size = 0
+
+    def _render_pause(self):
+        self.screen.blit(self.pause_text, self.pause_text_rect)
+
+    def _render_next_block(self, entities):
+        next_shape, next_color, _ = entities.query(ShapeComponent, ColorComponent, NextComponent)[0]
+        key = (next_shape, next_shape.piece_id, next_shape.rotation, next_color.color)
+        if key == self._next_block:
+            return []
+        self._next_block = key
+        self.background.fill((0, 0, 0), self.next_block_rect)
+        # 获取方块的非零索引
+        next_piece = next_shape.piece
+        # 计算方块的绘制位置
+        next_block_positions = (11 + next_piece.offset_cols, 10 + next_piece.offset_rows)
+        # 创建方块表面
+        next_block_surface = pygame.Surface((self.real_block_size, self.real_block_size))
+        next_block_surface.fill(next_color.color)
+        # 批量绘制所有方块
+        for x, y in zip(next_block_positions[0], next_block_positions[1]):
+            next_block_rect = pygame.Rect(x * self.block_size, y * self.block_size, self.real_block_size, self.real_block_size)
+            self.background.blit(next_block_surface, next_block_rect)
+        self.screen.blit(self.background, self.next_block_rect, self.next_block_rect)
+        return [self.next_block_rect]
+
+    def _render_block(self, surface, color_mat):
+        # 调色板索引矩阵按像素查表放大，每格只填充real_block_size，其余为间隙
+        palette = self.map_mat.palette
+        if palette is not self._palette or palette.size != self._palette_size:
+            self._palette = palette
+            self._palette_size = palette.size
+            self.cell_surface.set_palette([tuple(color) for color in palette.colors.tolist()])
+        self._padded_color_map[:-1, :-1] = color_mat
+        pygame.surfarray.blit_array(self.cell_surface, self._padded_color_map.T[self._pixel_cols[:, None], self._pixel_rows[None, :]])
+        surface.blit(self.cell_surface, (0, 0))
+
+    def _render_active(self, entities):
+        # 下落中的方块：离开的格子用背景还原，进入的格子重新绘制；落点提示的格子颜色记为负索引
+        rows, cols = np.nonzero(self.map_mat.active_color_map)
+        cells = dict(zip(zip(rows.tolist(), cols.tolist()), self.map_mat.active_color_map[rows, cols].tolist()))
+        if self.ghost:
+            for position, shape, state, color in entities.query(PositionComponent, ShapeComponent, StateComponent, ColorComponent, exclude=PREVIEW):
+                if state.active:
+                    piece = shape.piece
+                    ghost_y = self.map_mat.board.drop_row(piece, position.x, position.y)
+                    for r, c in piece.offsets:
+                        cells.setdefault((ghost_y + r, position.x + c), -color.index)
+        palette = self.map_mat.palette.colors
+        dirty = []
+        for cell, color in self._active_cells.items():
+            if cells.get(cell) != color:
+                rect = pygame.Rect(cell[1] * self.block_size, cell[0] * self.block_size, self.block_size, self.block_size)
+                self.screen.blit(self.background, rect, rect)
+                dirty.append(rect)
+        for cell, color in cells.items():
+            if self._active_cells.get(cell) != color:
+                rect = pygame.Rect(cell[1] * self.block_size, cell[0] * self.block_size, self.real_block_size, self.real_block_size)
+                if color > 0:
+                    pygame.draw.rect(self.screen, palette[color], rect)
+                else:
+                    # 先还原背景：格子可能刚由下落方块变为落点提示
+                    self.screen.blit(self.background, rect, rect)
+                    pygame.draw.rect(self.screen, palette[-color], rect, 2)
+                dirty.append(rect)
+        self._active_cells = cells
+        return dirty
+
+    def _render_score(self):
+        # 分数变化时才重新渲染文字
+        if self.map_mat.score == self._score:
+            return []
+        self._score = self.map_mat.score
+        self.score_board.fill((255,255,255))
+        self.background.blit(self.score_board, self.score_board_pos)
+        score_text = text(str(self.map_mat.score), (0, 0, 255))
+        score_rect = score_text.get_rect(center=(self.screen.get_width() - self.score_board.get_rect().centerx, self.score_board.get_rect().centery//2))
+        self.background.blit(score_text, score_rect)
+        score_board_rect = self.score_board.get_rect(topleft=self.score_board_pos)
+        self.screen.blit(self.background, score_board_rect, score_board_rect)
+        return [score_board_rect]
+    
+    def _render_game_over(self):
+        self.screen.blit(self.game_over_text, self.game_over_text_rect)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 20:14:36
+Contact     : zoe4896@outlook.com
+Description : 对局录像：seed + 紧凑的(帧, 动作)二进制流，无界面重放与按帧定位
+              用法：python replay.py game.replay --seek 3600
+                    python replay.py game.replay --build-index
+'''
+import io
+import zlib
+import struct
+import pickle
+import argparse
+import numpy as np
+from headless import HeadlessGame, ACTIONS
+from snapshot import GameSnapshot
+
+MAGIC = b'CUBR'
+# 2: 硬降在一帧内完成
+# 3: 方块与颜色来自方块队列（piecequeue.py）
+VERSION = 3
+# magic, version, seed, 总帧数, 配置校验值, 动作流字节数
+_HEADER = struct.Struct('<4sBqIII')
+
+# 动作编码为一个字节，未映射的按键（None）编码为len(ACTIONS)
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS + (None,))}
+CODE_ACTIONS = ACTIONS + (None,)
+
+# 影响逻辑帧结果的配置项，重放时必须一致
+REPLAY_CONFIG_KEYS = ('FPS', 'FALL_SPEED', 'HARD_DROP_SPEED', 'LOCK_DELAY_FRAMES', 'PLAYFIELD_WIDTH', 'PLAYFIELD_HEIGHT', 'PIECE_QUEUE')
+
+# 定位快照间隔（帧），定位最多重放这么多帧
+SNAPSHOT_INTERVAL = 600
+
+# 可选的定位快照索引，附在动作流之后：magic, 快照间隔, 压缩数据字节数
+INDEX_MAGIC = b'CUBI'
+_INDEX_HEADER = struct.Struct('<4sII')
+
+# 索引中允许出现的全局对象：快照、组件类与NumPy数组重建函数（录像文件可能来自他人，不能任意反序列化）
+_INDEX_GLOBALS = {
+    ('snapshot', 'GameSnapshot'),
+    ('numpy', 'ndarray'),
+    ('numpy', 'dtype'),
+    ('numpy.core.multiarray', '_reconstruct'),
+    ('numpy.core.multiarray', 'scalar'),
+    ('numpy._core.multiarray', '_reconstruct'),
+    ('numpy._core.multiarray', 'scalar'),
+    ('numpy.core.numeric', '_frombuffer'),
+    ('numpy._core.numeric', '_frombuffer'),
+}
+
+# 方块表等对局共享的对象不写入索引，载入时换成重放对局自己的对象
+class _IndexPickler(pickle.Pickler):
+    def __init__(self, file, shared) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.shared = {id(obj): name for name, obj in shared.items()}
+
+    def persistent_id(self, obj):
+        return self.shared.get(id(obj))
+
+class _IndexUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared) -> None:
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, pid):
+        if pid not in self.shared:
+            raise pickle.UnpicklingError(f'unknown shared object: {pid}')
+        return self.shared[pid]
+
+    def find_class(self, module, name):
+        if (module == 'component' and name.endswith('Component')) or (module, name) in _INDEX_GLOBALS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f'replay index may not reference {module}.{name}')
+
+def _freeze(value):
+    # 快照中的数组是写时复制的只读数组，反序列化后恢复只读
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, GameSnapshot):
+        for name in GameSnapshot.__slots__:
+            _freeze(getattr(value, name))
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            _freeze(item)
+
+def config_hash(config):
+    return zlib.crc32(repr(tuple(getattr(config, key, None) for key in REPLAY_CONFIG_KEYS)).encode())
+
+# 录像器
+# 每个动作记为 varint(与上一动作的帧差) + 1字节动作码，同一帧的多个动作帧差为0；
+# 只在有动作的帧追加字节，没有输入的帧不产生任何开销
+class ReplayRecorder:
+    def __init__(self, seed, config) -> None:
+        self.seed = seed
+        self.config_hash = config_hash(config)
+        self.data = bytearray()
+        self.last_tick = 0
+
+    @classmethod
+    def attach(cls, game):
+        # 从第0帧开始录制HeadlessGame
+        if game.seed is None or game.tick != 0:
+            raise ValueError('recording needs a seeded game at tick 0')
+        game.recorder = recorder = cls(game.seed, game.config)
+        return recorder
+
+    def record(self, tick, actions):
+        data = self.data
+        delta = tick - self.last_tick
+        self.last_tick = tick
+        for action in actions:
+            while delta >= 0x80:
+                data.append((delta & 0x7f) | 0x80)
+                delta >>= 7
+            data.append(delta)
+            data.append(ACTION_CODES[action])
+            delta = 0
+
+    def finish(self, ticks):
+        return Replay(self.seed, ticks, bytes(self.data), self.config_hash)
+
+# 录像
+# index: 可选的定位快照索引（压缩后的字节，由ReplayPlayer.dump_index生成），随录像文件保存
+class Replay:
+    def __init__(self, seed, ticks, data, config_hash=0, index=None) -> None:
+        self.seed = seed
+        self.ticks = ticks
+        self.data = data
+        self.config_hash = config_hash
+        self.index = index
+
+    def events(self):
+        # 逐个解码(帧, 动作)
+        data = self.data
+        tick = 0
+        i = 0
+        while i < len(data):
+            delta = 0
+            shift = 0
+            while data[i] & 0x80:
+                delta |= (data[i] & 0x7f) << shift
+                shift += 7
+                i += 1
+            delta |= data[i] << shift
+            tick += delta
+            yield tick, CODE_ACTIONS[data[i + 1]]
+            i += 2
+
+    def actions_by_tick(self):
+        actions = {}
+        for tick, action in self.events():
+            actions.setdefault(tick, []).append(action)
+        return actions
+
+    def to_bytes(self):
+        buffer = _HEADER.pack(MAGIC, VERSION, self.seed, self.ticks, self.config_hash, len(self.data)) + self.data
+        if self.index is not None:
+            interval, payload = self.index
+            buffer += _INDEX_HEADER.pack(INDEX_MAGIC, interval, len(payload)) + payload
+        return buffer
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        magic, version, seed, ticks, config_hash, size = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError('not a replay file')
+        if version != VERSION:
+            raise ValueError(f'unsupported replay version: {version}')
+        data = bytes(buffer[_HEADER.size:_HEADER.size + size])
+        if len(data) != size:
+            raise ValueError('truncated replay file')
+        index = None
+        offset = _HEADER.size + size
+        if len(buffer) >= offset + _INDEX_HEADER.size:
+            magic, interval, length = _INDEX_HEADER.unpack_from(buffer, offset)
+            payload = bytes(buffer[offset + _INDEX_HEADER.size:offset + _INDEX_HEADER.size + length])
+            # 索引不完整时忽略，重放时重新生成快照
+            if magic == INDEX_MAGIC and len(payload) == length:
+                index = (interval, payload)
+        return cls(seed, ticks, data, config_hash, index)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+# 录像播放器
+# 在HeadlessGame上不限速重放，经过的每SNAPSHOT_INTERVAL帧保存一次快照，
+# seek(tick)从不晚于tick的最近快照恢复后最多重放interval帧。
+# 录像带有定位快照索引（间隔与场地后端一致）时直接载入，第一次定位也不必从第0帧重放
+class ReplayPlayer:
+    def __init__(self, replay, config_path='config.yaml', game_manager=None, snapshot_interval=SNAPSHOT_INTERVAL) -> None:
+        self.replay = replay
+        self.game = HeadlessGame(config_path, replay.seed, game_manager)
+        if replay.config_hash and replay.config_hash != config_hash(self.game.config):
+            raise ValueError('replay was recorded with a different config')
+        self.snapshot_interval = snapshot_interval
+        self.actions = replay.actions_by_tick()
+        self.snapshots = {0: self.game.snapshot()}
+        if replay.index is not None and replay.index[0] == snapshot_interval:
+            self.snapshots.update(self.load_index(replay.index[1]))
+
+    @property
+    def tick(self):
+        return self.game.tick
+
+    def seek(self, tick):
+        tick = max(0, min(tick, self.replay.ticks))
+        game = self.game
+        if not game.tick <= tick < game.tick + self.snapshot_interval:
+            # 只能跳到已经重放经过的快照，更远的目标从最后一个快照继续重放
+            start = min(tick - tick % self.snapshot_interval, max(self.snapshots))
+            if start > game.tick or tick < game.tick:
+                game.restore(self.snapshots[start])
+        self._advance(tick)
+        return game
+
+    def run(self):
+        # 重放到结尾，返回对局结果
+        self._advance(self.replay.ticks)
+        return self.game.result()
+
+    def build_index(self):
+        # 预先重放一遍生成全部快照
+        self.run()
+        return self
+
+    def dump_index(self):
+        # 已生成的快照序列化为录像索引，先build_index可得到完整索引
+        buffer = io.BytesIO()
+        shared = {'piece_table': self.game.game_manager.piece_table}
+        board = type(self.game.map.board).__name__
+        _IndexPickler(buffer, shared).dump((board, self.snapshots))
+        return self.snapshot_interval, zlib.compress(buffer.getvalue())
+
+    def load_index(self, payload):
+        # 返回{帧: 快照}；场地后端不同（快照中的场地状态格式不同）时返回空表
+        shared = {'piece_table': self.game.game_manager.piece_table}
+        board, snapshots = _IndexUnpickler(io.BytesIO(zlib.decompress(payload)), shared).load()
+        if board != type(self.game.map.board).__name__:
+            return {}
+        _freeze(list(snapshots.values()))
+        return snapshots
+
+    def _advance(self, tick):
+        game = self.game
+        actions = self.actions
+        interval = self.snapshot_interval
+        snapshots = self.snapshots
+        while game.tick < tick:
+            if game.tick % interval == 0 and game.tick not in snapshots:
+                snapshots[game.tick] = game.snapshot()
+            game.step(actions.get(game.tick, ()))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('replay')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--seek', type=int, default=None, help='定位到指定帧并打印状态')
+    parser.add_argument('--build-index', action='store_true', help='生成定位快照索引并写回录像文件')
+    args = parser.parse_args()
+
+    replay = Replay.load(args.replay)
+    player = ReplayPlayer(replay, args.config)
+    if args.build_index:
+        replay.index = player.build_index().dump_index()
+        replay.save(args.replay)
+        print(f'{len(player.snapshots)} snapshots, {len(replay.index[1])} bytes')
+    elif args.seek is not None:
+        game = player.seek(args.seek)
+        print(f'tick: {game.tick}  score: {game.score}  pieces: {game.pieces}')
+        print(game.map.board.cells() | game.map.active_map)
+    else:
+        print(player.run())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 01:40:22
+Contact     : zoe4896@outlook.com
+Description : 固定步长调度：逻辑帧按固定频率推进，渲染独立、负载高时跳帧，统计输入到显示的延迟
+'''
+import time
+from collections import deque
+import numpy as np
+
+# 固定步长调度器
+# 累加器记录尚未模拟的真实时间，每满一个逻辑帧间隔执行一帧逻辑（含输入轮询）；
+# 一次最多追max_catch_up帧，更多的欠账直接丢弃，避免越落越远。
+# 每轮最多渲染一次，render_fps > 0时再限制渲染频率，因此渲染慢时只少画帧，逻辑帧数与结果不变。
+# 时间用整数纳秒，避免浮点累加器差一点凑不满一帧时空转
+# 延迟从处理输入的逻辑帧开始计到该帧结果提交显示为止，不含事件在队列中等待的时间（最多一个逻辑帧）
+class FixedStepScheduler:
+    def __init__(self, tick_rate, render_fps=0, max_catch_up=5, window=3600, clock=time.perf_counter_ns, sleep=time.sleep) -> None:
+        self.dt = round(1e9 / tick_rate)
+        self.render_interval = round(1e9 / render_fps) if render_fps else 0
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.sleep = sleep
+        self.accumulator = 0
+        self.ticks = 0
+        self.frames = 0
+        self.skipped_frames = 0
+        self.dropped_ticks = 0
+        self.latency_samples = deque(maxlen=window)
+        self._inputs = []
+        self._last = clock()
+        self._next_render = 0
+        self._rendered_tick = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.FPS,
+            getattr(config, 'RENDER_FPS', 0),
+            getattr(config, 'MAX_CATCH_UP_TICKS', 5),
+        )
+
+    def due(self):
+        # 本轮应执行的逻辑帧数
+        now = self.clock()
+        self.accumulator += now - self._last
+        self._last = now
+        ticks = self.accumulator // self.dt
+        if ticks > self.max_catch_up:
+            self.dropped_ticks += ticks - self.max_catch_up
+            ticks = self.max_catch_up
+            self.accumulator = 0
+        else:
+            self.accumulator -= ticks * self.dt
+        self.ticks += ticks
+        return ticks
+
+    def input(self):
+        # 当前逻辑帧处理了输入
+        self._inputs.append(self.clock())
+
+    def render_due(self):
+        if self._rendered_tick == self.ticks:
+            return False
+        return not self.render_interval or self.clock() >= self._next_render
+
+    def presented(self):
+        # 画面已提交显示
+        now = self.clock()
+        for start in self._inputs:
+            self.latency_samples.append(now - start)
+        self._inputs.clear()
+        self.frames += 1
+        self.skipped_frames += self.ticks - self._rendered_tick - 1
+        self._rendered_tick = self.ticks
+        if self.render_interval:
+            # 按固定节拍排下一次渲染，落后超过一拍时从现在重新开始
+            self._next_render += self.render_interval
+            if self._next_render <= now:
+                self._next_render = now + self.render_interval
+
+    def remaining(self):
+        # 距下一个逻辑帧的纳秒数
+        return max(0, self.dt - self.accumulator - (self.clock() - self._last))
+
+    def wait(self):
+        # 睡到下一个逻辑帧
+        remaining = self.remaining()
+        if remaining > 0:
+            self.sleep(remaining / 1e9)
+
+    def latency(self):
+        # 输入到显示延迟(p50, p95, p99)，单位毫秒
+        if not self.latency_samples:
+            return (0.0, 0.0, 0.0)
+        return tuple((np.percentile(np.fromiter(self.latency_samples, dtype=np.int64), (50, 95, 99)) / 1e6).tolist())
+
+    def report(self):
+        p50, p95, p99 = self.latency()
+        return (f'ticks: {self.ticks}  frames: {self.frames}  skipped frames: {self.skipped_frames}  dropped ticks: {self.dropped_ticks}\n'
+                f'input latency ms: p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}')
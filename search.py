@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 22:06:51
+Contact     : zoe4896@outlook.com
+Description : 落点枚举与启发式搜索（机器人用）
+'''
+import numpy as np
+from pieces import ROTATIONS
+from zobrist import zobrist_table
+from component import PositionComponent, ShapeComponent, MapComponent, NextComponent
+
+# 启发式权重：总高度、消行数、空洞数、相邻列高度差
+WEIGHTS = {
+    'aggregate_height': -0.510066,
+    'lines': 0.760666,
+    'holes': -0.35663,
+    'bumpiness': -0.184483,
+}
+
+# 方块最多4格
+PIECE_CELLS = 4
+
+# 单个方块的全部候选落点（不同的旋转状态 x 列），与场地无关，按方块缓存
+class PieceCandidates:
+    def __init__(self, piece_table, piece_id, width) -> None:
+        rotations = []
+        xs = []
+        rows = []
+        cols = []
+        bottoms = []
+        tops = []
+        seen = []
+        for rotation in range(ROTATIONS):
+            piece = piece_table.get(piece_id, rotation)
+            # 形状相同的旋转状态（如O形）只保留第一个
+            if any(np.array_equal(piece.cells, cells) for cells in seen):
+                continue
+            seen.append(piece.cells)
+            # 列底部轮廓，不足4列的补-1
+            bottom = list(piece.bottom) + [-1] * (PIECE_CELLS - piece.width)
+            top = list(piece.top) + [-1] * (PIECE_CELLS - piece.width)
+            for x in range(width - piece.width + 1):
+                rotations.append(rotation)
+                xs.append(x)
+                rows.append(piece.offset_rows)
+                cols.append(piece.offset_cols + x)
+                bottoms.append(bottom)
+                tops.append(top)
+        self.rotation = np.array(rotations)
+        self.x = np.array(xs)
+        self.rows = np.array(rows)
+        self.cols = np.array(cols)
+        self.bottom = np.array(bottoms)
+        # 场地每列中方块最高格在方块内的行号，方块不覆盖的列为-1
+        self.top = np.full((len(xs), width), -1)
+        for i, (x, top) in enumerate(zip(xs, tops)):
+            self.top[i, x:x + PIECE_CELLS] = top[:width - x]
+        self.bottom_cols = np.clip(self.x[:, None] + np.arange(PIECE_CELLS), 0, width - 1)
+        self.widths = np.array([piece_table.get(piece_id, r).width for r in rotations])
+        self.heights = np.array([piece_table.get(piece_id, r).height for r in rotations])
+        # 每个旋转状态的候选下标，按x递增
+        self.groups = [np.flatnonzero(self.rotation == r) for r in np.unique(self.rotation)]
+
+    def __len__(self):
+        return len(self.x)
+
+# 搜索结果：目标落点与到达落点的逐帧动作
+class Plan:
+    __slots__ = ('rotation', 'x', 'y', 'score', 'actions', 'evaluated')
+
+    def __init__(self, rotation, x, y, score, actions, evaluated) -> None:
+        self.rotation = rotation
+        self.x = x
+        self.y = y
+        self.score = score
+        self.actions = actions
+        self.evaluated = evaluated
+
+# 落点搜索
+# 场地为(B, H, W)的bool数组，一次处理B个场地上的全部候选落点：
+#   1. 在当前高度检查旋转与平移路径是否通畅
+#   2. 按列底部轮廓与"某行以下第一个已占格"表求硬降落点
+#   3. 放置、消行后计算启发式特征：列高与空洞数由放置前的轮廓（board.contour）增量更新，
+#      只有消行的落点重新逐格统计
+# beam_width > 0 时对得分前beam_width个落点再枚举预览方块，按两步后的最好得分选择
+# 同一场地+方块的展开结果可由置换表复用：上一步展开过的预览方块局面就是下一步的根局面
+class Planner:
+    def __init__(self, piece_table, height, width, weights=None, beam_width=4, cache=None) -> None:
+        self.piece_table = piece_table
+        self.height = height
+        self.width = width
+        weights = dict(WEIGHTS, **(weights or {}))
+        self.weights = np.array([weights['aggregate_height'], weights['lines'], weights['holes'], weights['bumpiness']])
+        self.beam_width = beam_width
+        self.candidates = [PieceCandidates(piece_table, piece_id, width) for piece_id in range(len(piece_table))]
+        self.evaluated = 0
+        # 置换表（见cache.py），None时不缓存
+        self.cache = cache
+        self.zobrist = zobrist_table(height, width)
+
+    def enumerate(self, boards, piece_id, rotation, x, y):
+        # 返回(board_index, candidate_index, landing_y)，均为一维数组
+        cand = self.candidates[piece_id]
+        count = len(boards)
+        height = self.height
+        # 当前高度上各候选位置是否与已锁定方块重叠
+        in_field = y + cand.heights <= height
+        rows = np.minimum(cand.rows + y, height - 1)
+        clear = ~boards[:, rows, cand.cols].any(axis=2) & in_field
+        # 依次旋转时包围盒需为空
+        rotation_ok = np.zeros((count, ROTATIONS), dtype=bool)
+        rotation_ok[:, rotation % ROTATIONS] = True
+        for step in range(1, ROTATIONS):
+            piece = self.piece_table.get(piece_id, rotation + step)
+            r = (rotation + step) % ROTATIONS
+            if x < 0 or y < 0 or x + piece.width > self.width or y + piece.height > height:
+                break
+            rotation_ok[:, r] = rotation_ok[:, (r - 1) % ROTATIONS] & ~boards[:, y:y+piece.height, x:x+piece.width].any(axis=(1, 2))
+        # 从x出发逐列平移，路径上每一列都需通畅
+        reachable = clear & rotation_ok[:, cand.rotation]
+        for idx in cand.groups:
+            start = np.searchsorted(cand.x[idx], min(max(x, 0), cand.x[idx[-1]]))
+            if cand.x[idx[start]] != x:
+                reachable[:, idx] = False
+                continue
+            path = reachable[:, idx]
+            path[:, start:] = np.logical_and.accumulate(path[:, start:], axis=1)
+            path[:, :start + 1] = np.logical_and.accumulate(path[:, start::-1], axis=1)[:, ::-1]
+            reachable[:, idx] = path
+        # first[b, r, c]：第r行及以下第一个已占格的行号，没有为height
+        filled = np.where(boards, np.arange(height)[:, None], height)
+        first = np.concatenate([np.minimum.accumulate(filled[:, ::-1], axis=1)[:, ::-1],
+                                np.full((count, 1, self.width), height)], axis=1)
+        below = np.minimum(y + cand.bottom + 1, height)
+        drop = first[:, below, cand.bottom_cols] - 1 - cand.bottom
+        drop = np.where(cand.bottom >= 0, drop, height).min(axis=2)
+        board_index, candidate_index = np.nonzero(reachable)
+        return board_index, candidate_index, drop[board_index, candidate_index]
+
+    def place(self, boards, piece_id, board_index, candidate_index, landing):
+        # 放置方块并消行，返回(新场地, 消行数)
+        cand = self.candidates[piece_id]
+        result = boards[board_index]
+        placed = np.arange(len(board_index))[:, None]
+        result[placed, cand.rows[candidate_index] + landing[:, None], cand.cols[candidate_index]] = True
+        full = result.all(axis=2)
+        lines = full.sum(axis=1)
+        if lines.any():
+            # 满行稳定排序到顶部后清空
+            order = np.argsort(~full, axis=1, kind='stable')
+            result = np.take_along_axis(result, order[:, :, None], axis=1)
+            result[np.arange(self.height) < lines[:, None]] = False
+        return result, lines
+
+    def measure(self, boards):
+        # 逐格统计(B, W)列高与(B,)空洞数
+        filled = boards.any(axis=1)
+        heights = np.where(filled, self.height - boards.argmax(axis=1), 0)
+        return heights, heights.sum(axis=1) - boards.sum(axis=(1, 2))
+
+    def contour(self, heights, holes, piece_id, candidate_index, landing):
+        # 放置前的列高、空洞数 -> 放置后（不消行）的列高、空洞数
+        # 落点不与已锁定方块重叠：空洞变化 = 各列新增高度之和 - 方块格子数
+        cand = self.candidates[piece_id]
+        top = cand.top[candidate_index]
+        placed = np.maximum(heights, np.where(top >= 0, self.height - landing[:, None] - top, 0))
+        return placed, holes + (placed - heights).sum(axis=1) - cand.rows.shape[1]
+
+    def evaluate(self, heights, holes, lines):
+        bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+        features = np.stack([heights.sum(axis=1), lines, holes, bumpiness], axis=1)
+        self.evaluated += len(heights)
+        return features @ self.weights
+
+    def expand(self, boards, hashes, piece_id, rotation, x, y, depth=0, contour=None):
+        # 每个场地上的全部落点：(candidate_index, landing, placed, lines, scores, heights, holes)
+        # contour: 各场地的(列高, 空洞数)，省略时逐格统计
+        # 有缓存时以(场地哈希, 方块, 旋转, x, y)为键，未命中的场地合并成一批计算
+        results = [None] * len(boards)
+        missing = []
+        for i, board_hash in enumerate(hashes):
+            if self.cache is not None:
+                results[i] = self.cache.get((board_hash, piece_id, rotation, x, y))
+            if results[i] is None:
+                missing.append(i)
+        if missing:
+            batch = boards[missing]
+            board_index, candidate_index, landing = self.enumerate(batch, piece_id, rotation, x, y)
+            placed, lines = self.place(batch, piece_id, board_index, candidate_index, landing)
+            heights, holes = self.measure(batch) if contour is None else (contour[0][missing], contour[1][missing])
+            heights, holes = self.contour(heights[board_index], holes[board_index], piece_id, candidate_index, landing)
+            cleared = lines > 0
+            if cleared.any():
+                heights[cleared], holes[cleared] = self.measure(placed[cleared])
+            scores = self.evaluate(heights, holes, lines)
+            bounds = np.searchsorted(board_index, np.arange(len(missing) + 1))
+            for j, i in enumerate(missing):
+                part = slice(bounds[j], bounds[j + 1])
+                results[i] = (candidate_index[part], landing[part], placed[part], lines[part], scores[part], heights[part], holes[part])
+                if self.cache is not None:
+                    # 切片会引用整批数组，缓存前复制
+                    results[i] = tuple(array.copy() for array in results[i])
+                    self.cache.put((hashes[i], piece_id, rotation, x, y), results[i], depth)
+        return results
+
+    def search(self, cells, piece_id, rotation, x, y, next_id=None, board_hash=None, contour=None):
+        # cells: (H, W) 已锁定方块，board_hash为其Zobrist哈希（省略时重新计算），
+        # contour为其board.Contour（省略时逐格统计列高与空洞数）
+        # 返回Plan，无可达落点时返回None
+        evaluated = self.evaluated
+        boards = np.asarray(cells, dtype=bool)[None]
+        if board_hash is None:
+            board_hash = self.zobrist.cells(cells)
+        lookahead = next_id is not None and self.beam_width > 0
+        if contour is not None:
+            contour = (np.array([contour.heights]), np.array([contour.holes]))
+        candidate_index, landing, placed, lines, scores, heights, holes = self.expand(boards, [board_hash], piece_id, rotation, x, y, int(lookahead), contour)[0]
+        if not len(candidate_index):
+            return None
+        if lookahead:
+            beam = np.argsort(-scores, kind='stable')[:self.beam_width]
+            # 预览方块从出生位置开始搜索；特征线性，两步总分 = 子局面得分 + 第一步消行得分
+            next_piece = self.piece_table.get(next_id)
+            next_x = self.width // 2 - next_piece.width // 2
+            children = self.expand(placed[beam], self.zobrist.batch(placed[beam]).tolist(), next_id, 0, next_x, 0, contour=(heights[beam], holes[beam]))
+            best = np.array([child[4].max() if len(child[4]) else -np.inf for child in children])
+            if np.isfinite(best).any():
+                scores = np.full(len(scores), -np.inf)
+                scores[beam] = best + self.weights[1] * lines[beam]
+        best = int(np.argmax(scores))
+        cand = self.candidates[piece_id]
+        target = candidate_index[best]
+        target_rotation = int(cand.rotation[target])
+        target_x = int(cand.x[target])
+        shift = target_x - x
+        actions = ['rotate'] * ((target_rotation - rotation) % ROTATIONS)
+        actions += ['left' if shift < 0 else 'right'] * abs(shift)
+        actions.append('hard_drop')
+        return Plan(target_rotation, target_x, int(landing[best]), float(scores[best]), actions, self.evaluated - evaluated)
+
+    def search_entities(self, entities):
+        # 按当前block、next_block与场地搜索
+        map_mat = entities.single(MapComponent)
+        next_block = entities.get('next_block')
+        next_id = next_block.get_component(ShapeComponent).piece_id if next_block is not None else None
+        for position, shape in entities.query(PositionComponent, ShapeComponent, exclude=(NextComponent,)):
+            return self.search(map_mat.map, shape.piece_id, shape.rotation, position.x, position.y, next_id, map_mat.board.hash, map_mat.board.contour)
+        return None
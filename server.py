@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 02:48:30
+Contact     : zoe4896@outlook.com
+Description : asyncio多会话游戏服务器：所有对局共用一个固定步长的tick循环，向客户端推送场地增量
+              用法：python server.py --port 7777 --stats 5
+'''
+import time
+import random
+import socket
+import struct
+import asyncio
+import argparse
+from collections import deque
+import numpy as np
+from manager import GameManager
+from headless import HeadlessGame
+from replay import CODE_ACTIONS
+from scheduler import FixedStepScheduler
+
+# 协议（TCP，小端）
+#   客户端 -> 服务器：连接后先发8字节seed（-1由服务器分配），之后每个字节是一个动作码（同replay.ACTION_CODES）
+#   服务器 -> 客户端：每个有变化的逻辑帧一帧：
+#       帧头 tick, score, lines_cleared, flags, 新增颜色数, 变化格子数
+#       新增颜色 RGB * n（FLAG_PALETTE_RESET时从索引1重新开始）
+#       变化格子 (uint16 行优先下标, uint8 颜色索引) * m
+HELLO = struct.Struct('<q')
+FRAME = struct.Struct('<IIIBBH')
+CELL_DTYPE = np.dtype([('index', '<u2'), ('color', 'u1')])
+FLAG_GAME_OVER = 1
+FLAG_PAUSED = 2
+FLAG_PALETTE_RESET = 4
+
+async def read_frame(reader):
+    # 客户端读取一帧，返回(tick, score, lines_cleared, flags, 新增颜色, 变化格子)
+    tick, score, lines_cleared, flags, colors, cells = FRAME.unpack(await reader.readexactly(FRAME.size))
+    palette = np.frombuffer(await reader.readexactly(colors * 3), dtype=np.uint8).reshape(-1, 3)
+    cells = np.frombuffer(await reader.readexactly(cells * CELL_DTYPE.itemsize), dtype=CELL_DTYPE)
+    return tick, score, lines_cleared, flags, palette, cells
+
+# 会话
+# 输入按令牌桶限速，超出速率或无法识别的动作码直接丢弃；与BatchEnv相同，每个逻辑帧最多执行一个动作，其余排队到后续帧；
+# 发送缓冲超过高水位时跳过推送，sent保持客户端已知的画面，恢复后一次发出累积的增量
+class Session:
+    __slots__ = ('id', 'game', 'writer', 'slot', 'actions', 'tokens', 'refilled', 'palette', 'palette_sent', 'header',
+                 'stalled_since', 'received', 'dropped', 'frames', 'coalesced', 'bytes')
+
+    def __init__(self, id, game, writer, slot, burst) -> None:
+        self.id = id
+        self.game = game
+        self.writer = writer
+        self.slot = slot
+        self.actions = deque()
+        self.tokens = burst
+        self.refilled = time.monotonic()
+        self.palette = None
+        self.palette_sent = 1
+        self.header = None
+        self.stalled_since = None
+        self.received = 0
+        self.dropped = 0
+        self.frames = 0
+        self.coalesced = 0
+        self.bytes = 0
+
+    def receive(self, data, rate, burst):
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.refilled) * rate)
+        self.refilled = now
+        self.received += len(data)
+        for code in data:
+            if self.tokens >= 1 and code < len(CODE_ACTIONS) and CODE_ACTIONS[code] is not None:
+                self.tokens -= 1
+                self.actions.append(CODE_ACTIONS[code])
+            else:
+                self.dropped += 1
+
+# 游戏服务器
+# 单线程：连接协程只把动作放进会话队列，tick协程按FPS推进全部会话，
+# 各会话画面写入同一个(槽位, H, W)数组，一次比较得出全部会话的变化格子
+class GameServer:
+    def __init__(self, config_path='config.yaml', host='127.0.0.1', port=7777, game_manager=None, seed=None) -> None:
+        self.game_manager = game_manager or GameManager(config_path, headless=True)
+        config = self.config = self.game_manager.config
+        self.host = host
+        self.port = port
+        self.max_sessions = getattr(config, 'SERVER_MAX_SESSIONS', 1024)
+        self.rate = getattr(config, 'SERVER_ACTIONS_PER_SEC', 30)
+        self.burst = max(1, self.rate // 4)
+        self.high_water = getattr(config, 'SERVER_HIGH_WATER_KB', 64) * 1024
+        self.stall_timeout = getattr(config, 'SERVER_STALL_TIMEOUT', 5.0)
+        self.scheduler = FixedStepScheduler(config.FPS, max_catch_up=getattr(config, 'MAX_CATCH_UP_TICKS', 5))
+        self.seed_rng = random.Random(seed)
+        self.sessions = {}
+        self.grid = np.zeros((0, config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH), dtype=np.uint8)
+        self.sent = self.grid.copy()
+        self.free_slots = []
+        self.tick_samples = deque(maxlen=3600)
+        self.ticks = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.stalled = 0
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+        self.bytes_sent = 0
+        self.actions_dropped = 0
+        self._next_id = 0
+        self._server = None
+        self._tick_task = None
+        self._handlers = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.scheduler = FixedStepScheduler(self.config.FPS, max_catch_up=self.scheduler.max_catch_up)
+        self._tick_task = asyncio.get_running_loop().create_task(self._tick_loop())
+        return self
+
+    async def close(self):
+        self._tick_task.cancel()
+        self._server.close()
+        for session in list(self.sessions.values()):
+            session.writer.close()
+        # 连接关闭后各连接协程读到EOF自行退出
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        try:
+            seed, = HELLO.unpack(await reader.readexactly(HELLO.size))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if len(self.sessions) >= self.max_sessions:
+            self.rejected += 1
+            writer.close()
+            return
+        # 内核发送缓冲限制在高水位，慢客户端尽早体现为应用层缓冲增长
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.high_water)
+        session = self._add(writer, seed if seed >= 0 else self.seed_rng.randrange(2 ** 63))
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                session.receive(data, self.rate, self.burst)
+        except ConnectionError:
+            pass
+        finally:
+            self._remove(session)
+            self._handlers.discard(handler)
+
+    def _add(self, writer, seed):
+        if not self.free_slots:
+            # 槽位不够时容量翻倍
+            capacity = len(self.grid)
+            size = max(16, capacity * 2)
+            self.grid = np.concatenate([self.grid, np.zeros((size - capacity,) + self.grid.shape[1:], dtype=np.uint8)])
+            self.sent = np.concatenate([self.sent, np.zeros_like(self.grid[capacity:])])
+            self.free_slots = list(range(size - 1, capacity - 1, -1))
+        slot = self.free_slots.pop()
+        self.sent[slot] = 0
+        self._next_id += 1
+        session = Session(self._next_id, HeadlessGame(seed=seed, game_manager=self.game_manager), writer, slot, self.burst)
+        self.sessions[session.id] = session
+        self.accepted += 1
+        return session
+
+    def _remove(self, session):
+        if self.sessions.pop(session.id, None) is not None:
+            self.actions_dropped += session.dropped
+            self.grid[session.slot] = 0
+            self.free_slots.append(session.slot)
+            session.writer.close()
+
+    async def _tick_loop(self):
+        scheduler = self.scheduler
+        while True:
+            for _ in range(scheduler.due()):
+                self.tick()
+            await asyncio.sleep(scheduler.remaining() / 1e9)
+
+    def tick(self):
+        start = time.perf_counter_ns()
+        grid = self.grid
+        sessions = list(self.sessions.values())
+        for session in sessions:
+            game = session.game
+            if not session.actions and game.done:
+                # 已结束的对局只等restart，画面不再变化
+                continue
+            game.step(session.actions.popleft() if session.actions else ())
+            map_mat = game.map
+            view = grid[session.slot]
+            view[:] = map_mat.color_map
+            np.copyto(view, map_mat.active_color_map, where=map_mat.active_color_map != 0)
+        changed = grid != self.sent
+        dirty = changed.any(axis=(1, 2))
+        now = time.monotonic()
+        for session in sessions:
+            self._push(session, changed[session.slot], dirty[session.slot], now)
+        self.ticks += 1
+        self.tick_samples.append(time.perf_counter_ns() - start)
+
+    def _push(self, session, changed, dirty, now):
+        map_mat = session.game.map
+        palette = map_mat.palette
+        flags = FLAG_GAME_OVER * map_mat.game_over | FLAG_PAUSED * map_mat.paused
+        header = (map_mat.score, map_mat.lines_cleared, flags)
+        if palette is not session.palette:
+            flags |= FLAG_PALETTE_RESET
+        elif not dirty and header == session.header and palette.size == session.palette_sent:
+            return
+        writer = session.writer
+        if writer.transport.get_write_buffer_size() > self.high_water:
+            if session.stalled_since is None:
+                session.stalled_since = now
+            elif now - session.stalled_since > self.stall_timeout:
+                self.stalled += 1
+                self._remove(session)
+                return
+            session.coalesced += 1
+            self.frames_coalesced += 1
+            return
+        session.stalled_since = None
+        if flags & FLAG_PALETTE_RESET:
+            session.palette = palette
+            session.palette_sent = 1
+        colors = palette.colors[session.palette_sent:palette.size]
+        slot = session.slot
+        index = np.flatnonzero(changed)
+        cells = np.empty(len(index), dtype=CELL_DTYPE)
+        cells['index'] = index
+        cells['color'] = self.grid[slot].ravel()[index]
+        self.sent[slot] = self.grid[slot]
+        data = FRAME.pack(session.game.tick, map_mat.score, map_mat.lines_cleared, flags, len(colors), len(cells)) + colors.tobytes() + cells.tobytes()
+        writer.write(data)
+        session.palette_sent = palette.size
+        session.header = header
+        session.frames += 1
+        session.bytes += len(data)
+        self.frames_sent += 1
+        self.bytes_sent += len(data)
+
+    def metrics(self):
+        # tick_ms: 推进全部会话并编码增量的耗时；load: 平均tick耗时占帧间隔的比例；
+        # sessions_per_core: 按当前每会话开销一个核心能承载的会话数
+        samples = np.fromiter(self.tick_samples, dtype=np.int64) if self.tick_samples else np.zeros(1, dtype=np.int64)
+        p50, p99 = (np.percentile(samples, (50, 99)) / 1e6).tolist()
+        load = float(samples.mean() / self.scheduler.dt)
+        return {
+            'sessions': len(self.sessions),
+            'ticks': self.ticks,
+            'dropped_ticks': self.scheduler.dropped_ticks,
+            'tick_ms_p50': p50,
+            'tick_ms_p99': p99,
+            'load': load,
+            'sessions_per_core': len(self.sessions) / load if load and self.sessions else 0.0,
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'stalled': self.stalled,
+            'actions_dropped': self.actions_dropped + sum(session.dropped for session in self.sessions.values()),
+            'frames_sent': self.frames_sent,
+            'frames_coalesced': self.frames_coalesced,
+            'bytes_sent': self.bytes_sent,
+        }
+
+async def serve(args):
+    server = await GameServer(args.config, args.host, args.port).start()
+    print(f'listening on {server.host}:{server.port}')
+    try:
+        while True:
+            await asyncio.sleep(args.stats or 3600)
+            if args.stats:
+                print(server.metrics())
+    finally:
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--stats', type=float, default=0, help='每隔多少秒打印一次指标')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
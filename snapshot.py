@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 23:58:03
+Contact     : zoe4896@outlook.com
+Description : 游戏状态快照（撤销、rollout用）
+'''
+from component import MapComponent
+
+# 除场地、调色板与数组外的MapComponent字段
+MAP_FIELDS = ('height', 'lines_cleared', 'paused', 'game_over', 'score', 'restart', 'drop_speed', 'lock_delay_frames', 'version')
+MAP_ARRAYS = ('color_map', 'active_map', 'active_color_map')
+
+# 不可变快照
+# 场地、颜色矩阵与调色板写时复制：拍快照时把游戏当前的数组设为只读并直接引用，
+# 之后游戏或恢复出来的状态第一次写入时才各自复制（见ArrayBoard.lock、MapSystem、Palette.index）。
+# 方块组件保存为字段值元组，恢复时重新创建组件对象
+class GameSnapshot:
+    __slots__ = ('tick', 'queue', 'fall_time', 'map', 'board', 'palette', 'arrays', 'pieces', 'extra')
+
+    def __init__(self, tick, queue, fall_time, map, board, palette, arrays, pieces, extra=()) -> None:
+        for name, value in zip(self.__slots__, (tick, queue, fall_time, map, board, palette, arrays, pieces, extra)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('GameSnapshot is immutable')
+
+    def __reduce__(self):
+        # 序列化（录像定位索引）时按构造参数重建，不经过__setattr__
+        return GameSnapshot, tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def capture(cls, entities, systems, queue, tick, extra=()):
+        # entities: manager.Entities；extra: 调用方自己的计数器等，原样保存
+        entity_manager = entities.entity_manager
+        map_mat = entity_manager.single(MapComponent)
+        arrays = []
+        for name in MAP_ARRAYS:
+            array = getattr(map_mat, name)
+            array.flags.writeable = False
+            arrays.append(array)
+        pieces = tuple(
+            (entity.id, tuple((type(component), tuple(getattr(component, slot) for slot in type(component).__slots__))
+                              for component in entity.components.values()))
+            for entity in entity_manager.entities.values()
+            if MapComponent not in entity.components
+        )
+        return cls(
+            tick,
+            queue.getstate(),
+            systems.sys_movement.fall_time,
+            tuple(getattr(map_mat, name) for name in MAP_FIELDS),
+            map_mat.board.snapshot(),
+            map_mat.palette.snapshot(),
+            tuple(arrays),
+            pieces,
+            tuple(extra),
+        )
+
+    def restore(self, entities, systems, queue):
+        # 写回entities与systems，返回快照时的tick
+        entity_manager = entities.entity_manager
+        map_mat = entity_manager.single(MapComponent)
+        for name, value in zip(MAP_FIELDS, self.map):
+            setattr(map_mat, name, value)
+        for name, array in zip(MAP_ARRAYS, self.arrays):
+            setattr(map_mat, name, array)
+        map_mat.board.restore(self.board)
+        map_mat.palette.restore(self.palette)
+        for id, components in self.pieces:
+            entity = entity_manager.get(id) or entity_manager.create_entity(id)
+            restored = []
+            for component_type, values in components:
+                component = object.__new__(component_type)
+                for slot, value in zip(component_type.__slots__, values):
+                    setattr(component, slot, value)
+                restored.append(component)
+            entity.replace_components(restored)
+        queue.setstate(self.queue)
+        systems.sys_movement.fall_time = self.fall_time
+        return self.tick
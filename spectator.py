@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 04:02:17
+Contact     : zoe4896@outlook.com
+Description : 多场地观战网格：N局对局的调色板索引矩阵一次查表放大成整屏画面
+              用法：python spectator.py --boards 64 --strategy search
+                    python spectator.py --replays a.replay b.replay
+'''
+import math
+import argparse
+import numpy as np
+import pygame
+from manager import GameManager
+from headless import HeadlessGame
+from replay import Replay, ReplayPlayer
+from scheduler import FixedStepScheduler
+from strategies import STRATEGIES
+
+# 全局调色板固定项：0为空格与格子间隙，1为场地之间的边框，2为已结束对局的格子间隙
+EMPTY, MARGIN, GAME_OVER = 0, 1, 2
+FIXED_COLORS = ((0, 0, 0), (60, 60, 60), (110, 0, 0))
+
+# 观战网格
+# 各局的调色板不同，先用每局一行的查找表把局内颜色索引换成全局调色板索引，
+# 全部格子与每局的间隙颜色、边框颜色排成一维数组flat。
+# 屏幕每个像素预先算好在flat中的下标；同一格子行内的像素行完全相同，
+# 每帧只对不重复的像素行查表，再按行重复直接写入8位表面的像素缓冲
+class SpectatorGrid:
+    def __init__(self, screen, config, count, columns=None, block_size=None, margin=2) -> None:
+        self.screen = screen
+        self.count = count
+        height = self.height = config.PLAYFIELD_HEIGHT
+        width = self.width = config.PLAYFIELD_WIDTH
+        def fit(columns):
+            # 给定列数时屏幕能容纳的最大格子尺寸
+            rows = math.ceil(count / columns)
+            return min(((screen.get_width() - margin) // columns - margin) // width,
+                       ((screen.get_height() - margin) // rows - margin) // height)
+        if columns is None:
+            columns = max(range(1, count + 1), key=fit)
+        self.columns = columns
+        self.rows = math.ceil(count / columns)
+        self.block_size = block_size = block_size or max(1, fit(columns))
+        self.size = (self.columns * (width * block_size + margin) + margin, self.rows * (height * block_size + margin) + margin)
+
+        cells = count * height * width
+        self.cells = np.zeros((count, height, width), dtype=np.uint8)
+        self.lut = np.zeros((count, 256), dtype=np.uint8)
+        self.flat = np.full(cells + count + 1, MARGIN, dtype=np.uint8)
+        self._flat_cells = self.flat[:cells].reshape(count, height, width)
+        self._flat_gaps = self.flat[cells:cells + count]
+        self._boards = np.arange(count)[:, None, None]
+        self._palettes = [None] * count
+        self._palette_sizes = [0] * count
+        self.colors = list(FIXED_COLORS)
+        self._color_index = {color: idx for idx, color in enumerate(FIXED_COLORS)}
+
+        # 每个像素在flat中的下标，按surfarray的(x, y)排列
+        xs = self._axis(self.columns, width, block_size, margin, self.size[0])
+        ys = self._axis(self.rows, height, block_size, margin, self.size[1])
+        board_x, col, _ = (a[:, None] for a in xs)
+        board_y, row, _ = (a[None, :] for a in ys)
+        board = board_y * self.columns + board_x
+        inside = (board_x >= 0) & (board_y >= 0) & (board < count)
+        gap = (col < 0) | (row < 0)
+        index = np.where(inside & ~gap, board * (height * width) + row * width + col, cells + count)
+        pixel_index = np.where(inside & gap, cells + board, index).T
+        self.line_index, self.line_rows = np.unique(pixel_index, axis=0, return_inverse=True)
+        self.line_rows = self.line_rows.ravel()
+        self.lines = np.zeros(self.line_index.shape, dtype=np.uint8)
+        self.surface = pygame.Surface(self.size, depth=8)
+        self.surface.set_palette(self.colors)
+        self.rect = pygame.Rect((0, 0), self.size)
+
+    @staticmethod
+    def _axis(boards, cells, block_size, margin, pixels):
+        # 一个方向上每个像素属于第几块场地、第几个格子（-1为边框或格子间隙）
+        board_pixels = cells * block_size + margin
+        pos = np.arange(pixels) - margin
+        board = np.where(pos >= 0, pos // board_pixels, -1)
+        offset = pos - board * board_pixels
+        board[(board >= boards) | (offset >= cells * block_size)] = -1
+        cell = offset // block_size
+        # 与RenderSystem相同，每格最后几个像素留作间隙
+        gap = block_size - max(block_size * 3 // 30, 1 if block_size > 2 else 0)
+        cell[(board < 0) | (offset % block_size >= gap)] = -1
+        return board, cell, offset
+
+    def _sync_palette(self, idx, palette):
+        # 局内调色板有新颜色时更新这一局的查找表
+        if palette is self._palettes[idx] and palette.size == self._palette_sizes[idx]:
+            return
+        start = self._palette_sizes[idx] if palette is self._palettes[idx] else 1
+        for local in range(start, palette.size):
+            color = tuple(palette.colors[local].tolist())
+            index = self._color_index.get(color)
+            if index is None:
+                if len(self.colors) >= 256:
+                    raise ValueError('spectator palette is full')
+                index = self._color_index[color] = len(self.colors)
+                self.colors.append(color)
+                self.surface.set_palette(self.colors)
+            self.lut[idx, local] = index
+        self._palettes[idx] = palette
+        self._palette_sizes[idx] = palette.size
+
+    def render(self, maps):
+        # maps: 各局的MapComponent，最多count个；返回更新的矩形
+        cells = self.cells
+        gaps = self._flat_gaps
+        for idx, map_mat in enumerate(maps):
+            # 新方块可能与已锁定的格子重叠（如结束时），下落中的方块在上
+            view = cells[idx]
+            view[:] = map_mat.color_map
+            np.copyto(view, map_mat.active_color_map, where=map_mat.active_color_map != 0)
+            gaps[idx] = GAME_OVER if map_mat.game_over else EMPTY
+            self._sync_palette(idx, map_mat.palette)
+        self._flat_cells[:] = self.lut[self._boards, cells]
+        np.take(self.flat, self.line_index, out=self.lines, mode='clip')
+        pixels = pygame.surfarray.pixels2d(self.surface)
+        np.take(self.lines, self.line_rows, axis=0, out=pixels.T, mode='clip')
+        del pixels
+        self.screen.blit(self.surface, (0, 0))
+        return [self.rect]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--boards', type=int, default=64)
+    parser.add_argument('--strategy', default='search', choices=list(STRATEGIES))
+    parser.add_argument('--replays', nargs='*', default=None, help='观看录像而不是实时对局')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', default='1280x720', help='窗口大小')
+    args = parser.parse_args()
+
+    game_manager = GameManager(args.config, headless=True)
+    config = game_manager.config
+    if args.replays:
+        players = [ReplayPlayer(Replay.load(path), args.config, game_manager) for path in args.replays]
+        games = [player.game for player in players]
+        policies = None
+    else:
+        games = [HeadlessGame(seed=args.seed + idx, game_manager=game_manager) for idx in range(args.boards)]
+        policies = [STRATEGIES[args.strategy](args.seed + idx) for idx in range(args.boards)]
+
+    pygame.init()
+    pygame.display.set_caption('The Cube - spectator')
+    screen = pygame.display.set_mode(tuple(int(v) for v in args.size.split('x')))
+    grid = SpectatorGrid(screen, config, len(games))
+    scheduler = FixedStepScheduler(config.FPS, getattr(config, 'RENDER_FPS', 0), getattr(config, 'MAX_CATCH_UP_TICKS', 5))
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        for _ in range(scheduler.due()):
+            if policies is None:
+                for player in players:
+                    if player.tick < player.replay.ticks:
+                        player.seek(player.tick + 1)
+            else:
+                for game, policy in zip(games, policies):
+                    if not game.done:
+                        game.step(policy(game) or ())
+        if scheduler.render_due():
+            pygame.display.update(grid.render([game.map for game in games]))
+            scheduler.presented()
+        scheduler.wait()
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
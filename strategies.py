@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 15:40:12
+Contact     : zoe4896@outlook.com
+Description : 机器人策略
+              策略为工厂函数 factory(seed) -> policy(game) -> 本帧动作（None表示无操作）
+'''
+import random
+from search import Planner
+from cache import TranspositionCache
+from component import ShapeComponent, StateComponent
+
+# 随机按键，按一定概率硬降
+def random_strategy(seed, hard_drop_rate=0.05):
+    rng = random.Random(seed)
+    actions = ('left', 'right', 'down', 'rotate', None)
+    def policy(game):
+        if rng.random() < hard_drop_rate:
+            return 'hard_drop'
+        return rng.choice(actions)
+    return policy
+
+# 随机旋转、随机平移后硬降
+def drop_strategy(seed):
+    rng = random.Random(seed)
+    plan = []
+    def policy(game):
+        if not plan:
+            shift = rng.randint(-5, 5)
+            plan.extend(['rotate'] * rng.randrange(4))
+            plan.extend(['left' if shift < 0 else 'right'] * abs(shift))
+            plan.append('hard_drop')
+        return plan.pop(0)
+    return policy
+
+# 同一进程内的对局共用搜索器及其置换表
+_PLANNERS = {}
+
+def _planner(game, beam_width):
+    config = game.config
+    key = (config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH, beam_width)
+    planner = _PLANNERS.get(key)
+    if planner is None:
+        planner = _PLANNERS[key] = Planner(game.game_manager.piece_table, config.PLAYFIELD_HEIGHT, config.PLAYFIELD_WIDTH,
+                                           beam_width=beam_width, cache=TranspositionCache.from_config(config))
+    return planner
+
+# 每个新方块出现时搜索一次落点（含预览方块的beam搜索），之后每帧执行一个计划动作
+def search_strategy(seed, beam_width=4):
+    planner = None
+    block = None
+    plan = []
+    def policy(game):
+        nonlocal planner, block
+        entities = game.entities.entity_manager
+        if planner is None:
+            planner = _planner(game, beam_width)
+        shape = entities['block'].get_component(ShapeComponent)
+        if shape is not block and entities['block'].get_component(StateComponent).active:
+            block = shape
+            result = planner.search_entities(entities)
+            plan[:] = result.actions if result is not None else ['hard_drop']
+        return plan.pop(0) if plan else None
+    return policy
+
+STRATEGIES = {
+    'random': random_strategy,
+    'drop': drop_strategy,
+    'search': search_strategy,
+}
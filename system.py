@@ -6,38 +6,56 @@ Date        : 2023/06/26 14:32:54
 Contact     : zoe4896@outlook.com
 Description : 
 '''
-import pygame
 import numpy as np
-import random
-from component import PositionComponent, ShapeComponent, ColorComponent, SpeedComponent, StateComponent, MapComponent
+from functools import lru_cache
+from pieces import ROTATIONS
+from kernels import NumpyKernels
+from component import PositionComponent, ShapeComponent, ColorComponent, SpeedComponent, StateComponent, MapComponent, NextComponent
+
+# 查询下落中的方块时排除的组件：带NextComponent的是预览方块
+PREVIEW = (NextComponent,)
+
+# 键盘按键 -> 动作名；pygame在第一次处理键盘事件时才导入，无界面模式不需要
+@lru_cache(maxsize=None)
+def key_mapping():
+    import pygame
+    return {
+        pygame.K_LEFT: 'left',
+        pygame.K_RIGHT: 'right',
+        pygame.K_DOWN: 'down',
+        pygame.K_UP: 'rotate',
+        pygame.K_SPACE: 'hard_drop',
+        pygame.K_p: 'pause',
+        pygame.K_RETURN: 'restart',
+    }
+
 # 输入系统
 class InputSystem:
-    def __init__(self) -> None:
-        self.key_mapping = {
-            pygame.K_LEFT: 'left',
-            pygame.K_RIGHT: 'right',
-            pygame.K_DOWN: 'down',
-            pygame.K_UP: 'rotate',
-            pygame.K_SPACE: 'hard_drop',
-            pygame.K_p: 'pause',
-            pygame.K_RETURN: 'restart',
-        }
+    @property
+    def key_mapping(self):
+        return key_mapping()
+
     def process(self, events, entities):
-        entity = entities['block']
-        map_entity = entities['map']
+        import pygame
         pygame.key.set_repeat(500, 50)
-        for event in events:
-            if event.type == pygame.KEYDOWN:
-                position = entity.get_component(PositionComponent)
-                shape = entity.get_component(ShapeComponent)
-                state = entity.get_component(StateComponent)
-                self.speed = entity.get_component(SpeedComponent)
-                self.map_comp = map_entity.get_component(MapComponent)
-                if state.active:
-                    self.handle_key_event(event.key, position, shape, state)
+        mapping = key_mapping()
+        actions = [mapping.get(event.key) for event in events if event.type == pygame.KEYDOWN]
+        self.process_actions(actions, entities)
+        return actions
+
+    def process_actions(self, actions, entities):
+        # 按动作名处理输入，键盘事件与无界面模式共用
+        self.map_comp = entities.single(MapComponent)
+        for action in actions:
+            for position, shape, state, self.speed in entities.query(PositionComponent, ShapeComponent, StateComponent, SpeedComponent, exclude=PREVIEW):
+                # 硬降后本帧剩余的按键不再响应
+                if state.active and not state.hard_drop:
+                    self.handle_action(action, position, shape, state)
 
     def handle_key_event(self, key, position, shape, state):
-        action = self.key_mapping.get(key)
+        self.handle_action(self.key_mapping.get(key), position, shape, state)
+
+    def handle_action(self, action, position, shape, state):
         state.action = action
         # hard_drop过程中不响应按键操作
         if not self.map_comp.paused:
@@ -45,16 +63,14 @@ class InputSystem:
                 position.x -= 1
             elif action == 'right' and state.collide_side != 'right':
                 position.x += 1
-            elif action == 'down' and state.collide_side != 'bottom' and not state.is_blocked:
+            elif action == 'down' and state.collide_side != 'bottom' and not state.is_blocked and self._can_drop(position, shape):
                 position.y += 1
             elif action == 'rotate':
                 shape.rotate = True
-                shape.rotate_shape = np.rot90(shape.shape, -1)
-                shape.rotate_width = len(shape.rotate_shape[0])
-                shape.rotate_height = len(shape.rotate_shape)
             elif action == 'hard_drop':
+                # 直接移到落点，本帧的碰撞检测即锁定
                 state.hard_drop = True
-                self.speed.y = self.speed.hard_drop_speed   # ms
+                position.y = self.map_comp.board.drop_row(shape.piece, position.x, position.y)
             elif action == 'pause':
                 self.map_comp.paused = not self.map_comp.paused
             elif action == 'restart':
@@ -67,248 +83,204 @@ class InputSystem:
                 self.map_comp.game_over = False
                 self.map_comp.restart = True
 
+    def _can_drop(self, position, shape):
+        # 下落一格后不越过底边、不与已锁定方块重叠
+        board = self.map_comp.board
+        return not board.landed(shape.piece, position.x, position.y)
+
 # 移动系统
 class MovementSystem:
-    def __init__(self) -> None:
-        self.fall_time = pygame.time.get_ticks()
+    def __init__(self, get_ticks=None) -> None:
+        # 时间源（毫秒），无界面模式下由逻辑帧计数换算
+        if get_ticks is None:
+            import pygame
+            get_ticks = pygame.time.get_ticks
+        self.get_ticks = get_ticks
+        self.fall_time = self.get_ticks()
     def process(self, entities):
-        entity = entities['block']
-        position = entity.get_component(PositionComponent)
-        speed = entity.get_component(SpeedComponent)
-        current_time = pygame.time.get_ticks()
-        if current_time - self.fall_time >= speed.y:
-            position.y += 1
-            self.fall_time = current_time
+        current_time = self.get_ticks()
+        for position, speed in entities.query(PositionComponent, SpeedComponent, exclude=PREVIEW):
+            if current_time - self.fall_time >= speed.y:
+                position.y += 1
+                self.fall_time = current_time
 
 # 碰撞检测系统
 class CollisionSystem:
     # TODO: lock delay左右碰撞检测失效
-    def __init__(self, config) -> None:
+    def __init__(self, config, on_lock=None) -> None:
         self.playfield_width = config.PLAYFIELD_WIDTH
         self.playfield_height = config.PLAYFIELD_HEIGHT
-    
-    def process(self, entities):
-        entity = entities['block']
-        map_entity = entities['map']
-        position = entity.get_component(PositionComponent)
-        shape = entity.get_component(ShapeComponent)
-        state = entity.get_component(StateComponent)
-        map_mat = map_entity.get_component(MapComponent)
+        # 方块锁定回调，默认投递USEREVENT+1事件
+        self.on_lock = on_lock or self._post_lock_event
+
+    def _post_lock_event(self):
+        import pygame
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT+1))
 
-        np_shape = np.asarray(shape.shape)
-        active_block_map = map_mat.active_map
+    def process(self, entities):
+        map_mat = entities.single(MapComponent)
+        for position, shape, state in entities.query(PositionComponent, ShapeComponent, StateComponent, exclude=PREVIEW):
+            self._process_piece(map_mat, position, shape, state)
 
-        map_left_boundary = active_block_map[:, 0]
-        map_right_boundary = active_block_map[:, -1]
-        map_bottom_boundary = active_block_map[-1, :]
+    def _process_piece(self, map_mat, position, shape, state):
+        board = map_mat.board
+        piece = shape.piece
 
         # 检测是否到达最顶层
         if map_mat.height >= self.playfield_height:
             map_mat.game_over = True
             return
         
-        if np.any(map_bottom_boundary == 1):
+        if position.y + piece.height >= self.playfield_height:
             # 下边界
-            state.lock_delay_frames -= 1
-            state.is_blocked = True
-            if state.lock_delay_frames <= 0:
-                state.is_blocked = False
-                state.active = False
-                state.collision = True
-                state.collide_side = 'bottom'
-                pygame.event.post(pygame.event.Event(pygame.USEREVENT+1))
+            self._block(state)
             return
         # 检测方块是否落在其他方块顶部
         if state.collide_side != 'bottom':
-            for idx, arr in enumerate(np_shape):
-                if np.any(map_mat.map[position.y + idx + 1, position.x:position.x+shape.width].squeeze() & arr):
-                    # 停止方块的运动
-                    state.lock_delay_frames -= 1
-                    state.is_blocked = True
-                    if state.lock_delay_frames <= 0:
-                        state.is_blocked = False
-                        state.active = False
-                        state.collision = True
-                        state.collide_side = 'bottom'
-                        pygame.event.post(pygame.event.Event(pygame.USEREVENT+1))
-                    return
+            if board.landed(piece, position.x, position.y):
+                # 停止方块的运动
+                self._block(state)
+                return
         # 检测方块是否碰到边界
-        if np.any(map_left_boundary == 1):
+        wall_side = ''
+        if position.x <= 0:
             # 左边界
             state.collision = True
             state.is_blocked = False
-            state.collide_side = 'left'
-        elif np.any(map_right_boundary == 1):
+            state.collide_side = wall_side = 'left'
+        elif position.x + piece.width >= self.playfield_width:
             # 右边界
             state.collision = True
             state.is_blocked = False
-            state.collide_side = 'right'
+            state.collide_side = wall_side = 'right'
         else:
             state.is_blocked = False
             state.collision = False
             state.collide_side = ''
         # 运动方块左/右边缘与静止方块右/左边缘发生碰撞
-        # 检测方块左右是否碰撞
-        for idx, arr in enumerate(np_shape.T):
-            if state.collide_side != 'left' and np.any(map_mat.map[position.y:position.y+shape.height, position.x+idx-1].squeeze() & arr):
+        # 检测方块左右是否碰撞（按方块列的位掩码）
+        left_hits = board.hits(piece, position.x - 1, position.y)
+        overlap_hits = board.hits(piece, position.x, position.y)
+        for idx in range(piece.width):
+            if state.collide_side != 'left' and left_hits >> idx & 1:
                 state.collision = True
                 state.is_blocked = False
                 state.collide_side = 'left'
-            elif state.collide_side != 'right' and np.any(map_mat.map[position.y:position.y+shape.height, position.x+idx].squeeze() & arr):
+            elif state.collide_side != 'right' and overlap_hits >> idx & 1:
                 state.collision = True
                 state.is_blocked = False
                 state.collide_side = 'right'
+        # 边界优先，避免贴墙时被相邻方块覆盖后移出场地
+        if wall_side:
+            state.collide_side = wall_side
+
+    def _block(self, state):
+        # 触底或落在其他方块上，lock delay耗尽后锁定；硬降不等待lock delay
+        state.lock_delay_frames -= 1
+        state.is_blocked = True
+        if state.lock_delay_frames <= 0 or state.hard_drop:
+            state.is_blocked = False
+            state.active = False
+            state.collision = True
+            state.collide_side = 'bottom'
+            self.on_lock()
 
 # 消行和得分系统
 class ClearLinesSystem:
+    def __init__(self, kernels=NumpyKernels) -> None:
+        self.kernels = kernels
+
     def process(self, entities):
         # 处理消行和更新得分逻辑
-        map_mat = entities['map'].get_component(MapComponent)
-        rows_to_delete = np.where(np.sum(map_mat.map, axis=1) == map_mat.map.shape[1])[0]
+        map_mat = entities.single(MapComponent)
+        rows_to_delete = map_mat.board.full_rows()
         if len(rows_to_delete) > 0: 
             self.delete_rows(map_mat, rows_to_delete)
             self.update_score(map_mat, len(rows_to_delete))
 
     def delete_rows(self, map_mat, rows_to_delete):
-        map_mat.map = np.delete(map_mat.map, rows_to_delete, axis=0)
-        map_mat.color_map = np.delete(map_mat.color_map, rows_to_delete, axis=0)
-        empty_rows = np.tile(map_mat.empty_row, (len(rows_to_delete), 1))
-        map_mat.map = np.concatenate((empty_rows, map_mat.map), axis=0)
-        map_mat.color_map = np.concatenate((empty_rows, map_mat.color_map), axis=0)
-        map_mat.height -= len(rows_to_delete)
+        map_mat.board.clear_rows(rows_to_delete)
+        # 颜色矩阵同样压缩：保留未消除的行，顶部补空行
+        if not map_mat.color_map.flags.writeable:
+            map_mat.color_map = map_mat.color_map.copy()
+        self.kernels.clear_rows(map_mat.color_map, np.asarray(rows_to_delete, dtype=np.int64))
+        map_mat.height = map_mat.board.stack_height()
+        map_mat.version += 1
 
     def update_score(self, map_mat, rows_cleared):
         map_mat.lines_cleared += rows_cleared
         map_mat.score += rows_cleared ** 2
 
-# 渲染系统
-class RenderSystem:
-    def __init__(self, screen, config):
-        self.screen = screen
-        self.block_size = config.BLOCK_SIZE
-        self.real_block_size = self.block_size-3
-        self.font = pygame.font.Font(None, 36)
-        self.play_field = pygame.Surface((config.PLAYFIELD_WIDTH, config.PLAYFIELD_HEIGHT))
-        self.score_board = pygame.Surface((config.SCOREBOARD_WIDTH, config.SCOREBOARD_HEIGHT))
-        self.game_over_text = self.font.render("Y o u  D i e d !", True, (255, 0, 0))
-        self.game_over_text_rect = self.game_over_text.get_rect(center=((self.play_field.get_width()*self.block_size) // 2, (self.play_field.get_height()*self.block_size) // 2))
-        self.pause_text = self.font.render("P A U S E D", True, (255, 0, 0))
-        self.pause_text_rect = self.game_over_text.get_rect(center=((self.play_field.get_width()*self.block_size) // 2, (self.play_field.get_height()*self.block_size) // 2))
+class MapSystem:
+    def __init__(self, kernels=NumpyKernels) -> None:
+        self.kernels = kernels
 
     def process(self, entities):
-        self.screen.fill((0, 0, 0))
-        self.screen.blit(self.play_field, (0, 0))
-        self.map_mat = entities['map'].get_component(MapComponent)
-        
-        self._render_block(self.map_mat.active_map, self.map_mat.active_color_map)
-        self._render_block(self.map_mat.map, self.map_mat.color_map)
-        self._render_score()
-        self._render_next_block(entities)
-        if self.map_mat.game_over:
-            self._render_game_over()
-        if self.map_mat.paused:
-            self._render_pause()
-
-    def _render_pause(self):
-        self.screen.blit(self.pause_text, self.pause_text_rect)
-    def _render_next_block(self, entities):
-        next_shape = entities['next_block'].get_component(ShapeComponent)
-        next_color = entities['next_block'].get_component(ColorComponent)
-        # 获取方块的非零索引
-        next_nonzero_indices = np.where(np.asarray(next_shape.shape) != 0)
-        # 计算方块的绘制位置
-        next_block_positions = (11 + next_nonzero_indices[1], 10 + next_nonzero_indices[0])
-        # 创建方块表面
-        next_block_surface = pygame.Surface((self.real_block_size, self.real_block_size))
-        next_block_surface.fill(next_color.color)
-        # 批量绘制所有方块
-        for x, y in zip(next_block_positions[0], next_block_positions[1]):
-            next_block_rect = pygame.Rect(x * self.block_size, y * self.block_size, self.real_block_size, self.real_block_size)
-            self.screen.blit(next_block_surface, next_block_rect)
+        map_mat = entities.single(MapComponent)
+        if map_mat.active_map.flags.writeable:
+            map_mat.active_map.fill(0)
+            map_mat.active_color_map.fill(0)
+        else:
+            # 与快照共享的只读矩阵，换成新矩阵
+            map_mat.active_map = np.zeros_like(map_mat.active_map)
+            map_mat.active_color_map = np.zeros_like(map_mat.active_color_map)
+        for position, shape, state, color in entities.query(PositionComponent, ShapeComponent, StateComponent, ColorComponent, exclude=PREVIEW):
+            self._process_piece(map_mat, position, shape, state, color)
 
-    def _render_block(self, block_mat, color_mat):
-        nonzero_indices = np.where(block_mat != 0)
-        for x, y in zip(nonzero_indices[0], nonzero_indices[1]):
-            block_rect = pygame.Rect(y * self.block_size, x * self.block_size, self.real_block_size, self.real_block_size)
-            pygame.draw.rect(self.screen, color_mat[x][y], block_rect)
-    
-    def _render_score(self):
-        self.score_board.fill((255,255,255))
-        self.screen.blit(self.score_board, (self.screen.get_width()-self.score_board.get_size()[0], 0))
-        score_text = self.font.render(str(self.map_mat.score), True, (0,0, 255))
-        score_rect = score_text.get_rect(center=(self.screen.get_width() - self.score_board.get_rect().centerx, self.score_board.get_rect().centery//2))
-        self.screen.blit(score_text, score_rect)
-    
-    def _render_game_over(self):
-        self.screen.blit(self.game_over_text, self.game_over_text_rect)
-
-class MapSystem:
-    def process(self, entities):
-        map_entity = entities['map']
-        last_entity = entities['block']
-        map_mat = map_entity.get_component(MapComponent)
-        position = last_entity.get_component(PositionComponent)
-        shape = last_entity.get_component(ShapeComponent)
-        state = last_entity.get_component(StateComponent)
-        color = last_entity.get_component(ColorComponent)
-        np_shape = np.asarray(shape.shape)
-        color_map_copy = map_mat.color_map.copy()
+    def _process_piece(self, map_mat, position, shape, state, color):
+        piece = shape.piece
+        fill = self.kernels.fill
 
         if state.active:
-            active_color_map_cache = np.zeros_like(map_mat.active_color_map)
-            map_mat.active_map*=0
-            map_mat.active_map[position.y:position.y+shape.height, position.x:position.x+shape.width] = np_shape
-            cache = active_color_map_cache[position.y:position.y+shape.height, position.x:position.x+shape.width] | np_shape
-            nonzero_indices = np.where(cache != 0)
-            for x, y in zip(nonzero_indices[0], nonzero_indices[1]):
-                if cache[x][y] == 1:
-                    active_color_map_cache[position.y:position.y+shape.height, position.x:position.x+shape.width][x][y] = color.color
-            map_mat.active_color_map = active_color_map_cache
+            fill(map_mat.active_map, piece, position.x, position.y, 1)
+            fill(map_mat.active_color_map, piece, position.x, position.y, color.index)
         else:
-            # 方块落地，更新动态方块状态矩阵
-            map_mat.active_map = np.where(map_mat.active_map==1, 0, map_mat.active_map)
-            map_mat_block = map_mat.map[position.y:position.y+shape.height, position.x:position.x+shape.width]
-            color_block = map_mat.color_map[position.y:position.y+shape.height, position.x:position.x+shape.width]
-            map_mat_block |= np_shape
-            color_mask = map_mat_block&np_shape
-            nonzero_indices = np.where(color_mask != 0)
-            color_map_copy[position.y:position.y+shape.height, position.x:position.x+shape.width] = np_shape
-            
-            for x, y in zip(nonzero_indices[0], nonzero_indices[1]):
-                if color_mask[x][y]==1:
-                    color_block[x][y] = color.color
-                else:
-                    continue
-            map_mat.height = np.max(np.where(map_mat.map[::-1]==1)[0])+1
+            # 方块落地，写入已锁定方块（动态方块矩阵已清空）
+            map_mat.board.lock(piece, position.x, position.y)
+            if not map_mat.color_map.flags.writeable:
+                map_mat.color_map = map_mat.color_map.copy()
+            fill(map_mat.color_map, piece, position.x, position.y, color.index)
+            map_mat.height = map_mat.board.stack_height()
+            map_mat.version += 1
 
 class SpawnSystem:
-    def __init__(self, shapes, config) -> None:
+    def __init__(self, piece_table, config, queue) -> None:
         self.config = config
-        self.shapes = shapes
+        self.piece_table = piece_table
+        # 方块与颜色来自预先生成的方块队列（见piecequeue.py）
+        self.queue = queue
         self.paly_field_width = self.config.PLAYFIELD_WIDTH
-        
-    def process(self, entity_manager):
-        drop_speed = entity_manager.entities['map'].get_component(MapComponent).drop_speed
-        next_block = entity_manager.entities['next_block']
-        entity_manager.entities['block'] = next_block
-
-        next_shape = random.choice(self.shapes)
-        next_entity = entity_manager.create_entity('next_block')
+        # 无状态的标记组件，所有预览方块共用
+        self.next_marker = NextComponent()
 
-        next_entity.add_component(PositionComponent(self.paly_field_width // 2 - len(next_shape[0]) // 2, 0))
-        next_entity.add_component(SpeedComponent(0, drop_speed, self.config.HARD_DROP_SPEED))
-        next_entity.add_component(ShapeComponent(next_shape))
-        next_entity.add_component(ColorComponent())
-        next_entity.add_component(StateComponent(lock_delay_frames=self.config.LOCK_DELAY_FRAMES))
+    def process(self, entity_manager):
+        map_mat = entity_manager.single(MapComponent)
+        # 预览方块成为下落中的方块；原方块的实体与组件原地重置后作为新的预览方块，不创建新对象
+        entity_manager['next_block'].remove_component(NextComponent)
+        entity = entity_manager.swap_entities('block', 'next_block')
+        components = entity.components
+        piece_id, color = self.queue.next()
+        shape = components[ShapeComponent]
+        shape.piece_id = piece_id
+        shape.rotation = 0
+        shape.rotate = False
+        position = components[PositionComponent]
+        position.x = self.paly_field_width // 2 - shape.width // 2
+        position.y = 0
+        speed = components[SpeedComponent]
+        speed.x = 0
+        speed.y = map_mat.drop_speed
+        speed.hard_drop_speed = self.config.HARD_DROP_SPEED
+        components[ColorComponent].set(map_mat.palette, color)
+        components[StateComponent].reset(lock_delay_frames=self.config.LOCK_DELAY_FRAMES)
+        entity.add_component(self.next_marker)
 
 class RotationSystem:
     def process(self, entities):
-        shape = entities['block'].get_component(ShapeComponent)
-        position = entities['block'].get_component(PositionComponent)
-        map_mat = entities['map'].get_component(MapComponent)
-        shape.rotate = False
-        available_mat = map_mat.map[position.y:position.y+shape.rotate_height, position.x:position.x+shape.rotate_width]
-        if not np.any(np.where(available_mat==1)) and available_mat.shape[1]==shape.rotate_width:
-            shape.shape = shape.rotate_shape
-            shape.height = shape.rotate_height
-            shape.width = shape.rotate_width
+        map_mat = entities.single(MapComponent)
+        for shape, position in entities.query(ShapeComponent, PositionComponent, exclude=PREVIEW):
+            shape.rotate = False
+            # 旋转后的包围盒需完全在场地内且为空
+            rotate_piece = shape.rotate_piece
+            if map_mat.board.region_empty(position.x, position.y, rotate_piece.width, rotate_piece.height):
+                shape.rotation = (shape.rotation + 1) % ROTATIONS
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 10:05:33
+Contact     : zoe4896@outlook.com
+Description : BatchEnv与HeadlessGame的一致性：同一方块序列、同一动作流下逐帧比较方块、场地与得分
+              用法：python -m pytest tests/test_batch.py
+'''
+import os
+import numpy as np
+import pytest
+from manager import GameManager
+from headless import HeadlessGame
+from batch import BatchEnv, BATCH_ACTIONS, HARD_DROP, NOOP
+from strategies import search_strategy
+from component import PositionComponent, ShapeComponent
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yaml')
+ACTION_CODES = {action: code for code, action in enumerate(BATCH_ACTIONS)}
+# 游戏在锁定后的碰撞检测中才发现场地到顶，BatchEnv在锁定当帧结束，之后游戏最多再走的帧数
+GAME_OVER_FRAMES = 60
+
+# 按HeadlessGame的方块队列出块，替换BatchEnv.rng
+class QueueRng:
+    def __init__(self, queue) -> None:
+        self.queue = queue
+
+    def integers(self, high, size):
+        return np.array([self.queue.next()[0] for _ in range(size)], dtype=np.int64)
+
+def make_pair(seed, lock_delay_frames):
+    game_manager = GameManager(CONFIG, headless=True)
+    game_manager.config.LOCK_DELAY_FRAMES = lock_delay_frames
+    env = BatchEnv(1, game_manager=game_manager)
+    env.rng = QueueRng(game_manager.piece_queue(seed))
+    env.reset()
+    return env, HeadlessGame(seed=seed, game_manager=game_manager)
+
+def state(game):
+    block = game.entities.entity_manager['block']
+    shape = block.get_component(ShapeComponent)
+    position = block.get_component(PositionComponent)
+    return shape.piece_id, shape.rotation, position.x, position.y, game.score
+
+# seed 10的对局在比较范围内结束
+@pytest.mark.parametrize('lock_delay_frames', [0, 30])
+@pytest.mark.parametrize('seed', [0, 1, 10])
+def test_matches_headless(seed, lock_delay_frames, ticks=3000):
+    env, game = make_pair(seed, lock_delay_frames)
+    policy = search_strategy(seed)
+    for tick in range(ticks):
+        assert (int(env.piece[0]), int(env.rotation[0]), int(env.x[0]), int(env.y[0]), int(env.score[0])) == state(game), tick
+        np.testing.assert_array_equal(env.cells()[0], game.map.board.cells())
+        action = policy(game)
+        game.step(action or ())
+        # 游戏在下一帧开始时才消行、生成新方块，BatchEnv在锁定当帧完成
+        game.resolve_locks()
+        _, done = env.step([ACTION_CODES[action]])
+        if done[0]:
+            score = env.finished_score[-1]
+            for _ in range(GAME_OVER_FRAMES):
+                if game.done:
+                    break
+                game.step(policy(game) or ())
+            assert game.done and game.score == score
+            return
+        assert not game.done, tick
+
+def test_hard_drop_skips_lock_delay():
+    env, _ = make_pair(0, 30)
+    env.step([HARD_DROP])
+    assert env.pieces[0] == 1
+    env.step([NOOP])
+    assert env.pieces[0] == 1
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/19 09:40:18
+Contact     : zoe4896@outlook.com
+Description : 底层计算实现的差分检查：随机场地、随机方块（含越界位置）上逐项比较各实现与逐格计算的Python结果
+              用法：python -m pytest tests/test_kernels.py
+'''
+import numpy as np
+import pytest
+from kernels import KERNEL_BACKENDS
+from pieces import PieceTable, PieceRotation, ROTATIONS
+from zobrist import zobrist_table
+
+SIZES = [(20, 10), (20, 64), (40, 256), (4, 3)]
+CASES = 2000
+
+def random_piece(table, rng):
+    # 一半取标准方块，一半随机生成（可能含空行、空列）
+    if rng.random() < 0.5:
+        return table.get(int(rng.integers(len(table))), int(rng.integers(ROTATIONS)))
+    while True:
+        cells = rng.random((int(rng.integers(1, 5)), int(rng.integers(1, 5)))) < 0.5
+        if cells.any():
+            return PieceRotation(cells)
+
+def random_cells(height, width, rng):
+    # 下半部分随机填充，部分行填满
+    cells = np.zeros((height, width), dtype=int)
+    top = int(rng.integers(height + 1))
+    cells[top:] = rng.random((height - top, width)) < 0.7
+    full = rng.random(height - top) < 0.3
+    cells[top:][full] = 1
+    return cells
+
+def cases(count=CASES, seed=0):
+    # (场地, 方块, x, y)，位置可越出场地
+    rng = np.random.default_rng(seed)
+    table = PieceTable([[[1, 1, 1, 1]], [[1, 1], [1, 1]], [[1, 0, 0], [1, 1, 1]], [[0, 1, 1], [1, 1, 0]], [[0, 1, 0], [1, 1, 1]]])
+    for case in range(count):
+        height, width = SIZES[case % len(SIZES)]
+        cells = random_cells(height, width, rng)
+        piece = random_piece(table, rng)
+        x = int(rng.integers(-piece.width, width + 1))
+        y = int(rng.integers(-piece.height, height + 1))
+        yield cells, piece, x, y
+
+# 逐格计算的期望结果，与kernels.py的接口相同
+class Expected:
+    @staticmethod
+    def _cells(matrix, piece, x, y):
+        height, width = matrix.shape
+        for r, c in piece.offsets:
+            if 0 <= y + r < height and 0 <= x + c < width:
+                yield y + r, x + c, c
+
+    @staticmethod
+    def hits(cells, piece, x, y):
+        return sum({1 << c for row, col, c in Expected._cells(cells, piece, x, y) if cells[row, col]})
+
+    @staticmethod
+    def landed(cells, piece, x, y):
+        if y + piece.height >= len(cells):
+            return True
+        # 每列最低的格子下方一格
+        height, width = cells.shape
+        return any(0 <= y + r + 1 < height and 0 <= x + c < width and cells[y + r + 1, x + c]
+                   for c, r in enumerate(piece.bottom) if r >= 0)
+
+    @staticmethod
+    def lock(cells, keys, piece, x, y):
+        delta = 0
+        count = 0
+        for row, col, _ in list(Expected._cells(cells, piece, x, y)):
+            if not cells[row, col]:
+                cells[row, col] = 1
+                delta ^= int(keys[row, col])
+                count += 1
+        return delta, count
+
+    @staticmethod
+    def fill(matrix, piece, x, y, value):
+        for row, col, _ in list(Expected._cells(matrix, piece, x, y)):
+            matrix[row, col] = value
+
+    @staticmethod
+    def full_rows(cells):
+        return np.array([row for row in range(len(cells)) if all(cells[row])], dtype=np.int64)
+
+    @staticmethod
+    def clear_rows(matrix, rows):
+        kept = [matrix[row].copy() for row in range(len(matrix)) if row not in set(rows.tolist())]
+        matrix[:] = 0
+        if kept:
+            matrix[len(matrix) - len(kept):] = kept
+
+# 每个已注册的实现各跑一遍，不可用的跳过
+@pytest.fixture(params=list(KERNEL_BACKENDS))
+def kernels(request):
+    kernels = KERNEL_BACKENDS[request.param]()
+    if kernels is None:
+        pytest.skip(f'{request.param} kernels are not available')
+    return kernels
+
+def test_hits(kernels):
+    for cells, piece, x, y in cases():
+        assert kernels.hits(cells, piece, x, y) == Expected.hits(cells, piece, x, y), (cells.shape, x, y, piece.cells.tolist())
+
+def test_landed(kernels):
+    for cells, piece, x, y in cases():
+        # 方块底部在场地上方时landed无意义
+        if y >= -1:
+            assert kernels.landed(cells, piece, x, y) == Expected.landed(cells, piece, x, y), (cells.shape, x, y, piece.cells.tolist())
+
+def test_lock(kernels):
+    for cells, piece, x, y in cases():
+        zobrist = zobrist_table(*cells.shape)
+        expected, actual = cells.copy(), cells.copy()
+        expected_result = Expected.lock(expected, zobrist.keys, piece, x, y)
+        actual_hash, actual_count = kernels.lock(actual, zobrist.keys, piece, x, y)
+        np.testing.assert_array_equal(actual, expected)
+        assert (actual_hash, actual_count) == expected_result, (cells.shape, x, y, piece.cells.tolist())
+        # 哈希增量与重新计算整个场地的哈希一致
+        assert actual_hash == zobrist.cells(cells) ^ zobrist.cells(actual)
+
+def test_fill(kernels):
+    rng = np.random.default_rng(1)
+    for cells, piece, x, y in cases():
+        value = int(rng.integers(1, 256))
+        colors = cells.astype(np.uint8) * np.uint8(value // 2)
+        expected, actual = colors.copy(), colors.copy()
+        Expected.fill(expected, piece, x, y, value)
+        kernels.fill(actual, piece, x, y, value)
+        np.testing.assert_array_equal(actual, expected)
+
+def test_full_rows(kernels):
+    for cells, _, _, _ in cases():
+        np.testing.assert_array_equal(kernels.full_rows(cells), Expected.full_rows(cells))
+
+def test_clear_rows(kernels):
+    for cells, _, _, _ in cases():
+        rows = Expected.full_rows(cells)
+        for matrix in (cells, cells.astype(np.uint8) * np.uint8(7)):
+            expected, actual = matrix.copy(), matrix.copy()
+            Expected.clear_rows(expected, rows)
+            kernels.clear_rows(actual, rows)
+            np.testing.assert_array_equal(actual, expected)
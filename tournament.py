@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 16:05:44
+Contact     : zoe4896@outlook.com
+Description : 多进程锦标赛：按(策略, seed)分发无界面对局，结果逐行写入JSONL，可断点续跑
+              用法：python tournament.py --strategies random drop --seeds 0:1000 --out results.jsonl
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from headless import HeadlessGame
+from strategies import STRATEGIES
+
+# 视为已完成的结果状态，其余（timeout、crashed、error）续跑时重新执行
+FINISHED_STATUSES = ('ok', 'truncated')
+# 协作式超时未生效时，协调进程在超时后再等待的秒数，之后强制结束工作进程
+KILL_GRACE = 1.0
+
+# 每个工作进程复用一个HeadlessGame（配置与旋转表只加载一次）
+_worker_game = None
+# 开始通知队列
+_worker_started = None
+
+def _init_worker(config_path, started=None):
+    global _worker_game, _worker_started
+    _worker_game = HeadlessGame(config_path)
+    _worker_started = started
+
+def play(strategy, seed, max_ticks, timeout):
+    game = _worker_game
+    if _worker_started is not None:
+        # 任务提交后先在进程池中排队，开始时间由工作进程通知协调进程
+        _worker_started.put(((strategy, seed), time.time()))
+    game.reset(seed)
+    policy = STRATEGIES[strategy](seed)
+    status = 'ok'
+    start = time.perf_counter()
+    while not game.done:
+        if game.tick >= max_ticks:
+            status = 'truncated'
+            break
+        # 协作式超时，每256帧检查一次
+        if game.tick & 255 == 0 and time.perf_counter() - start > timeout:
+            status = 'timeout'
+            break
+        action = policy(game)
+        game.step(action if action is not None else ())
+    return {
+        'strategy': strategy,
+        'seed': seed,
+        'status': status,
+        'score': game.score,
+        'lines_cleared': game.lines_cleared,
+        'pieces': game.pieces,
+        'ticks': game.tick,
+        'duration': time.perf_counter() - start,
+    }
+
+def parse_seeds(text):
+    # "0:1000" 或 "1,5,9"
+    if ':' in text:
+        start, stop = text.split(':')
+        return list(range(int(start), int(stop)))
+    return [int(seed) for seed in text.split(',')]
+
+def load_finished(path):
+    # 读取已成功完成的(策略, seed)；中断时可能残留半行，跳过
+    finished = set()
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('status') in FINISHED_STATUSES:
+                    finished.add((record['strategy'], record['seed']))
+    return finished
+
+class Tournament:
+    def __init__(self, jobs, out, config_path='config.yaml', workers=None, max_ticks=200000, timeout=60.0, retries=2):
+        self.jobs = list(jobs)
+        self.out = out
+        self.config_path = config_path
+        self.workers = workers or os.cpu_count()
+        self.max_ticks = max_ticks
+        self.timeout = timeout
+        self.retries = retries
+        self.attempts = {}
+        self.started = None
+
+    def _new_pool(self):
+        # 每个进程池使用新的通知队列：被强制结束的进程可能在写入途中退出，旧队列连同其中的通知一起丢弃
+        self.started = multiprocessing.Queue()
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.config_path, self.started))
+
+    def _poll_started(self, deadlines):
+        # 读取工作进程的开始通知，记录在途任务的截止时间
+        while not self.started.empty():
+            job, start = self.started.get()
+            deadlines[job] = start + self.timeout + KILL_GRACE
+
+    def _kill_pool(self, pool):
+        # 结束全部工作进程（shutdown不会打断正在执行的任务）
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, on_result=None):
+        pending = list(reversed(self.jobs))
+        # 进程池崩溃时在途的任务，逐个单独重跑以定位导致崩溃的任务
+        isolated = []
+        in_flight = {}
+        # 已开始的在途任务 -> 截止时间（time.time()）
+        deadlines = {}
+        max_in_flight = self.workers * 4
+        pool = self._new_pool()
+        with open(self.out, 'a') as f:
+            try:
+                while pending or isolated or in_flight:
+                    if isolated:
+                        if not in_flight:
+                            job = isolated.pop()
+                            in_flight[pool.submit(play, *job, self.max_ticks, self.timeout)] = job
+                    else:
+                        while pending and len(in_flight) < max_in_flight:
+                            job = pending.pop()
+                            in_flight[pool.submit(play, *job, self.max_ticks, self.timeout)] = job
+                    alone = len(in_flight) == 1
+                    # 最多等到最早的截止时间；尚未收到开始通知的任务每timeout秒检查一次
+                    self._poll_started(deadlines)
+                    now = time.time()
+                    until = min([deadlines[job] for job in in_flight.values() if job in deadlines], default=now + self.timeout)
+                    done, _ = wait(in_flight, timeout=max(min(until, now + self.timeout) - now, 0), return_when=FIRST_COMPLETED)
+                    self._poll_started(deadlines)
+                    if not done:
+                        now = time.time()
+                        expired = [job for job in in_flight.values() if deadlines.get(job, now) < now]
+                        if expired:
+                            # 超时的任务不响应协作式超时，强制结束整个进程池后重建，其余在途任务重新排队
+                            for job in expired:
+                                self._write(f, self._failed(job, 'timeout', f'killed after {self.timeout + KILL_GRACE:.1f}s'), on_result)
+                            pending.extend(job for job in in_flight.values() if job not in expired)
+                            in_flight.clear()
+                            deadlines.clear()
+                            self._kill_pool(pool)
+                            pool = self._new_pool()
+                        continue
+                    broken = False
+                    for future in done:
+                        job = in_flight.pop(future)
+                        deadlines.pop(job, None)
+                        record = None
+                        try:
+                            record = future.result()
+                        except BrokenProcessPool:
+                            broken = True
+                            if alone:
+                                record = self._retry(job, isolated)
+                            else:
+                                isolated.append(job)
+                        except Exception as e:
+                            record = self._failed(job, 'error', repr(e))
+                        if record is not None:
+                            self._write(f, record, on_result)
+                    if broken:
+                        # 工作进程崩溃会导致整个进程池失效，重建进程池
+                        isolated.extend(in_flight.values())
+                        in_flight.clear()
+                        deadlines.clear()
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = self._new_pool()
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def _write(self, f, record, on_result):
+        f.write(json.dumps(record) + '\n')
+        f.flush()
+        if on_result is not None:
+            on_result(record)
+
+    def _retry(self, job, queue):
+        self.attempts[job] = self.attempts.get(job, 0) + 1
+        if self.attempts[job] <= self.retries:
+            queue.append(job)
+            return None
+        return self._failed(job, 'crashed', 'worker process died')
+
+    def _failed(self, job, status, error):
+        strategy, seed = job
+        return {'strategy': strategy, 'seed': seed, 'status': status, 'error': error}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--seeds', default='0:100')
+    parser.add_argument('--out', default='results.jsonl')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-ticks', type=int, default=200000)
+    parser.add_argument('--timeout', type=float, default=60.0, help='单局超时（秒）')
+    parser.add_argument('--retries', type=int, default=2, help='工作进程崩溃后的重试次数')
+    args = parser.parse_args()
+
+    finished = load_finished(args.out)
+    jobs = [(strategy, seed) for strategy in args.strategies for seed in parse_seeds(args.seeds) if (strategy, seed) not in finished]
+    print(f'{len(finished)} finished, {len(jobs)} to run', file=sys.stderr)
+
+    count = [0]
+    start = time.perf_counter()
+    def on_result(record):
+        count[0] += 1
+        print(f"[{count[0]}/{len(jobs)}] {record['strategy']} seed={record['seed']} {record['status']} score={record.get('score')}", file=sys.stderr)
+
+    Tournament(jobs, args.out, args.config, args.workers, args.max_ticks, args.timeout, args.retries).run(on_result)
+    elapsed = time.perf_counter() - start
+    if jobs:
+        print(f'{len(jobs)} games in {elapsed:.2f}s ({len(jobs) / elapsed:.1f} games/sec)', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
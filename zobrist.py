@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+'''
+Author      : Bluzy
+Date        : 2026/10/18 23:02:18
+Contact     : zoe4896@outlook.com
+Description : 场地的Zobrist哈希
+              每个格子一个64位随机数，场地哈希为所有已占格随机数的异或；
+              锁定、消行时只重算受影响的行
+'''
+import numpy as np
+from functools import lru_cache
+
+# 固定种子，不同进程、不同对局的哈希一致
+ZOBRIST_SEED = 0x5EED
+
+# 按8位分段查表：行掩码每个字节对应一张256项的表
+CHUNK_BITS = 8
+
+class ZobristTable:
+    def __init__(self, height, width, seed=ZOBRIST_SEED) -> None:
+        self.height = height
+        self.width = width
+        rng = np.random.default_rng(seed)
+        self.keys = rng.integers(0, 2 ** 64, size=(height, width), dtype=np.uint64, endpoint=False)
+        self.chunks = (width + CHUNK_BITS - 1) // CHUNK_BITS
+        # 表项value为其各置位对应格子随机数的异或，按行一次算出全部分段再转成Python整数
+        bits = (np.arange(1 << CHUNK_BITS)[:, None] >> np.arange(CHUNK_BITS)) & 1 != 0
+        padded = np.zeros((height, self.chunks * CHUNK_BITS), dtype=np.uint64)
+        padded[:, :width] = self.keys
+        self.tables = tuple(
+            tuple(tuple(table) for table in np.bitwise_xor.reduce(np.where(bits, row[:, None, :], np.uint64(0)), axis=2).tolist())
+            for row in padded.reshape(height, self.chunks, CHUNK_BITS)
+        )
+
+    def row(self, r, mask):
+        # 第r行按位掩码mask的哈希
+        h = 0
+        for table in self.tables[r]:
+            h ^= table[mask & 0xff]
+            mask >>= CHUNK_BITS
+        return h
+
+    def rows(self, masks, start=0):
+        # 从第start行开始的若干行
+        h = 0
+        for r, mask in enumerate(masks, start):
+            h ^= self.row(r, mask)
+        return h
+
+    def region(self, cells, start=0):
+        # cells: 从第start行开始的若干行0/1矩阵；直接异或已占格的随机数，不经过行掩码（宽于63列时会溢出int64）
+        keys = self.keys[start:start + len(cells)]
+        return int(np.bitwise_xor.reduce(keys[cells != 0], initial=np.uint64(0)))
+
+    def cells(self, cells):
+        return self.region(np.asarray(cells), 0)
+
+    def batch(self, boards):
+        # (N, H, W) bool场地，返回(N,) uint64哈希
+        return np.bitwise_xor.reduce(np.where(boards, self.keys, np.uint64(0)).reshape(len(boards), -1), axis=1)
+
+@lru_cache(maxsize=None)
+def zobrist_table(height, width):
+    return ZobristTable(height, width)